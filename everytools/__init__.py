@@ -15,6 +15,9 @@ from .everytools import EveryTools
 
 # 新API
 from .query.search import Search, SearchBuilder
+from .query.batch import batch_search
+from .query.live import LiveSearch
+from .query.multiplex import multiplex_search
 from .query.filters import (
     FileFilter,
     FolderFilter,
@@ -22,17 +25,24 @@ from .query.filters import (
     MediaFilter,
     DocumentFilter,
 )
+from .core.executor import QueryExecutor
+from .core.cache import QueryCache
 from .constants import SortType, RequestFlag, ErrorCode
 
 __all__ = [
     "EveryTools",  # 向后兼容
     "Search",
     "SearchBuilder",
+    "batch_search",
+    "LiveSearch",
+    "multiplex_search",
     "FileFilter",
     "FolderFilter",
     "DateFilter",
     "MediaFilter",
     "DocumentFilter",
+    "QueryExecutor",
+    "QueryCache",
     "SortType",
     "RequestFlag",
     "ErrorCode",
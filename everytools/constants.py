@@ -20,6 +20,8 @@ class ErrorCode(IntEnum):
     EVERYTHING_ERROR_CREATETHREAD = 5  # 创建线程错误 (CreateThread failed)
     EVERYTHING_ERROR_INVALIDINDEX = 6  # 索引无效 (Invalid index)
     EVERYTHING_ERROR_INVALIDCALL = 7  # 无效调用 (Invalid call)
+    EVERYTHING_ERROR_INVALIDREQUEST = 8  # 未请求该字段 (Invalid request data)
+    EVERYTHING_ERROR_INVALIDPARAMETER = 9  # 参数无效 (Invalid parameter)
 
 
 class RequestFlag(IntFlag):
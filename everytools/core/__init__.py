@@ -6,8 +6,39 @@
 Core package for Everything SDK
 """
 
-from .dll_loader import get_dll_loader
-from .result import ResultSet, FileResult
+from .dll_loader import get_dll_loader, set_backend, get_backend, use_backend
+from .backend import EverythingBackend
+from .emulator import EmulatedDLL, EmulatedFile, generate_file_table
+from .result import ResultSet, FileResult, LazyFileResult
+from .snapshot import ResultSnapshot
+from .query_parser import format_query, parse_query
+from .query_compiler import CompiledQuery, compile_query
+from .executor import QueryExecutor, get_executor
+from .cache import QueryCache, CacheStats, get_query_cache
 from .api_wrapper import get_api, EverythingAPI
 
-__all__ = ["get_dll_loader", "ResultSet", "FileResult", "get_api", "EverythingAPI"]
+__all__ = [
+    "get_dll_loader",
+    "set_backend",
+    "get_backend",
+    "use_backend",
+    "EverythingBackend",
+    "EmulatedDLL",
+    "EmulatedFile",
+    "generate_file_table",
+    "ResultSet",
+    "FileResult",
+    "LazyFileResult",
+    "ResultSnapshot",
+    "parse_query",
+    "format_query",
+    "compile_query",
+    "CompiledQuery",
+    "QueryExecutor",
+    "get_executor",
+    "QueryCache",
+    "CacheStats",
+    "get_query_cache",
+    "get_api",
+    "EverythingAPI",
+]
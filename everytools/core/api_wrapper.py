@@ -9,6 +9,7 @@ Complete API wrapper for Everything SDK
 import ctypes
 from typing import Optional, Union
 from .dll_loader import get_dll_loader
+from .result import mark_query_changed
 from ..constants import SortType, RequestFlag
 
 
@@ -65,7 +66,6 @@ class EverythingAPI:
 
     def get_search(self) -> str:
         """获取搜索字符串"""
-        self._dll.Everything_GetSearchW.restype = ctypes.c_wchar_p
         return self._dll.Everything_GetSearchW() or ""
 
     def get_match_path(self) -> bool:
@@ -108,6 +108,7 @@ class EverythingAPI:
 
     def query(self, wait: bool = True) -> bool:
         """执行查询"""
+        mark_query_changed(self._dll)
         result = self._dll.Everything_QueryW(wait)
         if not result:
             self._dll_loader.check_error()
@@ -117,10 +118,12 @@ class EverythingAPI:
 
     def sort_results_by_path(self) -> None:
         """按路径排序结果"""
+        mark_query_changed(self._dll)
         self._dll.Everything_SortResultsByPath()
 
     def reset(self) -> None:
         """重置搜索状态"""
+        mark_query_changed(self._dll)
         self._dll.Everything_Reset()
 
     # ========== 读取结果 ==========
@@ -365,6 +368,7 @@ _api_instance = None
 def get_api(machine: Optional[int] = None) -> EverythingAPI:
     """获取API实例"""
     global _api_instance
-    if _api_instance is None:
+    # 安装新后端后DLL加载器会重建，API实例需随之更新
+    if _api_instance is None or _api_instance._dll_loader is not get_dll_loader(machine):
         _api_instance = EverythingAPI(machine)
     return _api_instance
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Arrow与pandas导出模块
+Apache Arrow and pandas export module
+
+列式读取得到的整数列（array或只读memoryview）直接包装为Arrow缓冲区，不逐行复制；
+日期列由原始FILETIME按整数运算转换为timestamp[ns]（UTC），扩展名列使用字典编码。
+pyarrow和pandas都是可选依赖，只在调用导出函数时导入。
+"""
+
+from typing import Any, Dict
+
+from ..utils.time_utils import WINDOWS_TICKS_TO_POSIX_EPOCH, max_valid_filetime
+from .result import COLUMNS, UNKNOWN_SIZE
+
+# 使用字典编码的字符串列：取值重复率高
+DICTIONARY_COLUMNS = ("extension",)
+
+
+def import_pyarrow() -> Any:
+    """导入pyarrow
+
+    Raises:
+        ImportError: 如果没有安装pyarrow
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("导出Arrow表需要pyarrow，请先安装: pip install pyarrow") from e
+    return pyarrow
+
+
+def import_pandas() -> Any:
+    """导入pandas
+
+    Raises:
+        ImportError: 如果没有安装pandas
+    """
+    try:
+        import pandas
+    except ImportError as e:
+        raise ImportError("导出DataFrame需要pandas，请先安装: pip install pandas") from e
+    return pandas
+
+
+def _wrap_buffer(pa: Any, data: Any, arrow_type: Any) -> Any:
+    """把array或memoryview包装为Arrow数组，共享同一块内存"""
+    return pa.Array.from_buffers(arrow_type, len(data), [None, pa.py_buffer(data)])
+
+
+def _filetime_array(pa: Any, pc: Any, ticks: Any, max_ticks: int) -> Any:
+    """把原始FILETIME的uint64数组转换为timestamp[ns]数组，0和超出范围的值为null"""
+    epoch = pa.scalar(int(WINDOWS_TICKS_TO_POSIX_EPOCH), pa.uint64())
+    valid = pc.and_(pc.greater(ticks, epoch), pc.less_equal(ticks, pa.scalar(max_ticks, pa.uint64())))
+    # 无效值先替换为起点，避免无符号减法溢出；max_valid_filetime()以内的纳秒数不会超出int64
+    offsets = pc.subtract(pc.if_else(valid, ticks, epoch), epoch).cast(pa.int64())
+    nanoseconds = pc.if_else(valid, pc.multiply(offsets, 100), pa.scalar(None, pa.int64()))
+    return nanoseconds.cast(pa.timestamp("ns"))
+
+
+def columns_to_arrow(columns: Dict[str, Any]) -> Any:
+    """把原始列数据转换为Arrow表
+
+    Args:
+        columns: ResultSet.to_columns(dates="raw")格式的列数据，整数列也可以是只读memoryview
+
+    Returns:
+        pyarrow.Table：大小为uint64（未知为null），日期为timestamp[ns]（UTC，未知为null），
+        属性和运行次数为uint32，is_file/is_folder/is_volume为bool，扩展名为字典编码的字符串
+
+    Raises:
+        ImportError: 如果没有安装pyarrow
+    """
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    max_ticks = max_valid_filetime()
+    arrays = {}
+    for name, data in columns.items():
+        typecode = COLUMNS[name][1]
+        if typecode is None:
+            values = pa.array(data, pa.string())
+            if name in DICTIONARY_COLUMNS:
+                values = values.dictionary_encode()
+            arrays[name] = values
+        elif typecode == "B":
+            arrays[name] = _wrap_buffer(pa, data, pa.uint8()).cast(pa.bool_())
+        elif typecode == "I":
+            arrays[name] = _wrap_buffer(pa, data, pa.uint32())
+        elif name.startswith("date_"):
+            arrays[name] = _filetime_array(pa, pc, _wrap_buffer(pa, data, pa.uint64()), max_ticks)
+        else:
+            values = _wrap_buffer(pa, data, pa.uint64())
+            unknown = pc.equal(values, pa.scalar(UNKNOWN_SIZE, pa.uint64()))
+            arrays[name] = pc.if_else(unknown, pa.scalar(None, pa.uint64()), values)
+    return pa.table(arrays)
+
+
+def arrow_to_pandas(table: Any, self_destruct: bool = False) -> Any:
+    """把columns_to_arrow()得到的表转换为DataFrame
+
+    uint64和uint32列转换为可空整数类型（未知值为<NA>，不会变成float64），
+    日期列为datetime64[ns]（未知为NaT），扩展名列为category。
+
+    Args:
+        table: pyarrow.Table
+        self_destruct: 是否在转换过程中释放Arrow缓冲区以降低峰值内存，之后不能再使用table
+
+    Returns:
+        pandas.DataFrame
+
+    Raises:
+        ImportError: 如果没有安装pandas
+    """
+    pd = import_pandas()
+    pa = import_pyarrow()
+    nullable = {pa.uint64(): pd.UInt64Dtype(), pa.uint32(): pd.UInt32Dtype()}
+    options: Dict[str, Any] = {"types_mapper": nullable.get}
+    if self_destruct:
+        options.update(split_blocks=True, self_destruct=True)
+    return table.to_pandas(**options)
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+搜索后端协议模块
+Search backend protocol module
+
+Search、ResultSet、EverythingAPI和EveryTools只通过Everything_*函数访问SDK。
+ctypes加载的Everything DLL在结构上满足该协议，EmulatedDLL则提供纯Python实现。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+# 后端必须提供的全部SDK函数
+BACKEND_FUNCTIONS = (
+    # 操作搜索状态
+    "Everything_SetSearchW",
+    "Everything_SetMatchPath",
+    "Everything_SetMatchCase",
+    "Everything_SetMatchWholeWord",
+    "Everything_SetRegex",
+    "Everything_SetMax",
+    "Everything_SetOffset",
+    "Everything_SetSort",
+    "Everything_SetRequestFlags",
+    "Everything_SetReplyWindow",
+    "Everything_SetReplyID",
+    # 读取搜索状态
+    "Everything_GetSearchW",
+    "Everything_GetMatchPath",
+    "Everything_GetMatchCase",
+    "Everything_GetMatchWholeWord",
+    "Everything_GetRegex",
+    "Everything_GetMax",
+    "Everything_GetOffset",
+    "Everything_GetSort",
+    "Everything_GetRequestFlags",
+    "Everything_GetReplyWindow",
+    "Everything_GetReplyID",
+    "Everything_GetLastError",
+    # 执行查询
+    "Everything_QueryW",
+    "Everything_IsQueryReply",
+    # 操作结果
+    "Everything_SortResultsByPath",
+    "Everything_Reset",
+    "Everything_CleanUp",
+    # 读取结果
+    "Everything_GetNumResults",
+    "Everything_GetNumFileResults",
+    "Everything_GetNumFolderResults",
+    "Everything_GetTotResults",
+    "Everything_GetTotFileResults",
+    "Everything_GetTotFolderResults",
+    "Everything_GetResultListSort",
+    "Everything_GetResultListRequestFlags",
+    "Everything_IsFileResult",
+    "Everything_IsFolderResult",
+    "Everything_IsVolumeResult",
+    "Everything_GetResultFileNameW",
+    "Everything_GetResultPathW",
+    "Everything_GetResultFullPathNameW",
+    "Everything_GetResultExtensionW",
+    "Everything_GetResultSize",
+    "Everything_GetResultDateCreated",
+    "Everything_GetResultDateModified",
+    "Everything_GetResultDateAccessed",
+    "Everything_GetResultDateRun",
+    "Everything_GetResultDateRecentlyChanged",
+    "Everything_GetResultAttributes",
+    "Everything_GetResultRunCount",
+    "Everything_GetResultFileListFileNameW",
+    "Everything_GetResultHighlightedFileNameW",
+    "Everything_GetResultHighlightedPathW",
+    "Everything_GetResultHighlightedFullPathAndFileNameW",
+    # 运行历史
+    "Everything_GetRunCountFromFileNameW",
+    "Everything_SetRunCountFromFileNameW",
+    "Everything_IncRunCountFromFileNameW",
+    "Everything_SaveRunHistory",
+    "Everything_DeleteRunHistory",
+    # 常规功能
+    "Everything_GetMajorVersion",
+    "Everything_GetMinorVersion",
+    "Everything_GetRevision",
+    "Everything_GetBuildNumber",
+    "Everything_GetTargetMachine",
+    "Everything_IsDBLoaded",
+    "Everything_IsAdmin",
+    "Everything_IsAppData",
+    "Everything_RebuildDB",
+    "Everything_UpdateAllFolderIndexes",
+    "Everything_SaveDB",
+    "Everything_Exit",
+)
+
+
+class EverythingBackend(ABC):
+    """Everything SDK后端协议
+
+    方法名与SDK导出函数保持一致，调用约定也与ctypes相同：
+    日期和大小通过输出参数（c_ulonglong或ctypes.byref）返回，字符串函数返回str或None。
+    """
+
+    # ========== 操作搜索状态 ==========
+
+    @abstractmethod
+    def Everything_SetSearchW(self, search: str) -> None:
+        """设置搜索字符串"""
+
+    @abstractmethod
+    def Everything_SetMatchPath(self, enable: bool) -> None:
+        """设置是否匹配路径"""
+
+    @abstractmethod
+    def Everything_SetMatchCase(self, enable: bool) -> None:
+        """设置是否区分大小写"""
+
+    @abstractmethod
+    def Everything_SetMatchWholeWord(self, enable: bool) -> None:
+        """设置是否全字匹配"""
+
+    @abstractmethod
+    def Everything_SetRegex(self, enable: bool) -> None:
+        """设置是否使用正则表达式"""
+
+    @abstractmethod
+    def Everything_SetMax(self, max_results: int) -> None:
+        """设置最大结果数量"""
+
+    @abstractmethod
+    def Everything_SetOffset(self, offset: int) -> None:
+        """设置结果偏移量"""
+
+    @abstractmethod
+    def Everything_SetSort(self, sort_type: int) -> None:
+        """设置排序方式"""
+
+    @abstractmethod
+    def Everything_SetRequestFlags(self, flags: int) -> None:
+        """设置请求标志位"""
+
+    @abstractmethod
+    def Everything_SetReplyWindow(self, window_handle: Any) -> None:
+        """设置回复窗口句柄"""
+
+    @abstractmethod
+    def Everything_SetReplyID(self, reply_id: int) -> None:
+        """设置回复ID"""
+
+    # ========== 读取搜索状态 ==========
+
+    @abstractmethod
+    def Everything_GetSearchW(self) -> Optional[str]:
+        """获取搜索字符串"""
+
+    @abstractmethod
+    def Everything_GetMatchPath(self) -> bool:
+        """获取是否匹配路径"""
+
+    @abstractmethod
+    def Everything_GetMatchCase(self) -> bool:
+        """获取是否区分大小写"""
+
+    @abstractmethod
+    def Everything_GetMatchWholeWord(self) -> bool:
+        """获取是否全字匹配"""
+
+    @abstractmethod
+    def Everything_GetRegex(self) -> bool:
+        """获取是否使用正则表达式"""
+
+    @abstractmethod
+    def Everything_GetMax(self) -> int:
+        """获取最大结果数量"""
+
+    @abstractmethod
+    def Everything_GetOffset(self) -> int:
+        """获取结果偏移量"""
+
+    @abstractmethod
+    def Everything_GetSort(self) -> int:
+        """获取排序方式"""
+
+    @abstractmethod
+    def Everything_GetRequestFlags(self) -> int:
+        """获取请求标志位"""
+
+    @abstractmethod
+    def Everything_GetReplyWindow(self) -> Any:
+        """获取回复窗口句柄"""
+
+    @abstractmethod
+    def Everything_GetReplyID(self) -> int:
+        """获取回复ID"""
+
+    @abstractmethod
+    def Everything_GetLastError(self) -> int:
+        """获取最后一次错误代码"""
+
+    # ========== 执行查询 ==========
+
+    @abstractmethod
+    def Everything_QueryW(self, wait: bool) -> bool:
+        """执行查询"""
+
+    @abstractmethod
+    def Everything_IsQueryReply(
+        self, message: int, wparam: int, lparam: int, reply_id: int
+    ) -> bool:
+        """检查是否为查询应答消息"""
+
+    # ========== 操作结果 ==========
+
+    @abstractmethod
+    def Everything_SortResultsByPath(self) -> None:
+        """按路径排序结果"""
+
+    @abstractmethod
+    def Everything_Reset(self) -> None:
+        """重置搜索状态"""
+
+    @abstractmethod
+    def Everything_CleanUp(self) -> None:
+        """清理资源"""
+
+    # ========== 读取结果 ==========
+
+    @abstractmethod
+    def Everything_GetNumResults(self) -> int:
+        """获取可见结果数量"""
+
+    @abstractmethod
+    def Everything_GetNumFileResults(self) -> int:
+        """获取可见文件结果数量"""
+
+    @abstractmethod
+    def Everything_GetNumFolderResults(self) -> int:
+        """获取可见文件夹结果数量"""
+
+    @abstractmethod
+    def Everything_GetTotResults(self) -> int:
+        """获取总结果数量"""
+
+    @abstractmethod
+    def Everything_GetTotFileResults(self) -> int:
+        """获取总文件结果数量"""
+
+    @abstractmethod
+    def Everything_GetTotFolderResults(self) -> int:
+        """获取总文件夹结果数量"""
+
+    @abstractmethod
+    def Everything_GetResultListSort(self) -> int:
+        """获取结果列表排序方式"""
+
+    @abstractmethod
+    def Everything_GetResultListRequestFlags(self) -> int:
+        """获取结果列表请求标志位"""
+
+    @abstractmethod
+    def Everything_IsFileResult(self, index: int) -> bool:
+        """检查指定索引是否为文件结果"""
+
+    @abstractmethod
+    def Everything_IsFolderResult(self, index: int) -> bool:
+        """检查指定索引是否为文件夹结果"""
+
+    @abstractmethod
+    def Everything_IsVolumeResult(self, index: int) -> bool:
+        """检查指定索引是否为卷结果"""
+
+    @abstractmethod
+    def Everything_GetResultFileNameW(self, index: int) -> Optional[str]:
+        """获取结果文件名"""
+
+    @abstractmethod
+    def Everything_GetResultPathW(self, index: int) -> Optional[str]:
+        """获取结果路径"""
+
+    @abstractmethod
+    def Everything_GetResultFullPathNameW(self, index: int, *args: Any) -> Any:
+        """获取结果完整路径和文件名"""
+
+    @abstractmethod
+    def Everything_GetResultExtensionW(self, index: int) -> Optional[str]:
+        """获取结果扩展名"""
+
+    @abstractmethod
+    def Everything_GetResultSize(self, index: int, buffer: Any) -> bool:
+        """获取结果文件大小"""
+
+    @abstractmethod
+    def Everything_GetResultDateCreated(self, index: int, buffer: Any) -> bool:
+        """获取结果创建时间（FILETIME）"""
+
+    @abstractmethod
+    def Everything_GetResultDateModified(self, index: int, buffer: Any) -> bool:
+        """获取结果修改时间（FILETIME）"""
+
+    @abstractmethod
+    def Everything_GetResultDateAccessed(self, index: int, buffer: Any) -> bool:
+        """获取结果访问时间（FILETIME）"""
+
+    @abstractmethod
+    def Everything_GetResultDateRun(self, index: int, buffer: Any) -> bool:
+        """获取结果运行时间（FILETIME）"""
+
+    @abstractmethod
+    def Everything_GetResultDateRecentlyChanged(self, index: int, buffer: Any) -> bool:
+        """获取结果最近更改时间（FILETIME）"""
+
+    @abstractmethod
+    def Everything_GetResultAttributes(self, index: int) -> int:
+        """获取结果文件属性"""
+
+    @abstractmethod
+    def Everything_GetResultRunCount(self, index: int) -> int:
+        """获取结果运行次数"""
+
+    @abstractmethod
+    def Everything_GetResultFileListFileNameW(self, index: int) -> Optional[str]:
+        """获取结果文件列表文件名"""
+
+    @abstractmethod
+    def Everything_GetResultHighlightedFileNameW(self, index: int) -> Optional[str]:
+        """获取高亮显示的文件名"""
+
+    @abstractmethod
+    def Everything_GetResultHighlightedPathW(self, index: int) -> Optional[str]:
+        """获取高亮显示的路径"""
+
+    @abstractmethod
+    def Everything_GetResultHighlightedFullPathAndFileNameW(
+        self, index: int
+    ) -> Optional[str]:
+        """获取高亮显示的完整路径和文件名"""
+
+    # ========== 运行历史 ==========
+
+    @abstractmethod
+    def Everything_GetRunCountFromFileNameW(self, file_name: str) -> int:
+        """从文件名获取运行次数"""
+
+    @abstractmethod
+    def Everything_SetRunCountFromFileNameW(self, file_name: str, run_count: int) -> bool:
+        """设置文件名的运行次数"""
+
+    @abstractmethod
+    def Everything_IncRunCountFromFileNameW(self, file_name: str) -> int:
+        """增加文件名的运行次数"""
+
+    @abstractmethod
+    def Everything_SaveRunHistory(self) -> bool:
+        """保存运行历史"""
+
+    @abstractmethod
+    def Everything_DeleteRunHistory(self) -> bool:
+        """删除运行历史"""
+
+    # ========== 常规功能 ==========
+
+    @abstractmethod
+    def Everything_GetMajorVersion(self) -> int:
+        """获取主版本号"""
+
+    @abstractmethod
+    def Everything_GetMinorVersion(self) -> int:
+        """获取次版本号"""
+
+    @abstractmethod
+    def Everything_GetRevision(self) -> int:
+        """获取修订版本号"""
+
+    @abstractmethod
+    def Everything_GetBuildNumber(self) -> int:
+        """获取构建号"""
+
+    @abstractmethod
+    def Everything_GetTargetMachine(self) -> int:
+        """获取目标机器架构"""
+
+    @abstractmethod
+    def Everything_IsDBLoaded(self) -> bool:
+        """检查数据库是否已加载"""
+
+    @abstractmethod
+    def Everything_IsAdmin(self) -> bool:
+        """检查是否以管理员身份运行"""
+
+    @abstractmethod
+    def Everything_IsAppData(self) -> bool:
+        """检查是否使用应用数据"""
+
+    @abstractmethod
+    def Everything_RebuildDB(self) -> bool:
+        """重建数据库"""
+
+    @abstractmethod
+    def Everything_UpdateAllFolderIndexes(self) -> bool:
+        """更新所有文件夹索引"""
+
+    @abstractmethod
+    def Everything_SaveDB(self) -> bool:
+        """保存数据库"""
+
+    @abstractmethod
+    def Everything_Exit(self) -> bool:
+        """退出Everything"""
+
+
+def is_backend(obj: Any) -> bool:
+    """检查对象是否提供了后端协议要求的全部函数
+
+    Args:
+        obj: 待检查的对象（EverythingBackend实例或ctypes加载的DLL）
+
+    Returns:
+        是否满足后端协议
+    """
+    if isinstance(obj, EverythingBackend):
+        return True
+    return all(callable(getattr(obj, name, None)) for name in BACKEND_FUNCTIONS)
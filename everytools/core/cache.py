@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+查询结果缓存模块
+In-memory query result cache module
+
+缓存以查询的唯一标识为键，保存已全部读取、不依赖DLL状态的结果集。
+支持按条目数和结果行数的LRU淘汰、按条目设置的过期时间（TTL），
+以及过期后先返回旧结果、同时在后台刷新的stale-while-revalidate模式。
+条目可以属于一个分组（例如除查询字符串外设置都相同的查询），按分组列出条目时不需要遍历整个缓存。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, TypeVar
+
+from ..utils.time_utils import DEBUG
+from .query_parser import Function, Modifier, Node, Not, Text, format_query, parse_query
+
+T = TypeVar("T")
+
+
+# 作用于操作数时保留其大小写的修饰符
+_CASE_PRESERVING = {"case", "regex"}
+
+
+def _fold_case(node: Node) -> Node:
+    """把不区分大小写的搜索词和函数值转为小写，case:和regex:的操作数保持原样"""
+    if isinstance(node, Text):
+        return Text(node.text.lower())
+    if isinstance(node, Function):
+        return Function(node.name, node.value.lower())
+    if isinstance(node, Modifier):
+        if node.operand is None or node.name in _CASE_PRESERVING:
+            return node
+        return Modifier(node.name, _fold_case(node.operand))
+    if isinstance(node, Not):
+        return Not(_fold_case(node.operand))
+    return type(node)(tuple(_fold_case(operand) for operand in node.operands))
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(query_string: str, match_case: bool = False, regex: bool = False) -> str:
+    """规范化查询字符串，使等价的查询得到相同的缓存键
+
+    使用正则表达式时只去除首尾空白；否则解析为语法树后重新格式化，合并引号外的连续空白。
+    不区分大小写时把搜索词和函数值转为小写，但case:和regex:修饰的部分保持原样，
+    因此case:Foo和case:foo得到不同的键。
+
+    Args:
+        query_string: 查询字符串
+        match_case: 是否区分大小写
+        regex: 是否使用正则表达式
+
+    Returns:
+        规范化后的查询字符串
+    """
+    query = query_string.strip()
+    if regex:
+        return query
+    node = parse_query(query)
+    if not match_case:
+        node = _fold_case(node)
+    return format_query(node)
+
+
+class CacheStats(NamedTuple):
+    """缓存统计信息"""
+
+    hits: int
+    misses: int
+    stale_hits: int
+    evictions: int
+    refreshes: int
+    refresh_failures: int
+    entries: int
+    rows: int
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率（包括返回旧结果的命中）"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+class _Entry:
+    """一个缓存条目"""
+
+    __slots__ = ("value", "size", "expires_at", "family", "refreshing")
+
+    def __init__(self, value: Any, size: int, expires_at: float, family: Optional[Hashable]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.family = family
+        self.refreshing = False
+
+
+class QueryCache:
+    """线程安全的查询结果缓存"""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_rows: Optional[int] = None,
+        ttl: float = 60.0,
+        stale_while_revalidate: bool = False,
+        max_stale: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化缓存
+
+        Args:
+            max_entries: 最多缓存的查询数
+            max_rows: 所有条目的结果行数上限，None表示不限制
+            ttl: 默认过期时间（秒）
+            stale_while_revalidate: 过期后是否先返回旧结果并在后台刷新
+            max_stale: 过期后最多还能返回旧结果的时间（秒），None表示不限制
+            clock: 时间函数，返回单调递增的秒数
+
+        Raises:
+            ValueError: 如果参数无效
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries必须大于0")
+        if max_rows is not None and max_rows < 0:
+            raise ValueError("max_rows不能为负数")
+        if ttl < 0:
+            raise ValueError("ttl不能为负数")
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        self._ttl = ttl
+        self._stale_while_revalidate = stale_while_revalidate
+        self._max_stale = max_stale
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # 分组 -> 该分组的键（按写入顺序）
+        self._families: Dict[Hashable, Dict[Hashable, None]] = {}
+        self._rows = 0
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ("hits", "misses", "stale_hits", "evictions", "refreshes", "refresh_failures"), 0
+        )
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], T],
+        ttl: Optional[float] = None,
+        family: Optional[Hashable] = None,
+    ) -> T:
+        """获取缓存的结果，不存在或已过期时调用loader加载
+
+        Args:
+            key: 查询的唯一标识
+            loader: 加载结果的函数，返回值应当不依赖DLL状态
+            ttl: 本条目的过期时间（秒），不指定则使用默认值
+            family: 新条目所属的分组，见family_keys()
+
+        Returns:
+            缓存的或新加载的结果
+        """
+        now = self._clock()
+        refresh = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry.value
+                if self._stale_while_revalidate and (
+                    self._max_stale is None or now < entry.expires_at + self._max_stale
+                ):
+                    self._entries.move_to_end(key)
+                    self._counters["stale_hits"] += 1
+                    if not entry.refreshing:
+                        entry.refreshing = refresh = True
+                    value = entry.value
+                else:
+                    entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+
+        if entry is not None:
+            if refresh:
+                thread = threading.Thread(
+                    target=self._refresh, args=(key, loader, ttl, family), daemon=True
+                )
+                thread.start()
+            return value
+
+        value = loader()
+        self.put(key, value, ttl, family)
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存结果，不加载也不计入命中统计
+
+        Args:
+            key: 查询的唯一标识
+
+        Returns:
+            缓存的结果，不存在或已过期时为None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.expires_at:
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def family_keys(self, family: Hashable) -> List[Hashable]:
+        """列出属于分组的键（可能已过期，取值时使用peek()）
+
+        Args:
+            family: 写入时指定的分组
+
+        Returns:
+            键的列表，按写入顺序
+        """
+        with self._lock:
+            return list(self._families.get(family, ()))
+
+    def _refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float],
+        family: Optional[Hashable],
+    ) -> None:
+        """后台刷新过期条目，失败时保留旧结果"""
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._counters["refresh_failures"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            if DEBUG:
+                print(f"刷新缓存条目 {key!r} 时出错: {e}")
+            return
+        with self._lock:
+            self._counters["refreshes"] += 1
+        self.put(key, value, ttl, family)
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        family: Optional[Hashable] = None,
+    ) -> None:
+        """写入缓存条目
+
+        Args:
+            key: 查询的唯一标识
+            value: 不依赖DLL状态的结果
+            ttl: 本条目的过期时间（秒），不指定则使用默认值
+            family: 条目所属的分组，见family_keys()
+        """
+        size = len(value) if hasattr(value, "__len__") else 1
+        if self._max_rows is not None and size > self._max_rows:
+            # 单个结果超过行数上限，不缓存
+            self.invalidate(key)
+            return
+        expires_at = self._clock() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at, family)
+            self._rows += size
+            if family is not None:
+                self._families.setdefault(family, {})[key] = None
+            self._evict()
+
+    def _remove(self, key: Hashable) -> Optional[_Entry]:
+        """删除条目并更新行数和分组（需持有锁）"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._rows -= entry.size
+        if entry.family is not None:
+            keys = self._families[entry.family]
+            del keys[key]
+            if not keys:
+                del self._families[entry.family]
+        return entry
+
+    def _evict(self) -> None:
+        """按LRU顺序淘汰条目直到满足上限（需持有锁）"""
+        while len(self._entries) > self._max_entries or (
+            self._max_rows is not None and self._rows > self._max_rows
+        ):
+            self._remove(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """删除缓存条目
+
+        Args:
+            key: 查询的唯一标识，None表示清空全部条目
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._families.clear()
+                self._rows = 0
+                return
+            self._remove(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.invalidate()
+
+    def __len__(self) -> int:
+        """缓存的条目数"""
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """是否缓存了指定查询（不论是否过期）"""
+        return key in self._entries
+
+    @property
+    def stats(self) -> CacheStats:
+        """缓存统计信息"""
+        with self._lock:
+            return CacheStats(entries=len(self._entries), rows=self._rows, **self._counters)
+
+
+# 默认缓存，由所有未指定缓存的with_cache()搜索共享
+_default_cache: Optional[QueryCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """获取默认缓存
+
+    Returns:
+        QueryCache实例
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = QueryCache()
+    return _default_cache
@@ -9,24 +9,28 @@ DLL loader module
 import os
 import ctypes
 import platform
-from typing import Union, Optional, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Union, Optional, Dict, Any, Iterator
 
 from ..exceptions import DLLNotFoundError, EverythingError, raise_for_error_code
 from ..utils.download import download_sdk_dll, get_architecture
 from ..constants import RequestFlag, ErrorCode
+from .backend import is_backend
 
 
 class DLLLoader:
     """Everything SDK DLL加载和管理类"""
 
-    def __init__(self, machine: Optional[int] = None):
+    def __init__(self, machine: Optional[int] = None, backend: Any = None):
         """初始化DLL加载器
 
         Args:
             machine: 系统架构(32或64)，如果不指定，将自动检测
+            backend: 替代Everything DLL的后端（如EmulatedDLL），不指定则加载真实DLL
         """
         self.machine = machine if machine is not None else get_architecture()
-        self.everything_dll = self._load_dll()
+        self.everything_dll = backend if backend is not None else self._load_dll()
         self._setup_function_types()
 
         # 获取版本信息
@@ -202,6 +206,10 @@ class DLLLoader:
 
 # 单例模式，保证只有一个DLL加载器实例
 _dll_loader_instance = None
+_dll_loader_lock = threading.Lock()
+
+# 通过set_backend安装的后端，None表示使用真实DLL
+_backend = None
 
 
 def get_dll_loader(machine: Optional[int] = None) -> DLLLoader:
@@ -215,5 +223,52 @@ def get_dll_loader(machine: Optional[int] = None) -> DLLLoader:
     """
     global _dll_loader_instance
     if _dll_loader_instance is None:
-        _dll_loader_instance = DLLLoader(machine)
+        with _dll_loader_lock:
+            # 双重检查，避免多个线程同时初始化
+            if _dll_loader_instance is None:
+                _dll_loader_instance = DLLLoader(machine, backend=_backend)
     return _dll_loader_instance
+
+
+def set_backend(backend: Any) -> None:
+    """安装搜索后端，之后的Search、ResultSet、EverythingAPI和EveryTools都将使用它
+
+    Args:
+        backend: 满足EverythingBackend协议的对象，None表示恢复使用真实DLL
+
+    Raises:
+        EverythingError: 如果对象不满足后端协议
+    """
+    global _backend, _dll_loader_instance
+    if backend is not None and not is_backend(backend):
+        raise EverythingError(f"{type(backend).__name__} 不满足Everything后端协议")
+    with _dll_loader_lock:
+        _backend = backend
+        _dll_loader_instance = None
+
+
+def get_backend() -> Any:
+    """获取通过set_backend安装的后端
+
+    Returns:
+        后端对象，未安装时返回None
+    """
+    return _backend
+
+
+@contextmanager
+def use_backend(backend: Any) -> Iterator[Any]:
+    """在with块内临时使用指定后端
+
+    Args:
+        backend: 满足EverythingBackend协议的对象
+
+    Yields:
+        安装的后端
+    """
+    previous = _backend
+    set_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
@@ -0,0 +1,739 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Everything DLL模拟器模块
+In-process emulator of the Everything DLL
+
+EmulatedDLL用纯Python实现Everything SDK的Everything_*函数，基于可配置的合成文件表应答查询。
+每个函数都支持注入延迟和错误码，使Search、SearchBuilder、ResultSet和EveryTools
+可以在非Windows环境下原样运行，并得到可复现的吞吐量数据。
+"""
+
+import random
+import time
+from collections import Counter
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ..constants import ErrorCode, FileAttribute, RequestFlag, SortType
+from .backend import BACKEND_FUNCTIONS, EverythingBackend
+from .query_compiler import UNKNOWN_VALUE, compile_query
+from .query_parser import Modifier, Text, parse_query, query_functions
+
+# FILETIME起点(1601-01-01)到Unix纪元的100纳秒数
+FILETIME_EPOCH_OFFSET = 116444736000000000
+FILETIME_TICKS_PER_SECOND = 10000000
+
+# Everything_SetMax的默认值（不限制）
+MAX_RESULTS_UNLIMITED = 0xFFFFFFFF
+
+DEFAULT_REQUEST_FLAGS = RequestFlag.FILE_NAME | RequestFlag.PATH
+
+# 函数失败时的返回值，未列出的函数返回0
+_FAILURE_VALUES = {
+    "Everything_GetSearchW": None,
+    "Everything_GetResultFileNameW": None,
+    "Everything_GetResultPathW": None,
+    "Everything_GetResultFullPathNameW": None,
+    "Everything_GetResultExtensionW": None,
+    "Everything_GetResultFileListFileNameW": None,
+    "Everything_GetResultHighlightedFileNameW": None,
+    "Everything_GetResultHighlightedPathW": None,
+    "Everything_GetResultHighlightedFullPathAndFileNameW": None,
+    "Everything_GetReplyWindow": None,
+}
+
+# 不受错误注入影响的函数
+_UNINJECTABLE = ("Everything_GetLastError",)
+
+class EmulatedFile(NamedTuple):
+    """合成文件表中的一项，所有日期均为FILETIME整数"""
+
+    name: str
+    path: str
+    size: int = UNKNOWN_VALUE
+    date_created: int = 0
+    date_modified: int = 0
+    date_accessed: int = 0
+    attributes: int = FileAttribute.ARCHIVE
+    is_folder: bool = False
+    is_volume: bool = False
+    run_count: int = 0
+    date_run: int = 0
+    date_recently_changed: int = 0
+
+    @property
+    def full_path(self) -> str:
+        """完整路径（包含文件名）"""
+        if not self.path:
+            return self.name
+        if self.path.endswith("\\"):
+            return self.path + self.name
+        return self.path + "\\" + self.name
+
+    @property
+    def extension(self) -> str:
+        """扩展名（不含点），文件夹没有扩展名"""
+        if self.is_folder or self.is_volume:
+            return ""
+        _, dot, ext = self.name.rpartition(".")
+        return ext if dot else ""
+
+
+def timestamp_to_filetime(timestamp: float) -> int:
+    """将Unix时间戳转换为FILETIME整数"""
+    return int(timestamp * FILETIME_TICKS_PER_SECOND) + FILETIME_EPOCH_OFFSET
+
+
+_NAME_WORDS = (
+    "report", "invoice", "photo", "video", "backup", "notes", "project", "setup",
+    "readme", "config", "data", "draft", "music", "archive", "build", "design",
+    "main", "test", "log", "summary",
+)
+_DIR_WORDS = (
+    "Users", "dev", "Documents", "Pictures", "Music", "Videos", "projects",
+    "archive", "Downloads", "tmp", "alpha", "beta", "src", "data",
+)
+_EXTENSIONS = (
+    "txt", "pdf", "docx", "xlsx", "py", "jpg", "png", "mp3", "mp4", "zip",
+    "exe", "log", "json", "csv", "md",
+)
+
+
+def generate_file_table(
+    count: int = 10000,
+    seed: int = 0,
+    roots: Iterable[str] = ("C:\\", "D:\\"),
+    folder_ratio: float = 0.1,
+) -> List[EmulatedFile]:
+    """生成确定性的合成文件表
+
+    Args:
+        count: 条目数量
+        seed: 随机种子，相同种子生成相同的文件表
+        roots: 卷根目录
+        folder_ratio: 文件夹所占比例
+
+    Returns:
+        EmulatedFile列表
+    """
+    rng = random.Random(seed)
+    roots = tuple(roots)
+    start = 1420070400  # 2015-01-01
+    span = 315532800  # 10年
+    files = []
+    for i in range(count):
+        depth = rng.randint(1, 4)
+        path = rng.choice(roots) + "\\".join(rng.choice(_DIR_WORDS) for _ in range(depth))
+        created = start + rng.random() * span
+        modified = created + rng.random() * (start + span - created)
+        accessed = modified + rng.random() * (start + span - modified)
+        if rng.random() < folder_ratio:
+            files.append(
+                EmulatedFile(
+                    name=f"{rng.choice(_DIR_WORDS)}_{i}",
+                    path=path,
+                    date_created=timestamp_to_filetime(created),
+                    date_modified=timestamp_to_filetime(modified),
+                    date_accessed=timestamp_to_filetime(accessed),
+                    attributes=FileAttribute.DIRECTORY,
+                    is_folder=True,
+                    date_recently_changed=timestamp_to_filetime(modified),
+                )
+            )
+            continue
+        run_count = rng.randint(0, 20) if rng.random() < 0.2 else 0
+        files.append(
+            EmulatedFile(
+                name=f"{rng.choice(_NAME_WORDS)}_{i}.{rng.choice(_EXTENSIONS)}",
+                path=path,
+                size=int(rng.paretovariate(1.2) * 1024),
+                date_created=timestamp_to_filetime(created),
+                date_modified=timestamp_to_filetime(modified),
+                date_accessed=timestamp_to_filetime(accessed),
+                run_count=run_count,
+                date_run=timestamp_to_filetime(accessed) if run_count else 0,
+                date_recently_changed=timestamp_to_filetime(modified),
+            )
+        )
+    return files
+
+
+# ========== 查询匹配 ==========
+
+
+def compile_search(
+    search: str,
+    match_case: bool = False,
+    match_path: bool = False,
+    match_whole_word: bool = False,
+    regex: bool = False,
+    nonempty_folders: Optional[AbstractSet[str]] = None,
+) -> Tuple[Callable[[EmulatedFile], bool], List[str]]:
+    """将搜索字符串编译为模拟器使用的谓词
+
+    语法解析和编译见query_parser和query_compiler；模拟器不支持的搜索函数（content:、dupe:等）视为总是匹配。
+
+    Args:
+        search: 搜索字符串
+        match_case: 是否区分大小写
+        match_path: 是否匹配完整路径
+        match_whole_word: 是否全字匹配
+        regex: 是否把整个搜索字符串作为正则表达式
+        nonempty_folders: 包含子项的文件夹的完整路径（小写），用于empty:
+
+    Returns:
+        (谓词, 高亮词列表)
+    """
+    compiled = compile_query(
+        search, match_case, match_path, match_whole_word, regex, nonempty_folders
+    )
+    return compiled, compiled.highlights
+
+
+# ========== 排序 ==========
+
+
+def _size_sort_value(f: EmulatedFile) -> int:
+    return -1 if f.size == UNKNOWN_VALUE else f.size
+
+
+_SORT_KEYS: Dict[int, Callable[[EmulatedFile], Any]] = {
+    SortType.NAME_ASCENDING: lambda f: f.name.lower(),
+    SortType.PATH_ASCENDING: lambda f: (f.path.lower(), f.name.lower()),
+    SortType.SIZE_ASCENDING: _size_sort_value,
+    SortType.EXTENSION_ASCENDING: lambda f: f.extension.lower(),
+    SortType.TYPE_NAME_ASCENDING: lambda f: (not f.is_folder, f.extension.lower()),
+    SortType.DATE_CREATED_ASCENDING: lambda f: f.date_created,
+    SortType.DATE_MODIFIED_ASCENDING: lambda f: f.date_modified,
+    SortType.ATTRIBUTES_ASCENDING: lambda f: f.attributes,
+    SortType.FILE_LIST_FILENAME_ASCENDING: lambda f: f.name.lower(),
+    SortType.RUN_COUNT_ASCENDING: lambda f: f.run_count,
+    SortType.DATE_RECENTLY_CHANGED_ASCENDING: lambda f: f.date_recently_changed,
+    SortType.DATE_ACCESSED_ASCENDING: lambda f: f.date_accessed,
+    SortType.DATE_RUN_ASCENDING: lambda f: f.date_run,
+}
+
+
+def sort_files(files: List[EmulatedFile], sort_type: int) -> List[EmulatedFile]:
+    """按Everything排序类型排序，同值时按名称排序"""
+    sort_type = int(sort_type)
+    ascending = sort_type if sort_type % 2 == 1 else sort_type - 1
+    key = _SORT_KEYS.get(ascending, _SORT_KEYS[SortType.NAME_ASCENDING])
+    return sorted(
+        files, key=lambda f: (key(f), f.name.lower()), reverse=sort_type % 2 == 0
+    )
+
+
+# ========== 模拟DLL ==========
+
+
+def _store(buffer: Any, value: int) -> None:
+    """写入输出参数，兼容c_ulonglong、ctypes.byref和ctypes.pointer"""
+    target = getattr(buffer, "_obj", None)
+    if target is None:
+        target = getattr(buffer, "contents", buffer)
+    target.value = value
+
+
+class _EmulatedFunction:
+    """模拟ctypes函数指针：可调用，并允许设置argtypes/restype"""
+
+    def __init__(self, dll: "EmulatedDLL", name: str, impl: Callable[..., Any]):
+        self.__name__ = name
+        self._dll = dll
+        self._impl = impl
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args: Any) -> Any:
+        return self._dll._invoke(self.__name__, self._impl, args)
+
+    def __repr__(self) -> str:
+        return f"<EmulatedFunction {self.__name__}>"
+
+
+class EmulatedDLL(EverythingBackend):
+    """Everything DLL的纯Python模拟实现
+
+    与真实DLL一样，所有查询状态都是进程内共享的全局状态，本类不做任何加锁。
+    """
+
+    def __init__(
+        self,
+        files: Optional[Iterable[EmulatedFile]] = None,
+        file_count: int = 10000,
+        seed: int = 0,
+        latency: Union[float, Dict[str, float], None] = None,
+        errors: Optional[Dict[str, int]] = None,
+        db_loaded: bool = True,
+    ):
+        """初始化模拟DLL
+
+        Args:
+            files: 文件表，如果不指定，将用generate_file_table生成
+            file_count: 生成的文件表条目数量
+            seed: 生成文件表的随机种子
+            latency: 每次调用的延迟（秒），可以是统一值或{函数名: 秒}字典
+            errors: 持续注入的错误码，{函数名: 错误码}
+            db_loaded: Everything_IsDBLoaded的返回值
+        """
+        self._files = (
+            list(files) if files is not None else generate_file_table(file_count, seed)
+        )
+        self._db_loaded = db_loaded
+        self.call_counts: Counter = Counter()
+
+        self._default_latency = 0.0
+        self._latency: Dict[str, float] = {}
+        if isinstance(latency, dict):
+            self._latency.update(latency)
+        elif latency:
+            self._default_latency = float(latency)
+
+        # 函数名 -> [错误码, 剩余次数(None表示持续)]
+        self._errors: Dict[str, List[Any]] = {}
+        for name, code in (errors or {}).items():
+            self.inject_error(code, name, times=None)
+
+        self._run_history: Dict[str, int] = {}
+        self._last_error = ErrorCode.EVERYTHING_OK
+        self._reply_window = None
+        self._reply_id = 0
+        self._reset_state()
+
+        # 用可设置argtypes/restype的函数对象覆盖方法，与ctypes.WinDLL保持一致
+        for name in BACKEND_FUNCTIONS:
+            setattr(self, name, _EmulatedFunction(self, name, getattr(self, name)))
+
+    # ========== 模拟控制 ==========
+
+    @property
+    def files(self) -> List[EmulatedFile]:
+        """当前文件表"""
+        return self._files
+
+    def set_files(self, files: Iterable[EmulatedFile]) -> None:
+        """替换文件表，对之后的查询生效"""
+        self._files = list(files)
+
+    def set_latency(self, seconds: float, function: Optional[str] = None) -> None:
+        """设置调用延迟
+
+        Args:
+            seconds: 延迟秒数
+            function: 函数名，不指定则设置所有函数的默认延迟
+        """
+        if function is None:
+            self._default_latency = float(seconds)
+        else:
+            self._latency[function] = float(seconds)
+
+    def inject_error(
+        self,
+        code: int,
+        function: str = "Everything_QueryW",
+        times: Optional[int] = 1,
+    ) -> None:
+        """注入错误码
+
+        Args:
+            code: 错误码（ErrorCode）
+            function: 出错的函数名
+            times: 出错次数，None表示一直出错
+        """
+        if function not in BACKEND_FUNCTIONS or function in _UNINJECTABLE:
+            raise ValueError(f"无法向 {function} 注入错误")
+        self._errors[function] = [int(code), times]
+
+    def clear_errors(self) -> None:
+        """清除所有注入的错误"""
+        self._errors.clear()
+
+    def reset_call_counts(self) -> None:
+        """清零调用计数"""
+        self.call_counts.clear()
+
+    def _invoke(self, name: str, impl: Callable[..., Any], args: Tuple) -> Any:
+        self.call_counts[name] += 1
+        delay = self._latency.get(name, self._default_latency)
+        if delay:
+            time.sleep(delay)
+        injected = self._errors.get(name)
+        if injected is not None:
+            code, remaining = injected
+            if remaining is not None:
+                if remaining <= 1:
+                    del self._errors[name]
+                else:
+                    injected[1] = remaining - 1
+            self._last_error = code
+            return _FAILURE_VALUES.get(name, 0)
+        return impl(*args)
+
+    def _reset_state(self) -> None:
+        self._search = ""
+        self._match_path = False
+        self._match_case = False
+        self._match_whole_word = False
+        self._regex = False
+        self._max = MAX_RESULTS_UNLIMITED
+        self._offset = 0
+        self._sort = int(SortType.NAME_ASCENDING)
+        self._request_flags = int(DEFAULT_REQUEST_FLAGS)
+        self._results: Optional[List[EmulatedFile]] = None
+        self._result_sort = 0
+        self._result_flags = 0
+        self._highlights: List[str] = []
+        self._tot_files = 0
+        self._tot_folders = 0
+
+    def _result(self, index: int, flag: int = 0) -> Optional[EmulatedFile]:
+        """读取结果项，按SDK规则设置错误码"""
+        if self._results is None:
+            self._last_error = ErrorCode.EVERYTHING_ERROR_INVALIDCALL
+            return None
+        if index < 0 or index >= len(self._results):
+            self._last_error = ErrorCode.EVERYTHING_ERROR_INVALIDINDEX
+            return None
+        if flag and not self._result_flags & flag:
+            self._last_error = ErrorCode.EVERYTHING_ERROR_INVALIDREQUEST
+            return None
+        return self._results[index]
+
+    def _highlight(self, text: str) -> str:
+        """用*包裹匹配部分，与Everything的高亮格式一致"""
+        for term in self._highlights:
+            start = text.lower().find(term.lower())
+            if start >= 0:
+                end = start + len(term)
+                return f"{text[:start]}*{text[start:end]}*{text[end:]}"
+        return text
+
+    # ========== 操作搜索状态 ==========
+
+    def Everything_SetSearchW(self, search: str) -> None:
+        self._search = search or ""
+
+    def Everything_SetMatchPath(self, enable: bool) -> None:
+        self._match_path = bool(enable)
+
+    def Everything_SetMatchCase(self, enable: bool) -> None:
+        self._match_case = bool(enable)
+
+    def Everything_SetMatchWholeWord(self, enable: bool) -> None:
+        self._match_whole_word = bool(enable)
+
+    def Everything_SetRegex(self, enable: bool) -> None:
+        self._regex = bool(enable)
+
+    def Everything_SetMax(self, max_results: int) -> None:
+        self._max = int(max_results)
+
+    def Everything_SetOffset(self, offset: int) -> None:
+        self._offset = int(offset)
+
+    def Everything_SetSort(self, sort_type: int) -> None:
+        self._sort = int(sort_type)
+
+    def Everything_SetRequestFlags(self, flags: int) -> None:
+        self._request_flags = int(flags)
+
+    def Everything_SetReplyWindow(self, window_handle: Any) -> None:
+        self._reply_window = window_handle
+
+    def Everything_SetReplyID(self, reply_id: int) -> None:
+        self._reply_id = int(reply_id)
+
+    # ========== 读取搜索状态 ==========
+
+    def Everything_GetSearchW(self) -> Optional[str]:
+        return self._search
+
+    def Everything_GetMatchPath(self) -> bool:
+        return self._match_path
+
+    def Everything_GetMatchCase(self) -> bool:
+        return self._match_case
+
+    def Everything_GetMatchWholeWord(self) -> bool:
+        return self._match_whole_word
+
+    def Everything_GetRegex(self) -> bool:
+        return self._regex
+
+    def Everything_GetMax(self) -> int:
+        return self._max
+
+    def Everything_GetOffset(self) -> int:
+        return self._offset
+
+    def Everything_GetSort(self) -> int:
+        return self._sort
+
+    def Everything_GetRequestFlags(self) -> int:
+        return self._request_flags
+
+    def Everything_GetReplyWindow(self) -> Any:
+        return self._reply_window
+
+    def Everything_GetReplyID(self) -> int:
+        return self._reply_id
+
+    def Everything_GetLastError(self) -> int:
+        return int(self._last_error)
+
+    # ========== 执行查询 ==========
+
+    def Everything_QueryW(self, wait: bool) -> bool:
+        # 模拟器没有消息循环，wait=False时同样同步完成查询
+        query = Modifier("regex", Text(self._search)) if self._regex else parse_query(self._search)
+        nonempty_folders = None
+        if "empty" in query_functions(query):
+            # empty:需要知道哪些文件夹包含子项
+            nonempty_folders = {f.path.lower().rstrip("\\") for f in self._files}
+        compiled = compile_query(
+            query,
+            self._match_case,
+            self._match_path,
+            self._match_whole_word,
+            self._regex,
+            nonempty_folders,
+        )
+        self._highlights = compiled.highlights
+        matches = sort_files(compiled.filter(self._files), self._sort)
+        self._tot_folders = sum(1 for f in matches if f.is_folder)
+        self._tot_files = len(matches) - self._tot_folders
+        self._results = matches[self._offset : self._offset + self._max]
+        self._result_sort = self._sort
+        self._result_flags = self._request_flags
+        self._last_error = ErrorCode.EVERYTHING_OK
+        return True
+
+    def Everything_IsQueryReply(
+        self, message: int, wparam: int, lparam: int, reply_id: int
+    ) -> bool:
+        return False
+
+    # ========== 操作结果 ==========
+
+    def Everything_SortResultsByPath(self) -> None:
+        if self._results is not None:
+            self._results = sort_files(self._results, SortType.PATH_ASCENDING)
+            self._result_sort = int(SortType.PATH_ASCENDING)
+
+    def Everything_Reset(self) -> None:
+        self._reset_state()
+
+    def Everything_CleanUp(self) -> None:
+        self._reset_state()
+
+    # ========== 读取结果 ==========
+
+    def Everything_GetNumResults(self) -> int:
+        return len(self._results) if self._results is not None else 0
+
+    def Everything_GetNumFileResults(self) -> int:
+        if self._results is None:
+            return 0
+        return sum(1 for f in self._results if not f.is_folder)
+
+    def Everything_GetNumFolderResults(self) -> int:
+        if self._results is None:
+            return 0
+        return sum(1 for f in self._results if f.is_folder)
+
+    def Everything_GetTotResults(self) -> int:
+        return self._tot_files + self._tot_folders
+
+    def Everything_GetTotFileResults(self) -> int:
+        return self._tot_files
+
+    def Everything_GetTotFolderResults(self) -> int:
+        return self._tot_folders
+
+    def Everything_GetResultListSort(self) -> int:
+        return self._result_sort
+
+    def Everything_GetResultListRequestFlags(self) -> int:
+        return self._result_flags
+
+    def Everything_IsFileResult(self, index: int) -> bool:
+        item = self._result(index)
+        return item is not None and not item.is_folder and not item.is_volume
+
+    def Everything_IsFolderResult(self, index: int) -> bool:
+        item = self._result(index)
+        return item is not None and item.is_folder
+
+    def Everything_IsVolumeResult(self, index: int) -> bool:
+        item = self._result(index)
+        return item is not None and item.is_volume
+
+    def Everything_GetResultFileNameW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.FILE_NAME)
+        return item.name if item is not None else None
+
+    def Everything_GetResultPathW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.PATH)
+        return item.path if item is not None else None
+
+    def Everything_GetResultFullPathNameW(self, index: int, *args: Any) -> Any:
+        item = self._result(index)
+        if item is not None and not (
+            self._result_flags & RequestFlag.FULL_PATH_AND_FILE_NAME
+            or (
+                self._result_flags & RequestFlag.FILE_NAME
+                and self._result_flags & RequestFlag.PATH
+            )
+        ):
+            self._last_error = ErrorCode.EVERYTHING_ERROR_INVALIDREQUEST
+            item = None
+        full_path = item.full_path if item is not None else None
+        if not args:
+            return full_path
+        # SDK签名：(index, buffer, buffer_size)，返回写入的字符数
+        buffer, size = args[0], args[1] if len(args) > 1 else None
+        if full_path is None:
+            return 0
+        if size is not None:
+            full_path = full_path[: max(int(size) - 1, 0)]
+        if buffer is not None:
+            buffer.value = full_path
+        return len(full_path)
+
+    def Everything_GetResultExtensionW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.EXTENSION)
+        return item.extension if item is not None else None
+
+    def _get_result_value(self, index: int, flag: int, buffer: Any, field: str) -> bool:
+        item = self._result(index, flag)
+        if item is None:
+            return False
+        _store(buffer, getattr(item, field))
+        return True
+
+    def Everything_GetResultSize(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(index, RequestFlag.SIZE, buffer, "size")
+
+    def Everything_GetResultDateCreated(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(
+            index, RequestFlag.DATE_CREATED, buffer, "date_created"
+        )
+
+    def Everything_GetResultDateModified(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(
+            index, RequestFlag.DATE_MODIFIED, buffer, "date_modified"
+        )
+
+    def Everything_GetResultDateAccessed(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(
+            index, RequestFlag.DATE_ACCESSED, buffer, "date_accessed"
+        )
+
+    def Everything_GetResultDateRun(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(index, RequestFlag.DATE_RUN, buffer, "date_run")
+
+    def Everything_GetResultDateRecentlyChanged(self, index: int, buffer: Any) -> bool:
+        return self._get_result_value(
+            index,
+            RequestFlag.DATE_RECENTLY_CHANGED,
+            buffer,
+            "date_recently_changed",
+        )
+
+    def Everything_GetResultAttributes(self, index: int) -> int:
+        item = self._result(index, RequestFlag.ATTRIBUTES)
+        return int(item.attributes) if item is not None else 0
+
+    def Everything_GetResultRunCount(self, index: int) -> int:
+        item = self._result(index, RequestFlag.RUN_COUNT)
+        return item.run_count if item is not None else 0
+
+    def Everything_GetResultFileListFileNameW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.FILE_LIST_FILE_NAME)
+        return "" if item is not None else None
+
+    def Everything_GetResultHighlightedFileNameW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.HIGHLIGHTED_FILE_NAME)
+        return self._highlight(item.name) if item is not None else None
+
+    def Everything_GetResultHighlightedPathW(self, index: int) -> Optional[str]:
+        item = self._result(index, RequestFlag.HIGHLIGHTED_PATH)
+        return self._highlight(item.path) if item is not None else None
+
+    def Everything_GetResultHighlightedFullPathAndFileNameW(
+        self, index: int
+    ) -> Optional[str]:
+        item = self._result(index, RequestFlag.HIGHLIGHTED_FULL_PATH_AND_FILE_NAME)
+        return self._highlight(item.full_path) if item is not None else None
+
+    # ========== 运行历史 ==========
+
+    def Everything_GetRunCountFromFileNameW(self, file_name: str) -> int:
+        return self._run_history.get(file_name.lower(), 0)
+
+    def Everything_SetRunCountFromFileNameW(self, file_name: str, run_count: int) -> bool:
+        self._run_history[file_name.lower()] = int(run_count)
+        return True
+
+    def Everything_IncRunCountFromFileNameW(self, file_name: str) -> int:
+        key = file_name.lower()
+        self._run_history[key] = self._run_history.get(key, 0) + 1
+        return self._run_history[key]
+
+    def Everything_SaveRunHistory(self) -> bool:
+        return True
+
+    def Everything_DeleteRunHistory(self) -> bool:
+        self._run_history.clear()
+        return True
+
+    # ========== 常规功能 ==========
+
+    def Everything_GetMajorVersion(self) -> int:
+        return 1
+
+    def Everything_GetMinorVersion(self) -> int:
+        return 4
+
+    def Everything_GetRevision(self) -> int:
+        return 1
+
+    def Everything_GetBuildNumber(self) -> int:
+        return 0
+
+    def Everything_GetTargetMachine(self) -> int:
+        return 2  # EVERYTHING_TARGET_MACHINE_X64
+
+    def Everything_IsDBLoaded(self) -> bool:
+        return self._db_loaded
+
+    def Everything_IsAdmin(self) -> bool:
+        return False
+
+    def Everything_IsAppData(self) -> bool:
+        return False
+
+    def Everything_RebuildDB(self) -> bool:
+        return True
+
+    def Everything_UpdateAllFolderIndexes(self) -> bool:
+        return True
+
+    def Everything_SaveDB(self) -> bool:
+        return True
+
+    def Everything_Exit(self) -> bool:
+        return True
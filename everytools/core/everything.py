@@ -60,9 +60,11 @@ class Everything:
             math_case=self._match_case,
             whole_world=self._match_whole_word,
             regex=self._regex,
+            sort_type=self._sort_type,
+            max_num=self._max_results,
         )
 
-        return self._et.results(max_num=self._max_results, sort_type=self._sort_type)
+        return self._et.results()
 
     def __enter__(self):
         return self
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+查询执行器模块
+Thread-safe query executor module
+
+Everything SDK把所有查询状态保存在进程内的全局DLL状态中，多个线程同时设置搜索参数会互相覆盖。
+QueryExecutor独占DLL会话，把"设置参数+查询+读取结果"作为一个整体串行执行，
+并让同时进行的相同查询共享一次执行和一份已读取的结果（single-flight）。
+会话锁属于DLL状态本身（后端对象或已加载的DLL），使用同一DLL状态的所有执行器共用一把锁。
+"""
+
+import ctypes
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple, TypeVar
+
+from .dll_loader import DLLLoader, get_dll_loader
+
+T = TypeVar("T")
+
+class DLLState:
+    """一份DLL状态（后端对象或已加载的DLL）的会话锁和查询代数"""
+
+    __slots__ = ("lock", "generation")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # 每次执行查询或改变DLL中的结果列表时更新，用于检测基于旧查询的结果
+        self.generation = 0
+
+
+# DLL状态登记表。后端对象按弱引用保存；ctypes加载的DLL按模块句柄保存，
+# 同一DLL文件多次加载得到的句柄相同，共享同一份全局状态
+_states: "weakref.WeakKeyDictionary[Any, DLLState]" = weakref.WeakKeyDictionary()
+_handle_states: Dict[int, DLLState] = {}
+_strong_states: Dict[int, Tuple[Any, DLLState]] = {}
+_states_lock = threading.Lock()
+
+
+def dll_state(dll: Any) -> DLLState:
+    """获取DLL的状态对象
+
+    同一个后端对象（或同一个DLL模块）总是得到同一个状态对象，不论经过哪个DLLLoader或QueryExecutor访问。
+
+    Args:
+        dll: DLLLoader.everything_dll，即后端对象或ctypes加载的DLL
+
+    Returns:
+        DLLState实例
+    """
+    with _states_lock:
+        if isinstance(dll, ctypes.CDLL):
+            return _handle_states.setdefault(dll._handle, DLLState())
+        try:
+            state = _states.get(dll)
+            if state is None:
+                state = _states[dll] = DLLState()
+            return state
+        except TypeError:
+            # 不支持弱引用的后端对象
+            return _strong_states.setdefault(id(dll), (dll, DLLState()))[1]
+
+
+def session_lock(dll: Any) -> threading.RLock:
+    """获取DLL状态的会话锁，使用同一DLL状态的所有执行器共用
+
+    Args:
+        dll: DLLLoader.everything_dll
+
+    Returns:
+        可重入锁
+    """
+    return dll_state(dll).lock
+
+
+class _Flight:
+    """一次正在进行的查询，相同查询的等待者共享其结果"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class QueryExecutor:
+    """线程安全的查询执行器"""
+
+    def __init__(self, dll_loader: Optional[DLLLoader] = None):
+        """初始化执行器
+
+        Args:
+            dll_loader: 使用的DLL加载器，不指定则每次执行时使用get_dll_loader()的当前实例
+        """
+        self._dll_loader = dll_loader
+        self._flights_lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    @property
+    def dll_loader(self) -> DLLLoader:
+        """当前使用的DLL加载器"""
+        return self._dll_loader if self._dll_loader is not None else get_dll_loader()
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """独占DLL会话
+
+        with块内其他线程无法通过任何使用同一DLL状态的执行器访问DLL。
+
+        Yields:
+            Everything DLL实例
+        """
+        dll = self.dll_loader.everything_dll
+        with session_lock(dll):
+            yield dll
+
+    def run(self, key: Optional[Hashable], task: Callable[[Any], T]) -> T:
+        """在独占会话中执行任务，相同key的并发任务只执行一次
+
+        Args:
+            key: 查询的唯一标识，None表示不合并
+            task: 以DLL实例为参数的任务，应在内部完成查询并读取全部结果
+
+        Returns:
+            任务的返回值；被合并的调用返回同一个对象
+        """
+        if key is None:
+            with self.session() as dll:
+                self._executed += 1
+                return task(dll)
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            with self.session() as dll:
+                self._executed += 1
+                flight.result = task(dll)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.event.set()
+        return flight.result
+
+    @property
+    def executed(self) -> int:
+        """实际执行的任务数"""
+        return self._executed
+
+    @property
+    def coalesced(self) -> int:
+        """被合并到其他相同查询的调用数"""
+        return self._coalesced
+
+
+# 默认执行器，由所有未指定执行器的搜索共享
+_default_executor: Optional[QueryExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_executor() -> QueryExecutor:
+    """获取默认执行器
+
+    Returns:
+        QueryExecutor实例
+    """
+    global _default_executor
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = QueryExecutor()
+    return _default_executor
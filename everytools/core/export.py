@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流式导出模块
+Streaming CSV, JSON Lines and Parquet export module
+
+导出时按块读取列数据并立即写出，内存中只保留一块，导出任意数量的结果占用的内存都相同。
+日期由原始FILETIME按整数运算格式化，不为每个值创建datetime对象。
+Parquet需要pyarrow，zstd压缩需要Python 3.14+或zstandard，都只在使用时导入。
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from array import array
+from contextlib import ExitStack
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..utils.time_utils import convert_filetimes, max_valid_filetime
+from .arrow import columns_to_arrow, import_pyarrow
+from .result import COLUMNS, UNKNOWN_SIZE
+
+# 支持的导出格式
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# csv和jsonl中日期的格式：原始FILETIME、Unix时间戳、UTC的ISO 8601字符串或本地时间字符串
+EXPORT_DATE_FORMATS = ("raw", "epoch", "iso", "str")
+
+# 支持的压缩方式
+COMPRESSIONS = ("gzip", "zstd")
+
+# 文件扩展名 -> 导出格式 / 压缩方式
+FORMAT_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+ExportTarget = Union[str, "os.PathLike[str]", IO[Any]]
+
+
+def detect_format(path: Union[str, "os.PathLike[str]"]) -> Tuple[Optional[str], Optional[str]]:
+    """根据文件名判断导出格式和压缩方式
+
+    Args:
+        path: 文件路径，例如"files.csv.gz"
+
+    Returns:
+        (导出格式, 压缩方式)，无法判断的部分为None
+    """
+    root, suffix = os.path.splitext(os.fspath(path).lower())
+    compression = COMPRESSION_SUFFIXES.get(suffix)
+    if compression:
+        suffix = os.path.splitext(root)[1]
+    return FORMAT_SUFFIXES.get(suffix), compression
+
+
+def _zstd_writer(stream: IO[bytes]) -> Any:
+    """创建写入stream的zstd压缩流，关闭时不关闭stream"""
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd压缩需要zstandard，请先安装: pip install zstandard") from e
+        return zstandard.ZstdCompressor().stream_writer(stream, closefd=False)
+    return zstd.ZstdFile(stream, mode="wb")
+
+
+def _open_binary(stack: ExitStack, target: ExportTarget, compression: Optional[str]) -> IO[bytes]:
+    """打开写入目标，按需套上压缩流；由stack负责关闭自己打开的对象"""
+    if isinstance(target, (str, os.PathLike)):
+        stream = stack.enter_context(open(target, "wb"))
+    else:
+        stream = target
+    if compression == "gzip":
+        stream = stack.enter_context(gzip.GzipFile(fileobj=stream, mode="wb"))
+    elif compression == "zstd":
+        stream = stack.enter_context(_zstd_writer(stream))
+    return stream
+
+
+def _open_text(stack: ExitStack, target: ExportTarget, compression: Optional[str]) -> IO[str]:
+    """打开文本写入目标，文本流直接使用，其他目标按UTF-8编码写入"""
+    if isinstance(target, io.TextIOBase):
+        if compression:
+            raise ValueError("压缩输出需要二进制流或文件路径")
+        return target
+    wrapper = io.TextIOWrapper(_open_binary(stack, target, compression), encoding="utf-8", newline="")
+    # 结束时先刷新并分离文本层，不关闭调用方传入的流
+    stack.callback(wrapper.detach)
+    return wrapper
+
+
+def _empty_chunk(names: List[str]) -> Dict[str, Any]:
+    """创建没有行的列数据，用于写出空结果的表头或schema"""
+    return {
+        name: [] if COLUMNS[name][1] is None else array(COLUMNS[name][1])
+        for name in names
+    }
+
+
+def _text_columns(
+    chunk: Dict[str, Any], dates: str, max_ticks: int, booleans: bool
+) -> List[List[Any]]:
+    """把一块列数据转换为可写出的值，未知的大小和日期为None"""
+    values = []
+    for name, data in chunk.items():
+        typecode = COLUMNS[name][1]
+        if typecode is None or typecode == "I":
+            values.append(data)
+        elif typecode == "B":
+            values.append([bool(value) for value in data] if booleans else data)
+        elif name.startswith("date_"):
+            if dates == "raw":
+                values.append(data)
+            else:
+                values.append(convert_filetimes(data, dates, max_ticks))
+        else:
+            values.append([None if value == UNKNOWN_SIZE else value for value in data])
+    return values
+
+
+def _write_csv(stream: IO[str], names: List[str], chunks: Iterable[Dict[str, Any]], dates: str) -> int:
+    """写出CSV，返回行数"""
+    writer = csv.writer(stream)
+    writer.writerow(names)
+    max_ticks = max_valid_filetime()
+    rows = 0
+    for chunk in chunks:
+        columns = _text_columns(chunk, dates, max_ticks, booleans=False)
+        writer.writerows(zip(*columns))
+        rows += len(columns[0]) if columns else 0
+    return rows
+
+
+def _write_jsonl(stream: IO[str], names: List[str], chunks: Iterable[Dict[str, Any]], dates: str) -> int:
+    """写出JSON Lines，返回行数"""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    max_ticks = max_valid_filetime()
+    rows = 0
+    for chunk in chunks:
+        columns = _text_columns(chunk, dates, max_ticks, booleans=True)
+        lines = [encode(dict(zip(names, row))) for row in zip(*columns)]
+        if lines:
+            stream.write("\n".join(lines))
+            stream.write("\n")
+        rows += len(lines)
+    return rows
+
+
+def _write_parquet(
+    target: ExportTarget,
+    names: List[str],
+    chunks: Iterable[Dict[str, Any]],
+    compression: Optional[str],
+) -> int:
+    """写出Parquet，每块一个行组，返回行数"""
+    import_pyarrow()
+    import pyarrow.parquet as pq
+
+    if isinstance(target, os.PathLike):
+        target = os.fspath(target)
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = columns_to_arrow(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema, compression=compression or "snappy")
+            writer.write_table(table)
+            rows += table.num_rows
+        if writer is None:
+            table = columns_to_arrow(_empty_chunk(names))
+            writer = pq.ParquetWriter(target, table.schema, compression=compression or "snappy")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_columns(
+    names: List[str],
+    chunks: Iterable[Dict[str, Any]],
+    target: ExportTarget,
+    format: Optional[str] = None,
+    dates: str = "iso",
+    compression: Optional[str] = None,
+) -> int:
+    """把按块读取的列数据流式写出
+
+    Args:
+        names: 列名，用于表头以及结果为空时的schema
+        chunks: 列数据块，格式与ResultSet.iter_columns()相同
+        target: 文件路径、二进制流或文本流（文本流只用于不压缩的csv和jsonl）
+        format: 导出格式，见EXPORT_FORMATS，不指定则根据文件扩展名判断
+        dates: csv和jsonl中日期的格式，见EXPORT_DATE_FORMATS；Parquet中日期总是timestamp[ns]
+        compression: 压缩方式，见COMPRESSIONS，不指定则根据文件扩展名判断（.gz/.zst）；
+            Parquet使用文件内部的压缩编码，默认为snappy
+
+    Returns:
+        写出的行数
+
+    Raises:
+        ValueError: 如果格式、日期格式或压缩方式无效
+        ImportError: 如果缺少Parquet或zstd所需的可选依赖
+    """
+    if isinstance(target, (str, os.PathLike)):
+        detected_format, detected_compression = detect_format(target)
+        format = format or detected_format
+        compression = compression or detected_compression
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"未知的导出格式: {format}，可选值: {', '.join(EXPORT_FORMATS)}")
+    if dates not in EXPORT_DATE_FORMATS:
+        raise ValueError(f"未知的日期格式: {dates}，可选值: {', '.join(EXPORT_DATE_FORMATS)}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"未知的压缩方式: {compression}，可选值: {', '.join(COMPRESSIONS)}")
+
+    if format == "parquet":
+        return _write_parquet(target, names, chunks, compression)
+    write = _write_csv if format == "csv" else _write_jsonl
+    with ExitStack() as stack:
+        return write(_open_text(stack, target, compression), names, chunks, dates)
@@ -0,0 +1,568 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Everything查询编译模块
+Compiler turning parsed Everything queries into local predicates
+
+compile_query()把query_parser的语法树编译为CompiledQuery：通配符和搜索词预先编译为正则或子串比较，
+大小和日期预先换算为整数区间（日期为FILETIME），匹配选项（区分大小写、匹配路径、全字匹配、正则）
+在编译时确定。编译结果既可以逐行求值（对象需要有name、path、full_path、extension、size、
+date_created/date_modified/date_accessed和is_folder属性，日期为FILETIME整数），
+也可以对列求值（字符串列和整数列的映射，与ResultSnapshot.column()一致），返回匹配行的下标。
+"""
+
+import re
+import time
+from operator import attrgetter
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ..constants import RequestFlag
+from ..utils.time_utils import WINDOWS_TICKS, WINDOWS_TICKS_TO_POSIX_EPOCH, to_filetime
+from .query_parser import And, Function, Modifier, Node, Not, Or, Text, parse_query
+
+# SDK中表示"未知"的大小和日期
+UNKNOWN_VALUE = 0xFFFFFFFFFFFFFFFF
+
+# 大小关键字（字节范围，右开区间）
+SIZE_KEYWORDS = {
+    "empty": (0, 1),
+    "tiny": (0, 10 * 1024),
+    "small": (10 * 1024, 100 * 1024),
+    "medium": (100 * 1024, 1024 * 1024),
+    "large": (1024 * 1024, 16 * 1024 * 1024),
+    "huge": (16 * 1024 * 1024, 128 * 1024 * 1024),
+    "gigantic": (128 * 1024 * 1024, UNKNOWN_VALUE),
+}
+
+SIZE_UNITS = {"": 1, "b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3, "tb": 1024**4}
+
+# 日期函数 -> 字段
+DATE_FUNCTIONS = {"dm": "date_modified", "dc": "date_created", "da": "date_accessed"}
+
+# 可以在本地求值的搜索函数及其所需的请求标志位（名称和路径总是需要）
+LOCAL_FUNCTIONS = {
+    "ext": RequestFlag(0),
+    "size": RequestFlag.SIZE,
+    "dm": RequestFlag.DATE_MODIFIED,
+    "dc": RequestFlag.DATE_CREATED,
+    "da": RequestFlag.DATE_ACCESSED,
+    "empty": RequestFlag(0),
+}
+
+# 区间：右开区间[下限, 上限)，None表示不限制
+Bounds = Tuple[Optional[int], Optional[int]]
+
+# 派生字段 -> 按列求值时需要的列
+_DERIVED_COLUMNS = {"full_path": ("name", "path"), "extension": ("name",)}
+
+
+class ResultRow(NamedTuple):
+    """逐行求值使用的行，日期为FILETIME整数，大小未知时为UNKNOWN_VALUE"""
+
+    name: str
+    path: str
+    full_path: str
+    extension: str
+    size: int
+    date_created: int
+    date_modified: int
+    date_accessed: int
+    is_folder: bool
+
+
+def result_row(item: Any) -> ResultRow:
+    """把FileResult、LazyFileResult或投影记录转换为求值使用的行
+
+    日期可以是任一日期模式的值；缺少的字段按未知处理。
+
+    Args:
+        item: 结果对象
+
+    Returns:
+        ResultRow实例
+    """
+    name = getattr(item, "name", None) or ""
+    path = getattr(item, "path", None) or ""
+    if name and path:
+        full_path = path + name if path.endswith("\\") else path + "\\" + name
+    else:
+        full_path = getattr(item, "full_path", None) or name
+    is_folder = bool(getattr(item, "is_folder", False))
+    extension = getattr(item, "extension", None)
+    if extension is None:
+        extension = "" if is_folder or "." not in name else name.rpartition(".")[2]
+    size = getattr(item, "size", None)
+    return ResultRow(
+        name,
+        path,
+        full_path,
+        extension,
+        UNKNOWN_VALUE if size is None else size,
+        to_filetime(getattr(item, "date_created", None)),
+        to_filetime(getattr(item, "date_modified", None)),
+        to_filetime(getattr(item, "date_accessed", None)),
+        is_folder,
+    )
+
+
+class _Options(NamedTuple):
+    """编译时的匹配选项，修饰符在局部覆盖"""
+
+    match_case: bool
+    match_path: bool
+    match_whole_word: bool
+    regex: bool
+
+
+class _Leaf(NamedTuple):
+    """编译后的叶子条件：对fields字段的取值调用test"""
+
+    fields: Tuple[str, ...]
+    test: Callable[..., bool]
+
+
+_MATCH_ALL = And(())
+_MATCH_NONE = Not(_MATCH_ALL)
+
+
+def _filetime(timestamp: float) -> int:
+    """Unix时间戳 -> FILETIME整数"""
+    return int(timestamp * WINDOWS_TICKS) + int(WINDOWS_TICKS_TO_POSIX_EPOCH)
+
+
+def _local_midnight(year: int, month: int, day: int) -> float:
+    return time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+
+
+def _date_bounds(text: str, now: float) -> Optional[Tuple[int, int]]:
+    """把日期或日期关键词解析为FILETIME区间（本地时间，右开区间）
+
+    支持YYYY、YYYY-MM、YYYY-MM-DD（也可以用/分隔）以及today、yesterday、thisweek、lastweek、
+    thismonth、lastmonth、thisyear、lastyear；一周从星期一开始。
+    """
+    text = text.strip().lower()
+    local = time.localtime(now)
+    year, month, mday = local.tm_year, local.tm_mon, local.tm_mday
+    if text in ("today", "yesterday"):
+        start = _local_midnight(year, month, mday - (text == "yesterday"))
+        end = _local_midnight(year, month, mday + (text == "today"))
+    elif text in ("thisweek", "lastweek"):
+        monday = mday - local.tm_wday - (7 if text == "lastweek" else 0)
+        start = _local_midnight(year, month, monday)
+        end = _local_midnight(year, month, monday + 7)
+    elif text in ("thismonth", "lastmonth"):
+        month -= text == "lastmonth"
+        start = _local_midnight(year, month, 1)
+        end = _local_midnight(year, month + 1, 1)
+    elif text in ("thisyear", "lastyear"):
+        year -= text == "lastyear"
+        start = _local_midnight(year, 1, 1)
+        end = _local_midnight(year + 1, 1, 1)
+    else:
+        match = re.fullmatch(r"(\d{4})(?:[-/](\d{1,2})(?:[-/](\d{1,2}))?)?", text)
+        if not match:
+            return None
+        year = int(match.group(1))
+        if match.group(3):
+            month, mday = int(match.group(2)), int(match.group(3))
+            start = _local_midnight(year, month, mday)
+            end = _local_midnight(year, month, mday + 1)
+        elif match.group(2):
+            month = int(match.group(2))
+            start = _local_midnight(year, month, 1)
+            end = _local_midnight(year, month + 1, 1)
+        else:
+            start = _local_midnight(year, 1, 1)
+            end = _local_midnight(year + 1, 1, 1)
+    return _filetime(start), _filetime(end)
+
+
+def _size_value_bounds(text: str) -> Optional[Tuple[int, int]]:
+    """把大小或大小关键词解析为字节区间（右开区间）"""
+    text = text.strip().lower()
+    if text in SIZE_KEYWORDS:
+        return SIZE_KEYWORDS[text]
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(b|kb|mb|gb|tb)?", text)
+    if not match:
+        return None
+    size = int(float(match.group(1)) * SIZE_UNITS[match.group(2) or ""])
+    return size, size + 1
+
+
+def parse_range(value: str, parse: Callable[[str], Optional[Tuple[int, int]]]) -> Optional[Bounds]:
+    """解析 >a、<a、>=a、<=a、=a、a..b 和 a 形式的范围
+
+    Args:
+        value: 函数的值
+        parse: 把单个值解析为右开区间的函数，无法解析时返回None
+
+    Returns:
+        右开区间(下限, 上限)，None表示该端不限制；无法解析时为None
+    """
+    if ".." in value:
+        low, high = value.split("..", 1)
+        low_bounds, high_bounds = parse(low), parse(high)
+        if low_bounds is None or high_bounds is None:
+            return None
+        return low_bounds[0], high_bounds[1]
+    for operator in (">=", "<=", ">", "<", "="):
+        if value.startswith(operator):
+            bounds = parse(value[len(operator):])
+            if bounds is None:
+                return None
+            start, end = bounds
+            return {
+                ">=": (start, None),
+                "<=": (None, end),
+                ">": (end, None),
+                "<": (None, start),
+                "=": (start, end),
+            }[operator]
+    return parse(value)
+
+
+def _range_test(bounds: Bounds, minimum: int) -> Callable[[int], bool]:
+    """区间测试函数，小于minimum的值和UNKNOWN_VALUE表示未知，不匹配"""
+    low, high = bounds
+    low = minimum if low is None else max(low, minimum)
+    high = UNKNOWN_VALUE if high is None else high
+    return lambda value: low <= value < high
+
+
+def _text_leaf(text: str, options: _Options) -> Union[_Leaf, Node]:
+    """把搜索词编译为叶子条件
+
+    正则直接编译；通配符匹配整个文件名（匹配路径时为整个路径）；
+    其他搜索词是子串匹配，包含反斜杠时匹配完整路径。
+    """
+    flags = 0 if options.match_case else re.IGNORECASE
+    if options.regex:
+        try:
+            pattern = re.compile(text, flags)
+        except re.error:
+            return _MATCH_NONE
+        field = "full_path" if options.match_path else "name"
+        search = pattern.search
+        return _Leaf((field,), lambda value: search(value) is not None)
+
+    if not text:
+        return _MATCH_ALL
+    field = "full_path" if options.match_path or "\\" in text else "name"
+    if "*" in text or "?" in text:
+        body = re.escape(text).replace(r"\*", ".*").replace(r"\?", ".")
+        fullmatch = re.compile(body, flags | re.DOTALL).fullmatch
+        return _Leaf((field,), lambda value: fullmatch(value) is not None)
+    if options.match_whole_word:
+        search = re.compile(rf"(?<!\w){re.escape(text)}(?!\w)", flags).search
+        return _Leaf((field,), lambda value: search(value) is not None)
+    if options.match_case:
+        return _Leaf((field,), lambda value: text in value)
+    needle = text.lower()
+    return _Leaf((field,), lambda value: needle in value.lower())
+
+
+class _Compiler:
+    """把语法树编译为由_Leaf和And/Or/Not组成的执行计划"""
+
+    def __init__(self, now: float, nonempty_folders: Optional[AbstractSet[str]]):
+        self.now = now
+        self.nonempty_folders = nonempty_folders
+        self.highlights: List[str] = []
+        self.unsupported: Set[str] = set()
+        self.request_flags = RequestFlag.FILE_NAME | RequestFlag.PATH
+
+    def compile(self, node: Node, options: _Options, negated: bool = False) -> Any:
+        if isinstance(node, Text):
+            leaf = _text_leaf(node.text, options)
+            if not negated and not options.regex and node.text and not (
+                "*" in node.text or "?" in node.text
+            ):
+                self.highlights.append(node.text)
+            return leaf
+        if isinstance(node, Function):
+            return self.function(node)
+        if isinstance(node, Modifier):
+            return self.modifier(node, options, negated)
+        if isinstance(node, Not):
+            return Not(self.compile(node.operand, options, not negated))
+        if isinstance(node, (And, Or)):
+            return type(node)(tuple(self.compile(item, options, negated) for item in node.operands))
+        raise TypeError(f"未知的语法树节点: {node!r}")
+
+    def function(self, node: Function) -> Any:
+        name, value = node.name, node.value
+        if name == "empty" and self.nonempty_folders is not None:
+            nonempty = self.nonempty_folders
+            return _Leaf(
+                ("is_folder", "full_path"),
+                lambda is_folder, full_path: bool(is_folder)
+                and full_path.lower().rstrip("\\") not in nonempty,
+            )
+        if name not in LOCAL_FUNCTIONS or name == "empty":
+            # 无法在本地求值的函数（content:、dupe:等）视为总是匹配，由调用方决定是否可以接受
+            self.unsupported.add(name)
+            return _MATCH_ALL
+
+        self.request_flags |= LOCAL_FUNCTIONS[name]
+        if name == "ext":
+            extensions = frozenset(e.strip().lower().lstrip(".") for e in value.split(";"))
+            return _Leaf(("extension",), lambda extension: extension.lower() in extensions)
+        if name == "size":
+            bounds = parse_range(value, _size_value_bounds)
+        else:
+            bounds = parse_range(value, lambda text: _date_bounds(text, self.now))
+        if bounds is None:
+            return _MATCH_NONE
+        if name == "size":
+            return _Leaf(("size",), _range_test(bounds, 0))
+        # 日期为0表示未知
+        return _Leaf((DATE_FUNCTIONS[name],), _range_test(bounds, 1))
+
+    def modifier(self, node: Modifier, options: _Options, negated: bool) -> Any:
+        name = node.name
+        if name in ("file", "folder"):
+            want_folder = name == "folder"
+            kind = _Leaf(("is_folder",), lambda is_folder: bool(is_folder) == want_folder)
+            if node.operand is None:
+                return kind
+            return And((kind, self.compile(node.operand, options, negated)))
+        if node.operand is None:
+            return _MATCH_ALL
+        if name in ("path", "nopath"):
+            options = options._replace(match_path=name == "path")
+        elif name in ("case", "nocase"):
+            options = options._replace(match_case=name == "case")
+        elif name in ("ww", "noww"):
+            options = options._replace(match_whole_word=name == "ww")
+        elif name == "regex":
+            options = options._replace(regex=True)
+        return self.compile(node.operand, options, negated)
+
+
+def _plan_fields(plan: Any) -> Set[str]:
+    """执行计划中叶子条件用到的字段"""
+    if isinstance(plan, _Leaf):
+        return set(plan.fields)
+    if isinstance(plan, Not):
+        return _plan_fields(plan.operand)
+    fields: Set[str] = set()
+    for item in plan.operands:
+        fields |= _plan_fields(item)
+    return fields
+
+
+def _row_predicate(plan: Any) -> Callable[[Any], bool]:
+    """把执行计划转换为逐行求值的谓词"""
+    if isinstance(plan, _Leaf):
+        test = plan.test
+        if len(plan.fields) == 1:
+            get = attrgetter(plan.fields[0])
+            return lambda row: test(get(row))
+        get_all = attrgetter(*plan.fields)
+        return lambda row: test(*get_all(row))
+    if isinstance(plan, Not):
+        operand = _row_predicate(plan.operand)
+        return lambda row: not operand(row)
+    predicates = tuple(_row_predicate(item) for item in plan.operands)
+    if len(predicates) == 1:
+        return predicates[0]
+    if isinstance(plan, Or):
+        return lambda row: any(predicate(row) for predicate in predicates)
+    if not predicates:
+        return lambda row: True
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda row: first(row) and second(row)
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+class _Columns:
+    """列求值时的列数据，按需派生full_path和extension列"""
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]], length: int):
+        self.columns = dict(columns)
+        self.length = length
+
+    def __getitem__(self, name: str) -> Sequence[Any]:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = self._derive(name)
+        return column
+
+    def _derive(self, name: str) -> Sequence[Any]:
+        names = self.columns["name"]
+        if name == "full_path":
+            paths = self.columns["path"]
+            return [
+                name if not path else (path + name if path.endswith("\\") else path + "\\" + name)
+                for name, path in zip(names, paths)
+            ]
+        if name == "extension":
+            folders = self.columns.get("is_folder", (False,) * self.length)
+            return [
+                "" if is_folder or "." not in name else name.rpartition(".")[2]
+                for name, is_folder in zip(names, folders)
+            ]
+        raise KeyError(name)
+
+
+ColumnFilter = Callable[[_Columns, List[int]], List[int]]
+
+
+def _column_filter(plan: Any) -> ColumnFilter:
+    """把执行计划转换为列求值函数：输入候选行下标，返回其中匹配的下标（保持顺序）"""
+    if isinstance(plan, _Leaf):
+        test = plan.test
+        fields = plan.fields
+
+        def run_leaf(columns: _Columns, indexes: List[int]) -> List[int]:
+            if len(fields) == 1:
+                values = columns[fields[0]]
+                return [i for i in indexes if test(values[i])]
+            data = [columns[field] for field in fields]
+            return [i for i in indexes if test(*(values[i] for values in data))]
+
+        return run_leaf
+
+    if isinstance(plan, Not):
+        operand = _column_filter(plan.operand)
+
+        def run_not(columns: _Columns, indexes: List[int]) -> List[int]:
+            matched = set(operand(columns, indexes))
+            return [i for i in indexes if i not in matched]
+
+        return run_not
+
+    filters = tuple(_column_filter(item) for item in plan.operands)
+    if isinstance(plan, Or):
+
+        def run_or(columns: _Columns, indexes: List[int]) -> List[int]:
+            matched: Set[int] = set()
+            remaining = indexes
+            for run in filters:
+                matched.update(run(columns, remaining))
+                remaining = [i for i in remaining if i not in matched]
+                if not remaining:
+                    break
+            return [i for i in indexes if i in matched]
+
+        return run_or
+
+    def run_and(columns: _Columns, indexes: List[int]) -> List[int]:
+        # 每一项只对前面各项都匹配的行求值
+        for run in filters:
+            if not indexes:
+                break
+            indexes = run(columns, indexes)
+        return indexes
+
+    return run_and
+
+
+class CompiledQuery:
+    """编译后的查询，可以逐行或按列求值"""
+
+    def __init__(
+        self,
+        node: Node,
+        plan: Any,
+        highlights: Sequence[str],
+        unsupported: AbstractSet[str],
+        request_flags: RequestFlag,
+    ):
+        self.node = node
+        self.highlights = list(highlights)
+        self.unsupported = frozenset(unsupported)
+        self.request_flags = request_flags
+        self._predicate = _row_predicate(plan)
+        self._column_filter = _column_filter(plan)
+        columns = {"name", "path"}
+        for field in _plan_fields(plan):
+            columns.update(_DERIVED_COLUMNS.get(field, (field,)))
+        self.required_columns = frozenset(columns)
+
+    @property
+    def local(self) -> bool:
+        """是否可以完全在本地求值（没有content:、dupe:等无法在本地求值的函数）"""
+        return not self.unsupported
+
+    def __call__(self, row: Any) -> bool:
+        """检查一行是否匹配"""
+        return self._predicate(row)
+
+    def filter(self, rows: Iterable[Any]) -> List[Any]:
+        """筛选匹配的行
+
+        Args:
+            rows: 行的序列
+
+        Returns:
+            匹配的行，保持原有顺序
+        """
+        predicate = self._predicate
+        return [row for row in rows if predicate(row)]
+
+    def select(self, columns: Mapping[str, Sequence[Any]], length: Optional[int] = None) -> List[int]:
+        """对列数据求值
+
+        Args:
+            columns: 列名到列数据的映射，至少包含name和path，以及查询用到的size、日期（FILETIME）列；
+                没有extension和full_path列时由name、path和is_folder派生
+            length: 行数，默认为name列的长度
+
+        Returns:
+            匹配行的下标，按升序排列
+        """
+        if length is None:
+            length = len(columns["name"])
+        return self._column_filter(_Columns(columns, length), list(range(length)))
+
+
+def compile_query(
+    query: Union[str, Node],
+    match_case: bool = False,
+    match_path: bool = False,
+    match_whole_word: bool = False,
+    regex: bool = False,
+    nonempty_folders: Optional[AbstractSet[str]] = None,
+    now: Optional[float] = None,
+) -> CompiledQuery:
+    """把查询字符串或语法树编译为本地谓词
+
+    Args:
+        query: 查询字符串或parse_query()得到的语法树
+        match_case: 是否区分大小写
+        match_path: 是否匹配完整路径
+        match_whole_word: 是否全字匹配
+        regex: 是否使用正则；查询为字符串时整个字符串是一个正则表达式
+        nonempty_folders: 包含子项的文件夹的完整路径（小写，不含结尾的反斜杠），
+            指定后empty:可以在本地求值
+        now: 计算today、thisweek等相对日期使用的时间戳，默认为当前时间
+
+    Returns:
+        CompiledQuery实例
+    """
+    if isinstance(query, str):
+        node = Modifier("regex", Text(query)) if regex else parse_query(query)
+    else:
+        node = query
+    compiler = _Compiler(time.time() if now is None else now, nonempty_folders)
+    options = _Options(bool(match_case), bool(match_path), bool(match_whole_word), bool(regex))
+    plan = compiler.compile(node, options)
+    return CompiledQuery(
+        node, plan, compiler.highlights, compiler.unsupported, compiler.request_flags
+    )
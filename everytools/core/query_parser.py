@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Everything查询语法解析模块
+Parser for the Everything search syntax
+
+把查询字符串解析为语法树，供query_compiler在本地求值。支持的语法与SearchBuilder和过滤器生成的一致：
+空格（与）、|（或，优先级高于与）、!（非）、<>分组、引号、通配符、搜索函数（ext:、size:、dm:/dc:/da:、
+empty:等）以及修饰符（file:、folder:、path:、case:、ww:、regex:等）。
+"""
+
+import re
+from typing import Iterator, NamedTuple, Optional, Set, Tuple, Union
+
+# 修饰符的别名 -> 规范名称；修饰符作用于紧随其后的一项（可以是<>分组）
+MODIFIERS = {
+    "file": "file",
+    "files": "file",
+    "folder": "folder",
+    "folders": "folder",
+    "path": "path",
+    "nopath": "nopath",
+    "case": "case",
+    "nocase": "nocase",
+    "ww": "ww",
+    "wholeword": "ww",
+    "noww": "noww",
+    "nowholeword": "noww",
+    "regex": "regex",
+}
+
+# 搜索函数名；单个字母加冒号是盘符（如C:\），不是函数
+_FUNCTION_NAME = re.compile(r"([A-Za-z][A-Za-z0-9_]+):")
+
+# 需要加引号才能作为一项输出的字符
+_SPECIAL = re.compile(r'[\s|<>"]')
+
+
+class Text(NamedTuple):
+    """普通搜索词或通配符（引号已去除）"""
+
+    text: str
+
+    @property
+    def wildcard(self) -> bool:
+        """是否包含通配符*或?"""
+        return "*" in self.text or "?" in self.text
+
+
+class Function(NamedTuple):
+    """搜索函数，如ext:jpg;png、size:>1mb、dm:2024-01-01..2024-02-01"""
+
+    name: str
+    value: str
+
+
+class Modifier(NamedTuple):
+    """修饰符，如file:、case:ABC、path:<a|b>；operand为None时只有修饰符本身"""
+
+    name: str
+    operand: Optional["Node"]
+
+
+class Not(NamedTuple):
+    """!运算"""
+
+    operand: "Node"
+
+
+class And(NamedTuple):
+    """空格分隔的各项同时满足；没有任何项时匹配全部"""
+
+    operands: Tuple["Node", ...]
+
+
+class Or(NamedTuple):
+    """|分隔的各项满足其一"""
+
+    operands: Tuple["Node", ...]
+
+
+Node = Union[Text, Function, Modifier, Not, And, Or]
+
+
+class _Parser:
+    """递归下降解析器：and := or (空白 or)*；or := unary ('|' unary)*；unary := '!' unary | '<' and '>' | term"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def skip_space(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def at_boundary(self) -> bool:
+        """当前位置是否是一项的结尾"""
+        ch = self.peek()
+        return not ch or ch.isspace() or ch == "|" or (ch == ">" and self.depth > 0)
+
+    def parse_and(self) -> "Node":
+        operands = []
+        while True:
+            self.skip_space()
+            ch = self.peek()
+            if not ch or (ch == ">" and self.depth > 0):
+                break
+            if ch == "|":
+                # 开头或连续的|没有左侧的项，忽略
+                self.pos += 1
+                continue
+            operands.append(self.parse_or())
+        return _make(And, operands)
+
+    def parse_or(self) -> "Node":
+        operands = [self.parse_unary()]
+        while True:
+            start = self.pos
+            self.skip_space()
+            if self.peek() != "|":
+                self.pos = start
+                break
+            self.pos += 1
+            self.skip_space()
+            ch = self.peek()
+            if not ch or (ch == ">" and self.depth > 0):
+                break
+            if ch == "|":
+                continue
+            operands.append(self.parse_unary())
+        return _make(Or, operands)
+
+    def parse_unary(self) -> "Node":
+        ch = self.peek()
+        if ch == "!":
+            self.pos += 1
+            if self.at_boundary():
+                return And(())
+            return Not(self.parse_unary())
+        if ch == "<":
+            self.pos += 1
+            self.depth += 1
+            node = self.parse_and()
+            self.depth -= 1
+            if self.peek() == ">":
+                self.pos += 1
+            return node
+        return self.parse_term()
+
+    def parse_term(self) -> "Node":
+        match = _FUNCTION_NAME.match(self.text, self.pos)
+        if match:
+            name = match.group(1).lower()
+            self.pos = match.end()
+            if name in MODIFIERS:
+                if self.at_boundary():
+                    return Modifier(MODIFIERS[name], None)
+                return Modifier(MODIFIERS[name], self.parse_unary())
+            return Function(name, self.read_operator() + self.read_span())
+        return Text(self.read_span())
+
+    def read_operator(self) -> str:
+        """读取函数值开头的比较运算符；分组中紧跟在函数名后、位于结尾的>是分组的结束"""
+        start = self.pos
+        end = start
+        while end < len(self.text) and self.text[end] in "<>=":
+            end += 1
+        if self.depth > 0 and end > start and self.text[end - 1] == ">":
+            if end == len(self.text) or self.text[end].isspace() or self.text[end] == "|":
+                end -= 1
+        self.pos = end
+        return self.text[start:end]
+
+    def read_span(self) -> str:
+        """读取到一项的结尾，去除引号"""
+        chars = []
+        in_quote = False
+        text = self.text
+        while self.pos < len(text):
+            ch = text[self.pos]
+            if ch == '"':
+                in_quote = not in_quote
+            elif not in_quote and (ch.isspace() or ch == "|" or (ch == ">" and self.depth > 0)):
+                break
+            else:
+                chars.append(ch)
+            self.pos += 1
+        # 未闭合的引号延续到字符串结尾
+        return "".join(chars)
+
+
+def _make(kind: type, operands: list) -> "Node":
+    """合并同类的嵌套节点，只有一项时直接返回该项"""
+    flat = []
+    for operand in operands:
+        if type(operand) is kind:
+            flat.extend(operand.operands)
+        else:
+            flat.append(operand)
+    if len(flat) == 1:
+        return flat[0]
+    return kind(tuple(flat))
+
+
+def parse_query(text: str) -> "Node":
+    """解析Everything查询字符串
+
+    解析总是成功：未闭合的引号和<>分组延续到字符串结尾，分组外多余的>是普通字符。
+
+    Args:
+        text: 查询字符串
+
+    Returns:
+        语法树的根节点；空字符串得到And(())，匹配全部
+    """
+    return _Parser(text or "").parse_and()
+
+
+def _quote(text: str) -> str:
+    """需要时为一项加引号，使其按原样解析"""
+    if not text or _SPECIAL.search(text) or text[0] in "!<" or _FUNCTION_NAME.match(text):
+        return f'"{text}"'
+    return text
+
+
+def format_query(node: "Node") -> str:
+    """把语法树转换回查询字符串，parse_query(format_query(node)) == node
+
+    Args:
+        node: 语法树节点
+
+    Returns:
+        查询字符串
+    """
+    if isinstance(node, Text):
+        return _quote(node.text)
+    if isinstance(node, Function):
+        operator = re.match(r"[<>=]*", node.value).group(0)
+        value = node.value[len(operator):]
+        if value and (_SPECIAL.search(value) or value[0] in "<>="):
+            value = f'"{value}"'
+        return f"{node.name}:{operator}{value}"
+    if isinstance(node, Modifier):
+        if node.operand is None:
+            return f"{node.name}:"
+        return f"{node.name}:{_format_operand(node.operand)}"
+    if isinstance(node, Not):
+        return "!" + _format_operand(node.operand)
+    if isinstance(node, Or):
+        return "|".join(
+            f"<{format_query(item)}>" if isinstance(item, And) else format_query(item)
+            for item in node.operands
+        )
+    if isinstance(node, And):
+        return " ".join(format_query(item) for item in node.operands)
+    raise TypeError(f"未知的语法树节点: {node!r}")
+
+
+def _format_operand(node: "Node") -> str:
+    """修饰符和!只作用于一项，多项时加<>"""
+    if isinstance(node, (And, Or)):
+        return f"<{format_query(node)}>"
+    return format_query(node)
+
+
+def walk(node: "Node") -> Iterator["Node"]:
+    """先序遍历语法树的全部节点"""
+    yield node
+    if isinstance(node, (And, Or)):
+        for operand in node.operands:
+            yield from walk(operand)
+    elif isinstance(node, Not):
+        yield from walk(node.operand)
+    elif isinstance(node, Modifier) and node.operand is not None:
+        yield from walk(node.operand)
+
+
+def query_functions(node: "Node") -> Set[str]:
+    """语法树中使用的搜索函数和修饰符名称"""
+    return {item.name for item in walk(node) if isinstance(item, (Function, Modifier))}
@@ -7,17 +7,231 @@ Search result module
 """
 
 import os
+import asyncio
 import ctypes
+import itertools
+from array import array
+from collections import namedtuple
 from datetime import datetime
-from typing import Any, Dict, Iterator, List, Optional, Union
-import struct
-import time
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ..constants import RequestFlag
+from ..exceptions import StaleResultError
+from .executor import dll_state
+from ..utils.time_utils import (
+    DATE_FORMATS,
+    DEBUG,
+    FiletimeDecoder,
+    convert_filetimes,
+    max_valid_filetime,
+)
+
+# 异步迭代时每批读取的结果数量
+ASYNC_CHUNK_SIZE = 1000
+
+# 按块读取列数据（例如导出）时每块的结果数量
+COLUMN_CHUNK_SIZE = 10000
+
+# 列式读取支持的列：列名 -> (请求标志位, 数组类型码, DLL函数名)
+# 类型码为None表示字符串列；"Q"列通过输出参数读取，未知值保持为0xFFFFFFFFFFFFFFFF（大小）或0（日期）
+COLUMNS = {
+    "name": (RequestFlag.FILE_NAME, None, "Everything_GetResultFileNameW"),
+    "path": (RequestFlag.PATH, None, "Everything_GetResultPathW"),
+    "extension": (RequestFlag.EXTENSION, None, "Everything_GetResultExtensionW"),
+    "size": (RequestFlag.SIZE, "Q", "Everything_GetResultSize"),
+    "date_created": (RequestFlag.DATE_CREATED, "Q", "Everything_GetResultDateCreated"),
+    "date_modified": (
+        RequestFlag.DATE_MODIFIED,
+        "Q",
+        "Everything_GetResultDateModified",
+    ),
+    "date_accessed": (
+        RequestFlag.DATE_ACCESSED,
+        "Q",
+        "Everything_GetResultDateAccessed",
+    ),
+    "date_run": (RequestFlag.DATE_RUN, "Q", "Everything_GetResultDateRun"),
+    "date_recently_changed": (
+        RequestFlag.DATE_RECENTLY_CHANGED,
+        "Q",
+        "Everything_GetResultDateRecentlyChanged",
+    ),
+    "attributes": (RequestFlag.ATTRIBUTES, "I", "Everything_GetResultAttributes"),
+    "run_count": (RequestFlag.RUN_COUNT, "I", "Everything_GetResultRunCount"),
+    "highlighted_name": (
+        RequestFlag.HIGHLIGHTED_FILE_NAME,
+        None,
+        "Everything_GetResultHighlightedFileNameW",
+    ),
+    "highlighted_path": (
+        RequestFlag.HIGHLIGHTED_PATH,
+        None,
+        "Everything_GetResultHighlightedPathW",
+    ),
+    "is_file": (0, "B", "Everything_IsFileResult"),
+    "is_folder": (0, "B", "Everything_IsFolderResult"),
+    "is_volume": (0, "B", "Everything_IsVolumeResult"),
+}
+
+UNKNOWN_SIZE = 0xFFFFFFFFFFFFFFFF
+
+# 投影查询支持的字段：字段名 -> 所需的请求标志位（0表示总是可用）
+FIELD_FLAGS = {
+    "name": RequestFlag.FILE_NAME,
+    "path": RequestFlag.PATH,
+    "full_path": RequestFlag.FILE_NAME | RequestFlag.PATH,
+    "extension": RequestFlag.EXTENSION,
+    "size": RequestFlag.SIZE,
+    "date_created": RequestFlag.DATE_CREATED,
+    "date_modified": RequestFlag.DATE_MODIFIED,
+    "date_accessed": RequestFlag.DATE_ACCESSED,
+    "date_run": RequestFlag.DATE_RUN,
+    "attributes": RequestFlag.ATTRIBUTES,
+    "run_count": RequestFlag.RUN_COUNT,
+    "highlighted_name": RequestFlag.HIGHLIGHTED_FILE_NAME,
+    "highlighted_path": RequestFlag.HIGHLIGHTED_PATH,
+    "is_file": 0,
+    "is_folder": 0,
+    "is_volume": 0,
+}
+
+
+def fields_to_request_flags(fields: Sequence[str]) -> RequestFlag:
+    """计算投影字段所需的请求标志位
+
+    Args:
+        fields: 字段名列表
+
+    Returns:
+        请求标志位
+
+    Raises:
+        ValueError: 如果字段名无效
+    """
+    unknown = [field for field in fields if field not in FIELD_FLAGS]
+    if unknown:
+        raise ValueError(f"未知的字段: {', '.join(unknown)}")
+    flags = RequestFlag(0)
+    for field in fields:
+        flags |= FIELD_FLAGS[field]
+    return flags
+
+
+def decode_date_columns(columns: Dict[str, Any], dates: str) -> Dict[str, Any]:
+    """批量转换列数据中的日期列（原地修改）
+
+    Args:
+        columns: 列名到列数据的字典，日期列为原始FILETIME
+        dates: 日期格式，见time_utils.convert_filetimes()
+
+    Returns:
+        转换后的字典
+    """
+    if dates == "raw":
+        return columns
+    max_ticks = max_valid_filetime()
+    for name in columns:
+        if name.startswith("date_"):
+            columns[name] = convert_filetimes(columns[name], dates, max_ticks)
+    return columns
+
+
+@lru_cache(maxsize=64)
+def record_type_for(fields: Tuple[str, ...]) -> type:
+    """获取投影字段对应的namedtuple类型（按字段组合缓存）"""
+    return namedtuple("Row", fields)
+
+
+# 查询代数：每次执行查询或改变DLL中的结果列表时更新，用于检测基于旧查询的结果。
+# 代数按DLL状态分别记录（见executor.dll_state），取值在整个进程内唯一
+_generation_counter = itertools.count(1)
+
+
+def mark_query_changed(dll: Any) -> int:
+    """标记DLL中的结果列表已被新的查询替换
+
+    只影响使用同一DLL状态（同一后端或同一DLL）的结果集，其他后端的结果集仍然有效。
+
+    Args:
+        dll: 执行查询的DLL实例
+
+    Returns:
+        新的查询代数
+    """
+    state = dll_state(dll)
+    state.generation = next(_generation_counter)
+    return state.generation
+
+
+def current_query_generation(dll: Any) -> int:
+    """DLL当前的查询代数
+
+    Args:
+        dll: DLL实例
+    """
+    return dll_state(dll).generation
 
-from ..utils.time_utils import filetime_to_datetime, filetime_to_str, DEBUG
+
+def derive_extension(name: Optional[str], is_container: bool = False) -> Optional[str]:
+    """由文件名得出扩展名（不含点）
+
+    Args:
+        name: 文件名
+        is_container: 是否为文件夹或卷，它们没有扩展名
+
+    Returns:
+        扩展名，没有扩展名时为空字符串，文件名为None时为None
+    """
+    if name is None:
+        return None
+    if is_container:
+        return ""
+    _, dot, ext = name.rpartition(".")
+    return ext if dot else ""
+
+
+# FileResult._kind的位
+_KIND_FILE = 1
+_KIND_FOLDER = 2
+_KIND_VOLUME = 4
 
 
 class FileResult:
-    """单个文件或文件夹的搜索结果"""
+    """单个文件或文件夹的搜索结果
+
+    使用__slots__保存字段，三个类型标志合并为一个整数；
+    full_path和extension在读取时才由name和path得出，不占用额外内存。
+    """
+
+    __slots__ = (
+        "name",
+        "path",
+        "size",
+        "date_created",
+        "date_modified",
+        "date_accessed",
+        "date_run",
+        "attributes",
+        "run_count",
+        "highlighted_name",
+        "highlighted_path",
+        "_full_path",
+        "_extension",
+        "_kind",
+    )
 
     def __init__(
         self,
@@ -25,10 +239,10 @@ class FileResult:
         path: str,
         full_path: Optional[str] = None,
         size: Optional[int] = None,
-        date_created: Optional[Union[datetime, str]] = None,
-        date_modified: Optional[Union[datetime, str]] = None,
-        date_accessed: Optional[Union[datetime, str]] = None,
-        date_run: Optional[Union[datetime, str]] = None,
+        date_created: Optional[Union[datetime, str, float]] = None,
+        date_modified: Optional[Union[datetime, str, float]] = None,
+        date_accessed: Optional[Union[datetime, str, float]] = None,
+        date_run: Optional[Union[datetime, str, float]] = None,
         extension: Optional[str] = None,
         attributes: Optional[int] = None,
         is_file: bool = True,
@@ -60,23 +274,78 @@ class FileResult:
         """
         self.name = name
         self.path = path
-        self.full_path = full_path or (
-            os.path.join(path, name) if path and name else None
-        )
+        # 未指定时保持为None，读取full_path时再拼接
+        self._full_path = full_path or None
         self.size = size
         self.date_created = date_created
         self.date_modified = date_modified
         self.date_accessed = date_accessed
         self.date_run = date_run
-        self.extension = extension
+        self._extension = extension
         self.attributes = attributes
-        self.is_file = is_file
-        self.is_folder = is_folder
-        self.is_volume = is_volume
+        self._kind = (
+            (_KIND_FILE if is_file else 0)
+            | (_KIND_FOLDER if is_folder else 0)
+            | (_KIND_VOLUME if is_volume else 0)
+        )
         self.run_count = run_count
         self.highlighted_name = highlighted_name
         self.highlighted_path = highlighted_path
 
+    @property
+    def full_path(self) -> Optional[str]:
+        """完整路径（包含文件名），未指定时由path和name拼接"""
+        if self._full_path is not None:
+            return self._full_path
+        name, path = self.name, self.path
+        return os.path.join(path, name) if path and name else None
+
+    @full_path.setter
+    def full_path(self, value: Optional[str]) -> None:
+        self._full_path = value
+
+    @property
+    def extension(self) -> Optional[str]:
+        """文件扩展名（不含点），未读取时由文件名得出；文件夹和卷没有扩展名"""
+        if self._extension is not None:
+            return self._extension
+        return derive_extension(self.name, bool(self._kind & (_KIND_FOLDER | _KIND_VOLUME)))
+
+    @extension.setter
+    def extension(self, value: Optional[str]) -> None:
+        self._extension = value
+
+    def _set_kind(self, bit: int, value: bool) -> None:
+        """设置类型标志位"""
+        self._kind = self._kind | bit if value else self._kind & ~bit
+
+    @property
+    def is_file(self) -> bool:
+        """是否为文件"""
+        return bool(self._kind & _KIND_FILE)
+
+    @is_file.setter
+    def is_file(self, value: bool) -> None:
+        self._set_kind(_KIND_FILE, value)
+
+    @property
+    def is_folder(self) -> bool:
+        """是否为文件夹"""
+        return bool(self._kind & _KIND_FOLDER)
+
+    @is_folder.setter
+    def is_folder(self, value: bool) -> None:
+        self._set_kind(_KIND_FOLDER, value)
+
+    @property
+    def is_volume(self) -> bool:
+        """是否为卷"""
+        return bool(self._kind & _KIND_VOLUME)
+
+    @is_volume.setter
+    def is_volume(self, value: bool) -> None:
+        self._set_kind(_KIND_VOLUME, value)
+
     def to_dict(self) -> Dict[str, Any]:
         """将结果转换为字典
 
@@ -119,25 +388,176 @@ class FileResult:
         return f"FileResult(name='{self.name}', path='{self.path}', is_file={self.is_file})"
 
 
+# FileResult中保存的字段（full_path由name和path得出）
+FILE_RESULT_FIELDS = (
+    "name",
+    "path",
+    "size",
+    "date_created",
+    "date_modified",
+    "date_accessed",
+    "date_run",
+    "extension",
+    "attributes",
+    "is_file",
+    "is_folder",
+    "is_volume",
+    "run_count",
+    "highlighted_name",
+    "highlighted_path",
+)
+
+
+class LazyFileResult:
+    """绑定到结果索引的延迟读取行
+
+    第一次读取某个属性时才调用对应的Everything_GetResult*函数，读取的值缓存在行中。
+    所属的查询被替换后读取尚未缓存的属性会抛出StaleResultError，
+    需要保留的行应在执行新查询之前调用materialize()。
+    """
+
+    __slots__ = ("_results", "_index", "_values")
+
+    def __init__(self, results: "ResultSet", index: int):
+        """初始化延迟读取行
+
+        Args:
+            results: 所属的结果集
+            index: 结果索引
+        """
+        self._results = results
+        self._index = index
+        self._values: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        """读取结果字段，只在第一次读取时调用DLL
+
+        Raises:
+            AttributeError: 如果不是结果字段
+            StaleResultError: 如果所属的查询已被替换
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        values = self._values
+        if name in values:
+            return values[name]
+        results = self._results
+        getter = results._lazy_getter(name)
+        with results._lock:
+            results.check_current()
+            value = values[name] = getter(self._index)
+        return value
+
+    def _rebind(self, index: int) -> None:
+        """绑定到另一个结果索引（享元迭代时复用同一个对象）"""
+        self._index = index
+        self._values.clear()
+
+    @property
+    def index(self) -> int:
+        """结果索引"""
+        return self._index
+
+    @property
+    def full_path(self) -> Optional[str]:
+        """完整路径（包含文件名），由已读取的name和path拼接"""
+        name, path = self.name, self.path
+        return os.path.join(path, name) if path and name else None
+
+    @property
+    def extension(self) -> Optional[str]:
+        """文件扩展名（不含点），未请求时由文件名得出"""
+        if self._results.request_flags & RequestFlag.EXTENSION:
+            return self.__getattr__("extension")
+        return derive_extension(self.name, self.is_folder or self.is_volume)
+
+    def materialize(self) -> FileResult:
+        """读取全部字段，得到不依赖DLL状态的FileResult
+
+        Returns:
+            FileResult对象
+
+        Raises:
+            StaleResultError: 如果所属的查询已被替换
+        """
+        values = {
+            field: getattr(self, field) for field in FILE_RESULT_FIELDS if field != "extension"
+        }
+        if self._results.request_flags & RequestFlag.EXTENSION:
+            values["extension"] = self.extension
+        # 未请求扩展名时由FileResult在读取时得出
+        return FileResult(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """将结果转换为字典
+
+        Returns:
+            包含所有属性的字典
+        """
+        return self.materialize().to_dict()
+
+    def __repr__(self) -> str:
+        """对象表示"""
+        return f"LazyFileResult(index={self._index})"
+
+
+def _read_none(index: int) -> None:
+    """未请求字段的读取函数"""
+    return None
+
+
 class ResultSet:
     """搜索结果集合，负责从Everything中获取和处理搜索结果"""
 
     def __init__(
-        self, dll, max_results: Optional[int] = None, convert_date: bool = True
+        self,
+        dll,
+        max_results: Optional[int] = None,
+        convert_date: bool = True,
+        fields: Optional[Sequence[str]] = None,
+        record_type: Optional[Callable[..., Any]] = None,
+        date_mode: Optional[str] = None,
+        generation: Optional[int] = None,
     ):
         """初始化结果集
 
         Args:
             dll: Everything DLL实例
             max_results: 最大结果数量，None表示所有结果
-            convert_date: 是否将时间转换为datetime对象，False则使用字符串
+            convert_date: 是否将时间转换为datetime对象，False则使用字符串；指定date_mode时忽略
+            fields: 投影字段，指定后迭代只读取这些字段并返回记录而不是FileResult
+            record_type: 投影记录类型，按字段顺序以位置参数构造（tuple直接返回元组），默认为namedtuple
+            date_mode: 日期模式，见time_utils.DATE_MODES，默认由convert_date决定（"datetime"或"str"）
+            generation: 产生这些结果的查询代数，默认为当前代数
+
+        Raises:
+            ValueError: 如果日期模式或字段名无效
         """
         self._dll = dll
-        self._convert_date = convert_date
-
-        self._total_results = dll.Everything_GetNumResults()
-        self._total_files = dll.Everything_GetTotFileResults()
-        self._total_folders = dll.Everything_GetTotFolderResults()
+        self._state = dll_state(dll)
+        # 读取DLL中的行时持有会话锁并确认查询代数，避免读到之后其他查询的结果
+        self._lock = self._state.lock
+        self._generation = self._state.generation if generation is None else generation
+        self._lazy_getters: Dict[str, Callable[[int], Any]] = {}
+        if date_mode is None:
+            date_mode = "datetime" if convert_date else "str"
+        # 有效范围在创建结果集时计算一次
+        self._decode_date = FiletimeDecoder(date_mode)
+        self._fields = tuple(fields) if fields else None
+        if self._fields is not None:
+            fields_to_request_flags(self._fields)  # 校验字段名
+            self._record_type = record_type or record_type_for(self._fields)
+        else:
+            self._record_type = None
+
+        with self._lock:
+            self.check_current()
+            # 查询时实际请求的字段，未请求的字段不再读取
+            self._request_flags = dll.Everything_GetResultListRequestFlags()
+
+            self._total_results = dll.Everything_GetNumResults()
+            self._total_files = dll.Everything_GetTotFileResults()
+            self._total_folders = dll.Everything_GetTotFolderResults()
 
         self._max_results = (
             max_results if max_results is not None else self._total_results
@@ -151,17 +571,211 @@ class ResultSet:
         """
         return min(self._total_results, self._max_results)
 
-    def __iter__(self) -> Iterator[FileResult]:
-        """迭代结果集"""
-        for i in range(min(self._total_results, self._max_results)):
-            try:
-                result = self._get_result_item(i)
-                if result:
-                    yield result
-            except Exception as e:
-                if DEBUG:
-                    print(f"处理结果项 {i} 时出错: {e}")
-                continue  # 跳过出错的项，继续处理下一项
+    def __iter__(self) -> Iterator[Any]:
+        """迭代结果集
+
+        Returns:
+            结果迭代器，元素为FileResult对象；指定了投影字段时为投影记录
+        """
+        return self._iter_rows(0, len(self))
+
+    async def aiter(self, chunk_size: int = ASYNC_CHUNK_SIZE) -> AsyncIterator[Any]:
+        """异步迭代结果集
+
+        每批结果在线程池中读取，读取DLL期间不阻塞事件循环。
+        结果集直接读取DLL的当前状态，迭代期间不要在其他线程或协程中执行新的查询；
+        并发场景请使用execute_async()返回的已读取结果。
+
+        Args:
+            chunk_size: 每批读取的结果数量
+
+        Yields:
+            FileResult对象；指定了投影字段时为投影记录
+
+        Raises:
+            ValueError: 如果chunk_size小于1
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size必须大于0")
+        loop = asyncio.get_running_loop()
+        total = len(self)
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            chunk = await loop.run_in_executor(None, self._read_rows, start, stop)
+            for row in chunk:
+                yield row
+
+    def _read_rows(self, start: int, stop: int) -> List[Any]:
+        """读取索引在[start, stop)范围内的结果"""
+        return list(self._iter_rows(start, stop))
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """按索引随机读取结果，直接对应DLL中的结果索引，不读取其他行
+
+        Args:
+            index: 整数索引（支持负数）或切片（支持步长）
+
+        Returns:
+            FileResult对象或投影记录；切片时为列表
+
+        Raises:
+            IndexError: 如果索引超出范围
+            StaleResultError: 如果所属的查询已被替换
+        """
+        total = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(total)
+            self.check_current()
+            if step == 1:
+                return self._read_rows(start, max(start, stop))
+            return [self._read_row(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("结果索引超出范围")
+        self.check_current()
+        return self._read_row(index)
+
+    def _read_row(self, index: int) -> Any:
+        """读取单个结果
+
+        Raises:
+            StaleResultError: 如果所属的查询已被替换
+        """
+        with self._lock:
+            self.check_current()
+            if self._fields is None:
+                return self._get_result_item(index)
+            values = [self._field_getter(field)(index) for field in self._fields]
+        if self._record_type is tuple:
+            return tuple(values)
+        return self._record_type(*values)
+
+    def rows(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """读取一个窗口内的结果，适用于虚拟滚动等只显示部分结果的场景
+
+        Args:
+            start: 起始索引（支持负数）
+            stop: 结束索引（不包含，支持负数），默认为结果数量
+            fields: 只读取这些字段并返回namedtuple记录，不指定则与迭代结果相同；
+                查询时未请求的字段为None
+
+        Returns:
+            窗口内的结果列表
+
+        Raises:
+            ValueError: 如果字段名无效
+            StaleResultError: 如果所属的查询已被替换
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        self.check_current()
+        if fields is None:
+            return self._read_rows(start, stop)
+
+        fields = tuple(fields)
+        fields_to_request_flags(fields)  # 校验字段名
+        record_type = record_type_for(fields)
+        getters = [self._lazy_getter(field) for field in fields]
+        with self._lock:
+            self.check_current()
+            return [
+                record_type(*[getter(i) for getter in getters]) for i in range(start, stop)
+            ]
+
+    def iter_lazy(self, flyweight: bool = False) -> Iterator[LazyFileResult]:
+        """延迟读取的迭代，每个属性在第一次读取时才调用DLL
+
+        只读取name和full_path的场景下，每行只需要两次DLL调用。
+
+        Args:
+            flyweight: 是否在整个迭代中复用同一个行对象（不为每行创建对象）；
+                此时行只在当前迭代步骤中有效，需要保留时调用materialize()
+
+        Yields:
+            LazyFileResult对象
+        """
+        total = len(self)
+        if not flyweight:
+            for index in range(total):
+                yield LazyFileResult(self, index)
+            return
+        row = LazyFileResult(self, 0)
+        for index in range(total):
+            row._rebind(index)
+            yield row
+
+    def _lazy_getter(self, field: str) -> Callable[[int], Any]:
+        """获取延迟读取行使用的字段读取函数，未请求的字段返回None
+
+        Raises:
+            AttributeError: 如果不是结果字段
+        """
+        getter = self._lazy_getters.get(field)
+        if getter is not None:
+            return getter
+        if field not in FIELD_FLAGS:
+            raise AttributeError(f"'LazyFileResult' object has no attribute '{field}'")
+        flag = FIELD_FLAGS[field]
+        getter = self._field_getter(field) if self._request_flags & flag == flag else _read_none
+        self._lazy_getters[field] = getter
+        return getter
+
+    @property
+    def is_stale(self) -> bool:
+        """DLL中的结果列表是否已被之后的查询替换"""
+        return self._generation != self._state.generation
+
+    def check_current(self) -> None:
+        """确认DLL中的结果仍属于本结果集
+
+        Raises:
+            StaleResultError: 如果所属的查询已被替换
+        """
+        if self.is_stale:
+            raise StaleResultError("结果集所属的查询已被之后的查询替换，需要保留的行应先调用materialize()")
+
+    def _iter_rows(self, start: int, stop: int) -> Iterator[Any]:
+        """迭代索引在[start, stop)范围内的结果
+
+        Args:
+            start: 起始索引
+            stop: 结束索引（不包含）
+
+        Yields:
+            FileResult对象；指定了投影字段时为投影记录
+
+        Raises:
+            StaleResultError: 如果迭代期间所属的查询被替换
+        """
+        if self._fields is not None:
+            record_type = self._record_type
+            if record_type is tuple:
+                for values in self._iter_values(self._fields, start, stop):
+                    yield tuple(values)
+            else:
+                for values in self._iter_values(self._fields, start, stop):
+                    yield record_type(*values)
+            return
+
+        lock = self._lock
+        for i in range(start, stop):
+            # 每行在会话锁内读取，不跨越yield持有锁
+            with lock:
+                self.check_current()
+                try:
+                    result = self._get_result_item(i)
+                except Exception as e:
+                    if DEBUG:
+                        print(f"处理结果项 {i} 时出错: {e}")
+                    continue  # 跳过出错的项，继续处理下一项
+            if result:
+                yield result
 
     def _get_result_item(self, index: int) -> FileResult:
         """获取指定索引的结果
@@ -172,32 +786,69 @@ class ResultSet:
         Returns:
             FileResult对象
         """
+        # 只读取查询时请求过的字段，其余保持为None
+        flags = self._request_flags
+
         # 基本信息
-        file_name = self._dll.Everything_GetResultFileNameW(index)
-        path = self._dll.Everything_GetResultPathW(index)
+        file_name = (
+            self._dll.Everything_GetResultFileNameW(index)
+            if flags & RequestFlag.FILE_NAME
+            else None
+        )
+        path = (
+            self._dll.Everything_GetResultPathW(index)
+            if flags & RequestFlag.PATH
+            else None
+        )
 
         # 文件类型
         is_file = bool(self._dll.Everything_IsFileResult(index))
         is_folder = bool(self._dll.Everything_IsFolderResult(index))
         is_volume = bool(self._dll.Everything_IsVolumeResult(index))
-        extension = self._dll.Everything_GetResultExtensionW(index)
+        extension = (
+            self._dll.Everything_GetResultExtensionW(index)
+            if flags & RequestFlag.EXTENSION
+            else None
+        )
 
         # 大小
-        size = self._get_size(index)
+        size = self._get_size(index) if flags & RequestFlag.SIZE else None
 
         # 日期
-        date_created = self._get_date_created(index)
-        date_modified = self._get_date_modified(index)
-        date_accessed = self._get_date_accessed(index)
-        date_run = self._get_date_run(index)
+        date_created = (
+            self._get_date_created(index) if flags & RequestFlag.DATE_CREATED else None
+        )
+        date_modified = (
+            self._get_date_modified(index)
+            if flags & RequestFlag.DATE_MODIFIED
+            else None
+        )
+        date_accessed = (
+            self._get_date_accessed(index)
+            if flags & RequestFlag.DATE_ACCESSED
+            else None
+        )
+        date_run = self._get_date_run(index) if flags & RequestFlag.DATE_RUN else None
 
         # 其他属性
-        attributes = self._get_attributes(index)
-        run_count = self._get_run_count(index)
+        attributes = (
+            self._get_attributes(index) if flags & RequestFlag.ATTRIBUTES else None
+        )
+        run_count = (
+            self._get_run_count(index) if flags & RequestFlag.RUN_COUNT else None
+        )
 
         # 高亮信息
-        highlighted_name = self._get_highlighted_name(index)
-        highlighted_path = self._get_highlighted_path(index)
+        highlighted_name = (
+            self._get_highlighted_name(index)
+            if flags & RequestFlag.HIGHLIGHTED_FILE_NAME
+            else None
+        )
+        highlighted_path = (
+            self._get_highlighted_path(index)
+            if flags & RequestFlag.HIGHLIGHTED_PATH
+            else None
+        )
 
         return FileResult(
             name=file_name,
@@ -217,6 +868,67 @@ class ResultSet:
             highlighted_path=highlighted_path,
         )
 
+    def _field_getter(self, field: str) -> Callable[[int], Any]:
+        """获取投影字段的读取函数
+
+        Args:
+            field: 字段名
+
+        Returns:
+            以结果索引为参数的读取函数
+        """
+        dll = self._dll
+        if field == "name":
+            return dll.Everything_GetResultFileNameW
+        if field == "path":
+            return dll.Everything_GetResultPathW
+        if field == "full_path":
+            get_name = dll.Everything_GetResultFileNameW
+            get_path = dll.Everything_GetResultPathW
+
+            def get_full_path(index: int) -> Optional[str]:
+                name, path = get_name(index), get_path(index)
+                return os.path.join(path, name) if path and name else None
+
+            return get_full_path
+        if field == "extension":
+            return dll.Everything_GetResultExtensionW
+        if field in ("is_file", "is_folder", "is_volume"):
+            is_kind = getattr(dll, f"Everything_Is{field[3:].capitalize()}Result")
+            return lambda index: bool(is_kind(index))
+        return getattr(self, f"_get_{field}")
+
+    def _iter_values(
+        self, fields: Sequence[str], start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[List[Any]]:
+        """按字段读取每一行的值，每个字段只调用对应的DLL函数
+
+        Args:
+            fields: 字段名列表
+            start: 起始索引
+            stop: 结束索引（不包含），默认为结果数量
+
+        Yields:
+            每一行的字段值列表
+
+        Raises:
+            StaleResultError: 如果迭代期间所属的查询被替换
+        """
+        getters = [self._field_getter(field) for field in fields]
+        if stop is None:
+            stop = len(self)
+        lock = self._lock
+        for i in range(start, stop):
+            with lock:
+                self.check_current()
+                try:
+                    values = [getter(i) for getter in getters]
+                except Exception as e:
+                    if DEBUG:
+                        print(f"处理结果项 {i} 时出错: {e}")
+                    continue  # 跳过出错的项，继续处理下一项
+            yield values
+
     def _get_size(self, index: int) -> Optional[int]:
         """获取文件大小
 
@@ -230,79 +942,43 @@ class ResultSet:
         self._dll.Everything_GetResultSize(index, buffer)
         return buffer.value if buffer.value != 0xFFFFFFFFFFFFFFFF else None
 
-    def _get_date_created(self, index: int) -> Optional[Union[datetime, str]]:
+    def _get_date_created(self, index: int) -> Optional[Union[datetime, str, float]]:
         """获取创建日期
 
         Args:
             index: 结果索引
 
         Returns:
-            创建日期，格式取决于convert_date设置
+            创建日期，格式取决于date_mode设置
         """
         try:
             buffer = ctypes.c_ulonglong(0)
             self._dll.Everything_GetResultDateCreated(index, buffer)
-
-            if buffer.value == 0 or buffer.value == 0xFFFFFFFFFFFFFFFF:
-                return None
-
-            # 检查时间戳是否在有效范围内
-            microsecs = (buffer.value - 116444736000000000.0) / 10000000.0
-            current_time = time.time()
-            if microsecs < 0 or microsecs > current_time + 3153600000:  # 现在+100年
-                return None
-
-            filetime = struct.pack("<Q", buffer.value)
-            if self._convert_date:
-                try:
-                    return filetime_to_datetime(filetime)
-                except Exception as e:
-                    if DEBUG:
-                        print(f"创建日期转换错误: {e}")
-                    return None
-            return filetime_to_str(filetime)
+            return self._decode_date(buffer.value)
         except Exception as e:
             if DEBUG:
                 print(f"获取创建日期错误: {e}")
             return None
 
-    def _get_date_modified(self, index: int) -> Optional[Union[datetime, str]]:
+    def _get_date_modified(self, index: int) -> Optional[Union[datetime, str, float]]:
         """获取修改日期
 
         Args:
             index: 结果索引
 
         Returns:
-            修改日期，格式取决于convert_date设置
+            修改日期，格式取决于date_mode设置
         """
         try:
             buffer = ctypes.c_ulonglong(0)
             self._dll.Everything_GetResultDateModified(index, buffer)
-
-            if buffer.value == 0 or buffer.value == 0xFFFFFFFFFFFFFFFF:
-                return None
-
-            # 检查时间戳是否在有效范围内
-            microsecs = (buffer.value - 116444736000000000.0) / 10000000.0
-            current_time = time.time()
-            if microsecs < 0 or microsecs > current_time + 3153600000:  # 现在+100年
-                return None
-
-            filetime = struct.pack("<Q", buffer.value)
-            if self._convert_date:
-                try:
-                    return filetime_to_datetime(filetime)
-                except Exception as e:
-                    if DEBUG:
-                        print(f"修改日期转换错误: {e}")
-                    return None
-            return filetime_to_str(filetime)
+            return self._decode_date(buffer.value)
         except Exception as e:
             if DEBUG:
                 print(f"获取修改日期错误: {e}")
             return None
 
-    def _get_date_accessed(self, index: int) -> Optional[Union[datetime, str]]:
+    def _get_date_accessed(self, index: int) -> Optional[Union[datetime, str, float]]:
         """获取访问日期"""
         try:
             buffer = ctypes.c_ulonglong(0)
@@ -314,61 +990,25 @@ class ResultSet:
                     f"winticks: {buffer.value}, microsecs: {(buffer.value - 116444736000000000.0) / 10000000.0}"
                 )
 
-            # 增加对无效值的检查
-            if buffer.value == 0 or buffer.value == 0xFFFFFFFFFFFFFFFF:
-                return None
-
-            # 检查时间戳是否在有效范围内
-            microsecs = (buffer.value - 116444736000000000.0) / 10000000.0
-            current_time = time.time()
-            if microsecs < 0 or microsecs > current_time + 3153600000:  # 现在+100年
-                return None
-
-            filetime = struct.pack("<Q", buffer.value)
-            if self._convert_date:
-                try:
-                    return filetime_to_datetime(filetime)
-                except Exception as e:
-                    if DEBUG:
-                        print(f"日期转换错误: {e}")
-                    return None
-            return filetime_to_str(filetime)
+            return self._decode_date(buffer.value)
         except Exception as e:
             if DEBUG:
                 print(f"获取访问日期错误: {e}")
             return None
 
-    def _get_date_run(self, index: int) -> Optional[Union[datetime, str]]:
+    def _get_date_run(self, index: int) -> Optional[Union[datetime, str, float]]:
         """获取运行日期
 
         Args:
             index: 结果索引
 
         Returns:
-            运行日期，格式取决于convert_date设置
+            运行日期，格式取决于date_mode设置
         """
         try:
             buffer = ctypes.c_ulonglong(0)
             self._dll.Everything_GetResultDateRun(index, buffer)
-
-            if buffer.value == 0 or buffer.value == 0xFFFFFFFFFFFFFFFF:
-                return None
-
-            # 检查时间戳是否在有效范围内
-            microsecs = (buffer.value - 116444736000000000.0) / 10000000.0
-            current_time = time.time()
-            if microsecs < 0 or microsecs > current_time + 3153600000:  # 现在+100年
-                return None
-
-            filetime = struct.pack("<Q", buffer.value)
-            if self._convert_date:
-                try:
-                    return filetime_to_datetime(filetime)
-                except Exception as e:
-                    if DEBUG:
-                        print(f"运行日期转换错误: {e}")
-                    return None
-            return filetime_to_str(filetime)
+            return self._decode_date(buffer.value)
         except Exception as e:
             if DEBUG:
                 print(f"获取运行日期错误: {e}")
@@ -418,14 +1058,211 @@ class ResultSet:
         """
         return self._dll.Everything_GetResultHighlightedPathW(index)
 
+    def to_columns(
+        self, columns: Optional[Iterable[str]] = None, dates: str = "raw"
+    ) -> Dict[str, Any]:
+        """按列批量读取结果，不创建FileResult对象
+
+        大小和日期列为array('Q')（日期为原始FILETIME，0表示未知；大小未知为0xFFFFFFFFFFFFFFFF），
+        属性和运行次数列为array('I')，is_file/is_folder/is_volume为array('B')，名称、路径、扩展名和高亮文本为字符串列表。
+
+        Args:
+            columns: 要读取的列名，不指定则读取本次查询请求过的所有列和is_folder
+            dates: 日期列的格式："raw"（原始FILETIME数组）、time_utils.DATE_MODES中的其他日期模式
+                （转换为列表）或"datetime64"（numpy数组，需要numpy），转换后未知日期为None或NaT
+
+        Returns:
+            列名到列数据的字典
+
+        Raises:
+            ValueError: 如果列名或日期格式无效
+        """
+        if dates not in DATE_FORMATS:
+            raise ValueError(f"未知的日期格式: {dates}，可选值: {', '.join(DATE_FORMATS)}")
+        names = self._column_names(columns)
+        return decode_date_columns(self._read_columns(names, 0, len(self)), dates)
+
+    def iter_columns(
+        self, columns: Optional[Iterable[str]] = None, chunk_size: int = COLUMN_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """按块读取列数据，每次只在内存中保留一块
+
+        Args:
+            columns: 要读取的列名，见to_columns()
+            chunk_size: 每块的结果数量
+
+        Yields:
+            与to_columns(dates="raw")格式相同的列数据，每块最多chunk_size行
+
+        Raises:
+            ValueError: 如果列名或块大小无效
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size必须大于0")
+        names = self._column_names(columns)
+        total = len(self)
+        for start in range(0, total, chunk_size):
+            yield self._read_columns(names, start, min(start + chunk_size, total))
+
+    def _column_names(self, columns: Optional[Iterable[str]]) -> List[str]:
+        """解析要读取的列名，不指定则为本次查询请求过的所有列和is_folder"""
+        if columns is None:
+            return [
+                column
+                for column, (flag, _, _) in COLUMNS.items()
+                if (self._request_flags & flag if flag else column == "is_folder")
+            ]
+        columns = list(columns)
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"未知的列: {', '.join(unknown)}")
+        return columns
+
+    def _read_columns(self, columns: List[str], start: int, stop: int) -> Dict[str, Any]:
+        """读取[start, stop)范围内的列数据，日期为原始FILETIME
+
+        Raises:
+            StaleResultError: 如果所属的查询已被替换
+        """
+        with self._lock:
+            self.check_current()
+            return self._read_columns_locked(columns, start, stop)
+
+    def _read_columns_locked(self, columns: List[str], start: int, stop: int) -> Dict[str, Any]:
+        """读取列数据（需持有会话锁）"""
+        indexes = range(start, stop)
+        result: Dict[str, Union[array, List[str]]] = {}
+        for column in columns:
+            _, typecode, function_name = COLUMNS[column]
+            getter = getattr(self._dll, function_name)
+            if typecode is None:
+                result[column] = [getter(i) or "" for i in indexes]
+            elif typecode == "Q":
+                default = UNKNOWN_SIZE if column == "size" else 0
+                values = array("Q", [default]) * len(indexes)
+                buffer = ctypes.c_ulonglong(default)
+                buffer_ref = ctypes.byref(buffer)
+                for position, i in enumerate(indexes):
+                    buffer.value = default
+                    getter(i, buffer_ref)
+                    values[position] = buffer.value
+                result[column] = values
+            elif typecode == "B":
+                result[column] = array("B", [1 if getter(i) else 0 for i in indexes])
+            else:
+                result[column] = array(typecode, [getter(i) or 0 for i in indexes])
+        return result
+
+    def to_arrow(self, columns: Optional[Iterable[str]] = None) -> Any:
+        """按列读取结果并转换为Arrow表（需要pyarrow）
+
+        整数列由to_columns()填入的类型化数组直接作为Arrow缓冲区，不逐行创建对象；
+        日期由原始FILETIME转换为timestamp[ns]（UTC），扩展名使用字典编码。
+
+        Args:
+            columns: 要读取的列名，见to_columns()
+
+        Returns:
+            pyarrow.Table
+
+        Raises:
+            ValueError: 如果列名无效
+            ImportError: 如果没有安装pyarrow
+        """
+        from .arrow import columns_to_arrow
+
+        return columns_to_arrow(self.to_columns(columns))
+
+    def to_pandas(self, columns: Optional[Iterable[str]] = None) -> Any:
+        """按列读取结果并转换为DataFrame（需要pyarrow和pandas）
+
+        经由to_arrow()转换，转换时释放Arrow缓冲区，内存中只保留约一份列式数据。
+        大小为UInt64（未知为<NA>），日期为datetime64[ns]（UTC，未知为NaT），扩展名为category。
+
+        Args:
+            columns: 要读取的列名，见to_columns()
+
+        Returns:
+            pandas.DataFrame
+
+        Raises:
+            ValueError: 如果列名无效
+            ImportError: 如果没有安装pyarrow或pandas
+        """
+        from .arrow import arrow_to_pandas
+
+        return arrow_to_pandas(self.to_arrow(columns), self_destruct=True)
+
+    def export(
+        self,
+        target: Any,
+        format: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        dates: str = "iso",
+        compression: Optional[str] = None,
+        chunk_size: int = COLUMN_CHUNK_SIZE,
+    ) -> int:
+        """按块读取结果并流式写出为CSV、JSON Lines或Parquet
+
+        每次只读取chunk_size行，占用的内存与结果数量无关。
+
+        Args:
+            target: 文件路径、二进制流或文本流
+            format: "csv"、"jsonl"或"parquet"（需要pyarrow），不指定则根据文件扩展名判断
+            columns: 要导出的列名，见to_columns()
+            dates: csv和jsonl中日期的格式："iso"（默认）、"epoch"、"str"或"raw"
+            compression: "gzip"或"zstd"，不指定则根据文件扩展名判断（.gz/.zst）
+            chunk_size: 每块的结果数量
+
+        Returns:
+            写出的行数
+
+        Raises:
+            ValueError: 如果列名、格式、日期格式或压缩方式无效
+            ImportError: 如果缺少Parquet或zstd所需的可选依赖
+        """
+        from .export import export_columns
+
+        names = self._column_names(columns)
+        return export_columns(
+            names, self.iter_columns(names, chunk_size), target, format, dates, compression
+        )
+
     def to_list(self) -> List[Dict[str, Any]]:
         """将结果集转换为字典列表
 
         Returns:
-            字典列表
+            字典列表，指定了投影字段时只包含这些字段
         """
+        if self._fields is not None:
+            fields = self._fields
+            return [dict(zip(fields, values)) for values in self._iter_values(fields)]
         return [item.to_dict() for item in self]
 
+    @property
+    def fields(self) -> Optional[Tuple[str, ...]]:
+        """投影字段
+
+        Returns:
+            投影字段元组，未投影时为None
+        """
+        return self._fields
+
+    @property
+    def record_type(self) -> Optional[Callable[..., Any]]:
+        """投影记录类型，未投影时为None"""
+        return self._record_type
+
+    @property
+    def request_flags(self) -> RequestFlag:
+        """查询时实际请求的标志位"""
+        return RequestFlag(self._request_flags)
+
+    @property
+    def date_mode(self) -> str:
+        """日期模式"""
+        return self._decode_date.mode
+
     @property
     def total_results(self) -> int:
         """结果总数
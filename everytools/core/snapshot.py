@@ -0,0 +1,613 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+结果快照模块
+Detached, immutable result snapshot module
+
+ResultSet直接读取DLL的当前状态，下一次查询执行后就会读到新查询的结果。
+ResultSnapshot把结果一次性按列复制出来：字符串列保存为驻留（interned）字符串的元组，
+整数列打包为只读的memoryview。快照不再依赖DLL，可以缓存、在线程间传递并多次迭代。
+"""
+
+import asyncio
+import os
+import sys
+from array import array
+from types import MappingProxyType
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ..constants import RequestFlag
+from .arrow import arrow_to_pandas, columns_to_arrow
+from .export import export_columns
+from .query_compiler import CompiledQuery, compile_query
+from .result import (
+    ASYNC_CHUNK_SIZE,
+    COLUMN_CHUNK_SIZE,
+    COLUMNS,
+    UNKNOWN_SIZE,
+    FileResult,
+    ResultSet,
+    decode_date_columns,
+    fields_to_request_flags,
+    record_type_for,
+)
+from ..utils.time_utils import DATE_FORMATS, FiletimeDecoder
+
+# FileResult的数据列（full_path由name和path得出）
+FILE_RESULT_COLUMNS = (
+    "name",
+    "path",
+    "extension",
+    "size",
+    "date_created",
+    "date_modified",
+    "date_accessed",
+    "date_run",
+    "attributes",
+    "run_count",
+    "highlighted_name",
+    "highlighted_path",
+    "is_file",
+    "is_folder",
+    "is_volume",
+)
+
+Column = Union[Tuple[Optional[str], ...], memoryview]
+
+
+def snapshot_columns(
+    fields: Optional[Sequence[str]], request_flags: RequestFlag
+) -> List[str]:
+    """快照需要保存的列：投影时为投影字段所需的列，否则为请求过的列和is_file/is_folder/is_volume
+
+    Args:
+        fields: 投影字段，未投影时为None
+        request_flags: 查询的请求标志位
+
+    Returns:
+        按COLUMNS顺序排列的列名
+    """
+    if fields:
+        wanted = set()
+        for field in fields:
+            wanted.update(("name", "path") if field == "full_path" else (field,))
+    else:
+        wanted = {
+            column
+            for column in FILE_RESULT_COLUMNS
+            if not COLUMNS[column][0] or request_flags & COLUMNS[column][0]
+        }
+    return [column for column in COLUMNS if column in wanted]
+
+
+def take_column(column: Column, indexes: Sequence[int]) -> Column:
+    """按下标取出列中的部分数据，保持列的类型（元组或只读memoryview）
+
+    Args:
+        column: 字符串列（元组）或整数列（memoryview）
+        indexes: 行下标
+
+    Returns:
+        同类型的新列
+    """
+    if isinstance(column, memoryview):
+        values = array(column.format, [column[i] for i in indexes])
+        return memoryview(values.tobytes()).cast(column.format)
+    return tuple(column[i] for i in indexes)
+
+
+def _intern_all(values: Sequence[Optional[str]]) -> Tuple[Optional[str], ...]:
+    """驻留字符串列中的每个字符串，重复的路径和扩展名只保存一份"""
+    intern = sys.intern
+    return tuple(intern(value) if value else value for value in values)
+
+
+class ResultSnapshot:
+    """不可变的结果快照"""
+
+    __slots__ = (
+        "_columns",
+        "_length",
+        "_fields",
+        "_record_type",
+        "_decode_date",
+        "_total_results",
+        "_total_files",
+        "_total_folders",
+        "_readers",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        columns: Mapping[str, Column],
+        length: int,
+        total_results: int,
+        total_files: int,
+        total_folders: int,
+        fields: Optional[Tuple[str, ...]] = None,
+        record_type: Optional[Callable[..., Any]] = None,
+        date_mode: str = "datetime",
+    ):
+        """初始化快照，通常使用from_result_set()创建
+
+        Args:
+            columns: 列名到列数据的映射，字符串列为元组，整数列为只读memoryview
+            length: 结果数量
+            total_results: 结果总数
+            total_files: 文件总数
+            total_folders: 文件夹总数
+            fields: 投影字段，未投影时为None
+            record_type: 投影记录类型，默认为namedtuple
+            date_mode: 日期模式，见time_utils.DATE_MODES
+
+        Raises:
+            ValueError: 如果日期模式无效
+        """
+        self._columns = MappingProxyType(dict(columns))
+        self._length = length
+        self._total_results = total_results
+        self._total_files = total_files
+        self._total_folders = total_folders
+        self._fields = fields
+        self._record_type = (record_type or record_type_for(fields)) if fields else None
+        self._decode_date = FiletimeDecoder(date_mode)
+        names = fields if fields else FILE_RESULT_COLUMNS + ("full_path",)
+        self._readers = {name: self._field_reader(name) for name in names}
+
+    @classmethod
+    def from_result_set(cls, result_set: ResultSet) -> "ResultSnapshot":
+        """按列复制ResultSet的全部结果
+
+        只复制查询时请求过的字段（投影时只复制投影字段），调用方需保证期间DLL状态不变。
+
+        Args:
+            result_set: 基于当前DLL状态的结果集
+
+        Returns:
+            ResultSnapshot实例
+        """
+        fields = result_set.fields
+        names = snapshot_columns(fields, result_set.request_flags)
+
+        columns: Dict[str, Column] = {}
+        for name, data in result_set.to_columns(names).items():
+            typecode = COLUMNS[name][1]
+            if typecode is None:
+                columns[name] = _intern_all(data)
+            else:
+                columns[name] = memoryview(data.tobytes()).cast(typecode)
+
+        return cls(
+            columns,
+            len(result_set),
+            result_set.total_results,
+            result_set.total_files,
+            result_set.total_folders,
+            fields,
+            result_set.record_type,
+            result_set.date_mode,
+        )
+
+    @classmethod
+    def empty(
+        cls,
+        fields: Optional[Sequence[str]] = None,
+        request_flags: RequestFlag = RequestFlag.FILE_NAME | RequestFlag.PATH,
+        record_type: Optional[Callable[..., Any]] = None,
+        date_mode: str = "datetime",
+    ) -> "ResultSnapshot":
+        """创建没有结果的快照，列与相同设置的查询结果一致
+
+        Args:
+            fields: 投影字段，未投影时为None
+            request_flags: 查询的请求标志位
+            record_type: 投影记录类型
+            date_mode: 日期模式
+
+        Returns:
+            长度为0的ResultSnapshot
+        """
+        columns: Dict[str, Column] = {}
+        for name in snapshot_columns(fields, request_flags):
+            typecode = COLUMNS[name][1]
+            columns[name] = () if typecode is None else memoryview(b"").cast(typecode)
+        return cls(
+            columns,
+            0,
+            0,
+            0,
+            0,
+            tuple(fields) if fields else None,
+            record_type,
+            date_mode,
+        )
+
+    def take(self, indexes: Sequence[int]) -> "ResultSnapshot":
+        """按下标取出部分行，得到新的快照
+
+        新快照的结果总数、文件数和文件夹数按取出的行重新计算（没有is_folder列时全部计为文件）。
+
+        Args:
+            indexes: 行下标，按需要的顺序排列
+
+        Returns:
+            新的ResultSnapshot，字段、记录类型和日期模式不变
+        """
+        return self._subset(indexes, indexes)
+
+    def _subset(self, indexes: Sequence[int], matched: Sequence[int]) -> "ResultSnapshot":
+        """取出indexes行，文件数和文件夹数按matched行计算"""
+        columns = {name: take_column(data, indexes) for name, data in self._columns.items()}
+        is_folder = self._columns.get("is_folder")
+        folders = sum(is_folder[i] for i in matched) if is_folder is not None else 0
+        return ResultSnapshot(
+            columns,
+            len(indexes),
+            len(indexes),
+            len(matched) - folders,
+            folders,
+            self._fields,
+            self._record_type,
+            self._decode_date.mode,
+        )
+
+    def can_refine(self, query: CompiledQuery) -> bool:
+        """检查能否在快照上对查询求值：查询可以在本地求值，且快照包含所需的列和is_folder列"""
+        return query.local and query.required_columns <= set(self._columns) and (
+            "is_folder" in self._columns
+        )
+
+    def refine(
+        self,
+        query: Union[str, CompiledQuery],
+        match_case: bool = False,
+        match_path: bool = False,
+        match_whole_word: bool = False,
+        offset: int = 0,
+        max_results: Optional[int] = None,
+    ) -> "ResultSnapshot":
+        """在快照中筛选同时满足另一个查询的行，不访问Everything
+
+        与Everything一样，offset和max_results只限制返回的行，文件数和文件夹数统计全部匹配的行。
+
+        Args:
+            query: 查询字符串或compile_query()的结果
+            match_case: 是否区分大小写（query为字符串时有效）
+            match_path: 是否匹配完整路径（query为字符串时有效）
+            match_whole_word: 是否全字匹配（query为字符串时有效）
+            offset: 跳过的匹配行数
+            max_results: 最多返回的行数，None表示不限制
+
+        Returns:
+            只包含匹配行的新快照，保持原有顺序
+
+        Raises:
+            ValueError: 如果查询无法在本地求值，或快照中没有求值所需的列
+        """
+        if isinstance(query, str):
+            query = compile_query(query, match_case, match_path, match_whole_word)
+        if not query.local:
+            raise ValueError(f"查询无法在本地求值: {', '.join(sorted(query.unsupported))}")
+        if not self.can_refine(query):
+            missing = (query.required_columns | {"is_folder"}) - set(self._columns)
+            raise ValueError(f"快照中没有求值所需的列: {', '.join(sorted(missing))}")
+        matched = query.select(self._columns, self._length)
+        stop = None if max_results is None else offset + max_results
+        return self._subset(matched[offset:stop], matched)
+
+    def _field_reader(self, field: str) -> Callable[[int], Any]:
+        """获取字段的读取函数，未复制的列返回None"""
+        if field == "full_path":
+            names = self._columns.get("name")
+            paths = self._columns.get("path")
+            if names is None or paths is None:
+                return lambda index: None
+
+            def read_full_path(index: int) -> Optional[str]:
+                name, path = names[index], paths[index]
+                return os.path.join(path, name) if path and name else None
+
+            return read_full_path
+
+        column = self._columns.get(field)
+        if column is None:
+            return lambda index: None
+        typecode = COLUMNS[field][1]
+        if typecode is None:
+            return column.__getitem__
+        if typecode == "B":
+            return lambda index: bool(column[index])
+        if field == "size":
+            return lambda index: None if column[index] == UNKNOWN_SIZE else column[index]
+        if field.startswith("date_"):
+            decode_date = self._decode_date
+            return lambda index: decode_date(column[index])
+        return column.__getitem__
+
+    def _row(self, index: int) -> Any:
+        """构造指定索引的结果（FileResult或投影记录）"""
+        readers = self._readers
+        if self._fields is None:
+            return FileResult(**{name: read(index) for name, read in readers.items()})
+        values = [read(index) for read in readers.values()]
+        if self._record_type is tuple:
+            return tuple(values)
+        return self._record_type(*values)
+
+    def __len__(self) -> int:
+        """结果数量"""
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        """迭代快照，每次迭代构造新的结果对象"""
+        for index in range(self._length):
+            yield self._row(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """按索引获取结果
+
+        Args:
+            index: 整数索引（支持负数）或切片
+
+        Returns:
+            结果对象；切片时为结果对象列表
+
+        Raises:
+            IndexError: 如果索引超出范围
+        """
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("快照索引超出范围")
+        return self._row(index)
+
+    def rows(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """读取一个窗口内的结果，参数与ResultSet.rows()相同
+
+        Args:
+            start: 起始索引（支持负数）
+            stop: 结束索引（不包含，支持负数），默认为结果数量
+            fields: 只读取这些字段并返回namedtuple记录，快照中没有的字段为None
+
+        Returns:
+            窗口内的结果列表
+
+        Raises:
+            ValueError: 如果字段名无效
+        """
+        start, stop, _ = slice(start, stop).indices(self._length)
+        indexes = range(start, max(start, stop))
+        if fields is None:
+            return [self._row(i) for i in indexes]
+
+        fields = tuple(fields)
+        fields_to_request_flags(fields)  # 校验字段名
+        record_type = record_type_for(fields)
+        readers = [self._field_reader(field) for field in fields]
+        return [record_type(*[read(i) for read in readers]) for i in indexes]
+
+    async def aiter(self, chunk_size: int = ASYNC_CHUNK_SIZE) -> AsyncIterator[Any]:
+        """异步迭代快照
+
+        结果已在内存中，每输出chunk_size行让出一次事件循环，避免长时间占用。
+
+        Args:
+            chunk_size: 每批输出的结果数量
+
+        Yields:
+            FileResult对象；指定了投影字段时为投影记录
+
+        Raises:
+            ValueError: 如果chunk_size小于1
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size必须大于0")
+        for start in range(0, self._length, chunk_size):
+            for index in range(start, min(start + chunk_size, self._length)):
+                yield self._row(index)
+            await asyncio.sleep(0)
+
+    def column(self, name: str) -> Column:
+        """获取原始列数据
+
+        Args:
+            name: 列名
+
+        Returns:
+            字符串列为元组，整数列为只读memoryview（日期为原始FILETIME）
+
+        Raises:
+            KeyError: 如果快照中没有这一列
+        """
+        return self._columns[name]
+
+    def to_columns(self, dates: str = "raw") -> Dict[str, Any]:
+        """复制全部列，格式与ResultSet.to_columns()相同
+
+        Args:
+            dates: 日期列的格式，见ResultSet.to_columns()
+
+        Returns:
+            列名到列数据的字典，整数列为array，字符串列为列表
+
+        Raises:
+            ValueError: 如果日期格式无效
+        """
+        if dates not in DATE_FORMATS:
+            raise ValueError(f"未知的日期格式: {dates}，可选值: {', '.join(DATE_FORMATS)}")
+        result: Dict[str, Any] = {}
+        for name, column in self._columns.items():
+            if isinstance(column, memoryview):
+                # 日期列直接由只读memoryview批量转换，不复制原始数据
+                if dates != "raw" and name.startswith("date_"):
+                    result[name] = column
+                else:
+                    result[name] = array(column.format, column)
+            else:
+                result[name] = list(column)
+        return decode_date_columns(result, dates)
+
+    def iter_columns(
+        self, columns: Optional[Iterable[str]] = None, chunk_size: int = COLUMN_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Column]]:
+        """按块遍历列数据，整数列为原始列的memoryview切片，不复制
+
+        Args:
+            columns: 要遍历的列名，不指定则为快照中保存的所有列
+            chunk_size: 每块的结果数量
+
+        Yields:
+            列名到列数据的字典，每块最多chunk_size行，日期为原始FILETIME
+
+        Raises:
+            ValueError: 如果列名或块大小无效
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size必须大于0")
+        names = list(self._columns) if columns is None else list(columns)
+        missing = [name for name in names if name not in self._columns]
+        if missing:
+            raise ValueError(f"快照中没有这些列: {', '.join(missing)}")
+        for start in range(0, self._length, chunk_size):
+            stop = min(start + chunk_size, self._length)
+            yield {name: self._columns[name][start:stop] for name in names}
+
+    def to_arrow(self) -> Any:
+        """将快照转换为Arrow表（需要pyarrow），格式与ResultSet.to_arrow()相同
+
+        整数列与快照共享内存，不复制。
+
+        Returns:
+            pyarrow.Table
+
+        Raises:
+            ImportError: 如果没有安装pyarrow
+        """
+        return columns_to_arrow(self._columns)
+
+    def to_pandas(self) -> Any:
+        """将快照转换为DataFrame（需要pyarrow和pandas），格式与ResultSet.to_pandas()相同
+
+        Returns:
+            pandas.DataFrame
+
+        Raises:
+            ImportError: 如果没有安装pyarrow或pandas
+        """
+        return arrow_to_pandas(self.to_arrow())
+
+    def export(
+        self,
+        target: Any,
+        format: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        dates: str = "iso",
+        compression: Optional[str] = None,
+        chunk_size: int = COLUMN_CHUNK_SIZE,
+    ) -> int:
+        """按块流式写出快照，参数与ResultSet.export()相同
+
+        Args:
+            target: 文件路径、二进制流或文本流
+            format: "csv"、"jsonl"或"parquet"，不指定则根据文件扩展名判断
+            columns: 要导出的列名，不指定则为快照中保存的所有列
+            dates: csv和jsonl中日期的格式
+            compression: "gzip"或"zstd"
+            chunk_size: 每块的结果数量
+
+        Returns:
+            写出的行数
+
+        Raises:
+            ValueError: 如果列名、格式、日期格式或压缩方式无效
+            ImportError: 如果缺少Parquet或zstd所需的可选依赖
+        """
+        names = list(self._columns) if columns is None else list(columns)
+        return export_columns(
+            names, self.iter_columns(names, chunk_size), target, format, dates, compression
+        )
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """将快照转换为字典列表
+
+        Returns:
+            字典列表，指定了投影字段时只包含这些字段
+        """
+        if self._fields is None:
+            return [row.to_dict() for row in self]
+        readers = self._readers
+        return [
+            {name: read(index) for name, read in readers.items()}
+            for index in range(self._length)
+        ]
+
+    @property
+    def date_mode(self) -> str:
+        """日期模式"""
+        return self._decode_date.mode
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """快照中保存的列名"""
+        return tuple(self._columns)
+
+    @property
+    def fields(self) -> Optional[Tuple[str, ...]]:
+        """投影字段"""
+        return self._fields
+
+    @property
+    def request_flags(self) -> RequestFlag:
+        """快照中保存的列对应的请求标志位"""
+        flags = RequestFlag(0)
+        for name in self._columns:
+            flags |= COLUMNS[name][0]
+        return flags
+
+    @property
+    def total_results(self) -> int:
+        """结果总数"""
+        return self._total_results
+
+    @property
+    def total_files(self) -> int:
+        """文件总数"""
+        return self._total_files
+
+    @property
+    def total_folders(self) -> int:
+        """文件夹总数"""
+        return self._total_folders
+
+    @property
+    def nbytes(self) -> int:
+        """列数据占用的近似字节数（不含共享的驻留字符串）"""
+        total = 0
+        for column in self._columns.values():
+            if isinstance(column, memoryview):
+                total += column.nbytes
+            else:
+                total += sys.getsizeof(column)
+        return total
@@ -15,6 +15,8 @@ import os
 import requests
 import zipfile
 from .constants import RequestFlag, SortType
+from .core.dll_loader import get_backend
+from .core.result import mark_query_changed
 
 # convert a windows FILETIME to a python datetime
 # https://stackoverflow.com/questions/39481221/convert-datetime-back-to-windows-64-bit-filetime
@@ -56,27 +58,57 @@ def download_dll(dll_dir):
 
 # 重复的枚举定义已移至constants.py，这里直接使用导入的版本
 
+# results()需要的字段
+RESULT_REQUEST_FLAGS = (
+    RequestFlag.FILE_NAME.value
+    | RequestFlag.PATH.value
+    | RequestFlag.SIZE.value
+    | RequestFlag.DATE_CREATED.value
+    | RequestFlag.DATE_MODIFIED.value
+    | RequestFlag.EXTENSION.value
+)
+
+# results(as_tuple=True)返回的元组字段顺序
+RESULT_FIELDS = (
+    "name",
+    "path",
+    "size",
+    "created_date",
+    "modified_date",
+    "file_extension",
+    "is_file",
+    "is_folder",
+    "is_volume",
+)
+
+# Everything_SetMax的默认值（不限制）
+MAX_RESULTS_UNLIMITED = 0xFFFFFFFF
+
 
 class EveryTools:
     def __init__(self, machine=64):
         self.machine = machine
 
-        # dll导入
-        if self.machine == 64:
-            dll_path = os.path.join(
-                os.path.abspath(os.path.dirname(__file__)), "dll", "Everything64.dll"
-            )
-        elif self.machine == 32:
-            dll_path = os.path.join(
-                os.path.abspath(os.path.dirname(__file__)), "dll", "Everything32.dll"
-            )
+        # dll导入，已通过set_backend安装后端时直接使用后端
+        backend = get_backend()
+        if backend is not None:
+            self.everything_dll = backend
         else:
-            dll_path = None
+            if self.machine == 64:
+                dll_path = os.path.join(
+                    os.path.abspath(os.path.dirname(__file__)), "dll", "Everything64.dll"
+                )
+            elif self.machine == 32:
+                dll_path = os.path.join(
+                    os.path.abspath(os.path.dirname(__file__)), "dll", "Everything32.dll"
+                )
+            else:
+                dll_path = None
 
-        if not os.path.exists(dll_path):
-            download_dll(os.path.dirname(dll_path))
+            if not os.path.exists(dll_path):
+                download_dll(os.path.dirname(dll_path))
 
-        self.everything_dll = ctypes.WinDLL(dll_path)
+            self.everything_dll = ctypes.WinDLL(dll_path)
 
         # 定义数据类型
         self.everything_dll.Everything_GetResultDateCreated.argtypes = [
@@ -105,19 +137,37 @@ class EveryTools:
 
         # 搜索结果信息
         self.num_total_results = 0
+        self.num_matched_results = 0
         self.num_total_file = 0
         self.num_total_folder = 0
 
+        # 查询设置
+        self._sort_type = SortType.NAME_ASCENDING.value  # 下一次search使用的排序
+        self._query_sort = None  # 最近一次查询的排序，None表示尚未查询
+        self._query_max = None  # 最近一次查询的最大数量
+        self._num_results = 0  # 最近一次查询返回的结果数量
+
     def search(
-        self, keywords, math_path=False, math_case=False, whole_world=False, regex=False
+        self,
+        keywords,
+        math_path=False,
+        math_case=False,
+        whole_world=False,
+        regex=False,
+        sort_type=None,
+        max_num=None,
     ):
         """基本搜索
 
+        排序、请求标志位和最大数量都在查询前设置，results()直接读取这一次查询的结果。
+
         :param keywords: 关键词
         :param math_path: 匹配路径
         :param math_case: 区分大小写
         :param whole_world: 全字匹配
         :param regex: 使用正则
+        :param sort_type: 排序类型，None表示使用set_sort设置的排序（默认按名称升序）
+        :param max_num: 最大数量，None表示全部
         :return:
         """
 
@@ -132,10 +182,31 @@ class EveryTools:
         # self.everything_dll.Everything_SetReplyWindow(0)
         # self.everything_dll.Everything_SetReplyID(0)
         # 执行查询
+        self._query(
+            sort_type if sort_type is not None else self._sort_type, max_num
+        )
+
+    def _query(self, sort_type, max_num):
+        """设置排序、请求标志位和最大数量后执行一次查询
+
+        :param sort_type: 排序类型
+        :param max_num: 最大数量，None表示全部
+        :return:
+        """
+        self.everything_dll.Everything_SetSort(sort_type)
+        self.everything_dll.Everything_SetRequestFlags(RESULT_REQUEST_FLAGS)
+        self.everything_dll.Everything_SetMax(
+            max_num if max_num is not None else MAX_RESULTS_UNLIMITED
+        )
+        mark_query_changed(self.everything_dll)
         self.everything_dll.Everything_QueryW(True)
+        self._query_sort = sort_type
+        self._query_max = max_num
 
         # 获取搜索结果
-        self.num_total_results = self.everything_dll.Everything_GetNumResults()
+        self._num_results = self.everything_dll.Everything_GetNumResults()
+        self.num_total_results = self._num_results
+        self.num_matched_results = self.everything_dll.Everything_GetTotResults()
         self.num_total_file = self.everything_dll.Everything_GetTotFileResults()
         self.num_total_folder = self.everything_dll.Everything_GetTotFolderResults()
 
@@ -148,12 +219,19 @@ class EveryTools:
         return self.everything_dll.Everything_GetSearchW()
 
     def get_num_total_results(self):
-        """获取全部结果数量
+        """获取全部结果数量（本次查询返回的结果数量，受max_num限制）
 
         :return:
         """
         return self.num_total_results
 
+    def get_num_matched_results(self):
+        """获取匹配的结果总数（不受max_num限制）
+
+        :return:
+        """
+        return self.num_matched_results
+
     def get_num_total_file(self):
         """获取全部'文件'结果数量
 
@@ -168,155 +246,182 @@ class EveryTools:
         """
         return self.num_total_folder
 
-    def search_audio(self, keywords=""):
+    def search_audio(self, keywords="", **options):
         """搜索音频文件
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
         self.search(
             f"ext:aac;ac3;aif;aifc;aiff;au;cda;dts;fla;flac;it;m1a;m2a;m3u;m4a;mid;midi;mka;mod;mp2;mp3;mpa;"
-            f"ogg;ra;rmi;spc;rmi;snd;umx;voc;wav;wma;xm {keywords}"
+            f"ogg;ra;rmi;spc;rmi;snd;umx;voc;wav;wma;xm {keywords}",
+            **options,
         )
 
-    def search_zip(self, keywords=""):
+    def search_zip(self, keywords="", **options):
         """搜索压缩文件
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
         self.search(
             f"ext:7z;ace;arj;bz2;cab;gz;gzip;jar;r00;r01;r02;r03;r04;r05;r06;r07;r08;r09;r10;r11;r12;r13;r14;"
-            f"r15;r16;r17;r18;r19;r20;r21;r22;r23;r24;r25;r26;r27;r28;r29;rar;tar;tgz;z;zip {keywords}"
+            f"r15;r16;r17;r18;r19;r20;r21;r22;r23;r24;r25;r26;r27;r28;r29;rar;tar;tgz;z;zip {keywords}",
+            **options,
         )
 
-    def search_doc(self, keywords=""):
+    def search_doc(self, keywords="", **options):
         """搜索文档
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
         self.search(
             f"ext:c;chm;cpp;csv;cxx;doc;docm;docx;dot;dotm;dotx;h;hpp;htm;html;hxx;ini;java;lua;mht;mhtml;"
             f"odt;pdf;potx;potm;ppam;ppsm;ppsx;pps;ppt;pptm;pptx;rtf;sldm;sldx;thmx;txt;vsd;wpd;wps;wri;"
-            f"xlam;xls;xlsb;xlsm;xlsx;xltm;xltx;xml {keywords}"
+            f"xlam;xls;xlsb;xlsm;xlsx;xltm;xltx;xml {keywords}",
+            **options,
         )
 
-    def search_exe(self, keywords=""):
+    def search_exe(self, keywords="", **options):
         """搜索可执行文件
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
-        self.search(f"ext:bat;cmd;exe;msi;msp;scr {keywords}")
+        self.search(f"ext:bat;cmd;exe;msi;msp;scr {keywords}", **options)
 
-    def search_folder(self, keywords=""):
+    def search_folder(self, keywords="", **options):
         """搜索文件夹
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
-        self.search(f"folder: {keywords}")
+        self.search(f"folder: {keywords}", **options)
 
-    def search_pic(self, keywords=""):
+    def search_pic(self, keywords="", **options):
         """搜索图片
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
         self.search(
-            f"ext:ani;bmp;gif;ico;jpe;jpeg;jpg;pcx;png;psd;tga;tif;tiff;webp;wmf {keywords}"
+            f"ext:ani;bmp;gif;ico;jpe;jpeg;jpg;pcx;png;psd;tga;tif;tiff;webp;wmf {keywords}",
+            **options,
         )
 
-    def search_video(self, keywords=""):
+    def search_video(self, keywords="", **options):
         """搜索视频
 
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
         self.search(
             f"ext:3g2;3gp;3gp2;3gpp;amr;amv;asf;avi;bdmv;bik;d2v;divx;drc;dsa;dsm;dss;dsv;evo;f4v;flc;fli;"
             f"flic;flv;hdmov;ifo;ivf;m1v;m2p;m2t;m2ts;m2v;m4b;m4p;m4v;mkv;mp2v;mp4;mp4v;mpe;mpeg;mpg;mpls;"
             f"mpv2;mpv4;mov;mts;ogm;ogv;pss;pva;qt;ram;ratdvd;rm;rmm;rmvb;roq;rpm;smil;smk;swf;tp;tpr;ts;"
-            f"vob;vp6;webm;wm;wmp;wmv {keywords}"
+            f"vob;vp6;webm;wm;wmp;wmv {keywords}",
+            **options,
         )
 
-    def search_ext(self, ext, keywords=""):
+    def search_ext(self, ext, keywords="", **options):
         """搜索扩展名称
 
         :param ext: 拓展名
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
-        self.search(f"ext:{ext} {keywords}")
+        self.search(f"ext:{ext} {keywords}", **options)
 
-    def search_in_located(self, path, keywords=""):
+    def search_in_located(self, path, keywords="", **options):
         """搜索路径下文件
 
         :param path: 搜索的路径
         :param keywords: 关键词
+        :param options: 传给search的其他参数，如sort_type、max_num
         :return:
         """
-        self.search(f"{path} {keywords}")
+        self.search(f"{path} {keywords}", **options)
 
-    def results(self, max_num=None, sort_type=1):
+    def results(self, max_num=None, sort_type=None, as_tuple=False):
         """输出结果
 
+        直接读取search()的查询结果；只有排序与查询时不同，或需要的数量（max_num为None时为全部）
+        超过查询时读取的数量且还有更多匹配的结果时才会重新查询。
+
         :param max_num: 最大数量
-        :param sort_type: 排序类型
-        :return: iterator of result dict
+        :param sort_type: 排序类型，None表示使用查询时的排序
+        :param as_tuple: 以元组代替字典返回，字段顺序见RESULT_FIELDS
+        :return: iterator of result dict (or tuple)
         """
+        if self._query_sort is None:
+            return
+
+        if (sort_type is not None and sort_type != self._query_sort) or (
+            self._query_max is not None
+            and (max_num is None or max_num > self._query_max)
+            and self.num_matched_results > self._num_results
+        ):
+            self._query(
+                sort_type if sort_type is not None else self._query_sort, max_num
+            )
+
         # 定义块数据
-        buffer_full_path_name = ctypes.create_unicode_buffer(260)
         buffer_created_time = ctypes.c_ulonglong(1)
         buffer_modified_time = ctypes.c_ulonglong(1)
         buffer_size = ctypes.c_ulonglong(1)
 
-        # 设置排序
-        self.everything_dll.Everything_SetSort(sort_type)
-
-        num_total = self.get_num_total_results()  # 获取全部结果数量
+        num_total = self._num_results  # 本次查询返回的结果数量
         if max_num and max_num < num_total:
             num_total = max_num
 
         if num_total == 0:
             return
 
-        #  | EVERYTHING_REQUEST_ATTRIBUTES
-        self.everything_dll.Everything_SetRequestFlags(
-            RequestFlag.FILE_NAME.value
-            | RequestFlag.PATH.value
-            | RequestFlag.SIZE.value
-            | RequestFlag.DATE_CREATED.value
-            | RequestFlag.DATE_MODIFIED.value
-            | RequestFlag.EXTENSION.value
-        )
-        self.everything_dll.Everything_QueryW(True)
+        dll = self.everything_dll
         # 不再需要分页逻辑，直接迭代
         for i in range(num_total):
-            file_name = self.everything_dll.Everything_GetResultFileNameW(i)
-            file_path = self.everything_dll.Everything_GetResultPathW(i)
+            file_name = dll.Everything_GetResultFileNameW(i)
+            file_path = dll.Everything_GetResultPathW(i)
 
             # 创建时间
-            self.everything_dll.Everything_GetResultDateCreated(i, buffer_created_time)
-            if struct.unpack("<Q", buffer_created_time)[0] == 18446744073709551615:
+            dll.Everything_GetResultDateCreated(i, buffer_created_time)
+            if buffer_created_time.value == 18446744073709551615:
                 created_time = None
             else:
                 created_time = get_time(buffer_created_time)
 
             # 获取查询信息
-            self.everything_dll.Everything_GetResultDateModified(
-                i, buffer_modified_time
-            )
+            dll.Everything_GetResultDateModified(i, buffer_modified_time)
             modified_time = get_time(buffer_modified_time)
-            self.everything_dll.Everything_GetResultSize(i, buffer_size)  # 大小
+            dll.Everything_GetResultSize(i, buffer_size)  # 大小
             file_size = buffer_size.value
-            file_extension = self.everything_dll.Everything_GetResultExtensionW(
-                i
-            )  # 拓展
-            is_file = self.everything_dll.Everything_IsFileResult(i)
-            is_folder = self.everything_dll.Everything_IsFolderResult(i)
-            is_volume = self.everything_dll.Everything_IsVolumeResult(i)
+            file_extension = dll.Everything_GetResultExtensionW(i)  # 拓展
+            is_file = dll.Everything_IsFileResult(i)
+            is_folder = dll.Everything_IsFolderResult(i)
+            is_volume = dll.Everything_IsVolumeResult(i)
+
+            if as_tuple:
+                yield (
+                    file_name,
+                    file_path,
+                    file_size,
+                    created_time,
+                    modified_time,
+                    file_extension,
+                    is_file,
+                    is_folder,
+                    is_volume,
+                )
+                continue
 
             item = {
                 "name": file_name,
@@ -337,10 +442,11 @@ class EveryTools:
         self.everything_dll.Everything_Exit()
 
     def set_sort(self, sort_type):
-        """设置搜索结果排序方式
+        """设置搜索结果排序方式，对之后的search生效
 
         :param sort_type: 排序类型常量
         """
+        self._sort_type = sort_type
         self.everything_dll.Everything_SetSort(sort_type)
 
     def get_last_error(self):
@@ -63,6 +63,24 @@ class InvalidCallError(EverythingError):
     pass
 
 
+class InvalidRequestError(EverythingError):
+    """读取了未请求的结果字段"""
+
+    pass
+
+
+class InvalidParameterError(EverythingError):
+    """参数无效错误"""
+
+    pass
+
+
+class StaleResultError(EverythingError):
+    """结果所属的查询已被之后的查询替换"""
+
+    pass
+
+
 # 错误代码到异常类的映射
 ERROR_CODE_TO_EXCEPTION = {
     ErrorCode.EVERYTHING_ERROR_MEMORY: MemoryError,
@@ -72,6 +90,8 @@ ERROR_CODE_TO_EXCEPTION = {
     ErrorCode.EVERYTHING_ERROR_CREATETHREAD: CreateThreadError,
     ErrorCode.EVERYTHING_ERROR_INVALIDINDEX: InvalidIndexError,
     ErrorCode.EVERYTHING_ERROR_INVALIDCALL: InvalidCallError,
+    ErrorCode.EVERYTHING_ERROR_INVALIDREQUEST: InvalidRequestError,
+    ErrorCode.EVERYTHING_ERROR_INVALIDPARAMETER: InvalidParameterError,
 }
 
 
@@ -7,6 +7,26 @@ Query package for Everything SDK
 """
 
 from .search import Search, SearchBuilder
+from .cursor import SearchCursor
+from .live import LiveResult, LiveSearch, extends_query
+from .batch import BatchResult, batch_search
+from .multiplex import multiplex_search, plan_queries
+from .optimizer import OptimizedQuery, optimize_filters
 from .filters import FileFilter, FolderFilter
 
-__all__ = ["Search", "SearchBuilder", "FileFilter", "FolderFilter"]
+__all__ = [
+    "Search",
+    "SearchBuilder",
+    "SearchCursor",
+    "LiveResult",
+    "LiveSearch",
+    "extends_query",
+    "BatchResult",
+    "batch_search",
+    "multiplex_search",
+    "plan_queries",
+    "OptimizedQuery",
+    "optimize_filters",
+    "FileFilter",
+    "FolderFilter",
+]
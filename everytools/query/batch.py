@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量搜索模块
+Batch search module
+
+连续执行大量小查询时，每次查询的Everything_Reset和全部设置函数调用占了大部分开销。
+batch_search()只在开始时重置一次，之后只调用取值发生变化的设置函数，
+每个查询的结果读取为快照后立即返回，并记录查询和读取的耗时。
+"""
+
+import time
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from ..constants import RequestFlag, SortType
+from ..core.executor import QueryExecutor, get_executor
+from ..core.result import current_query_generation
+from ..core.snapshot import ResultSnapshot
+from .search import MAX_RESULTS_UNLIMITED, Search, SearchBuilder, to_search
+
+# Everything_Reset之后DLL中的设置（与SDK的默认值一致）
+RESET_SETTINGS: Dict[str, Any] = {
+    "Everything_SetSearchW": "",
+    "Everything_SetMatchCase": False,
+    "Everything_SetMatchPath": False,
+    "Everything_SetMatchWholeWord": False,
+    "Everything_SetRegex": False,
+    "Everything_SetSort": int(SortType.NAME_ASCENDING),
+    "Everything_SetRequestFlags": int(RequestFlag.FILE_NAME | RequestFlag.PATH),
+    "Everything_SetMax": MAX_RESULTS_UNLIMITED,
+    "Everything_SetOffset": 0,
+}
+
+BatchQuery = Union[SearchBuilder, Search, str]
+
+
+class BatchResult(NamedTuple):
+    """批量搜索中一个查询的结果"""
+
+    index: int
+    search: Search
+    results: ResultSnapshot
+    setter_calls: int
+    query_time: float
+    fetch_time: float
+
+    @property
+    def elapsed(self) -> float:
+        """查询和读取的总耗时（秒）"""
+        return self.query_time + self.fetch_time
+
+
+def batch_search(
+    queries: Iterable[BatchQuery], executor: Optional[QueryExecutor] = None
+) -> Iterator[BatchResult]:
+    """依次执行一组查询，分摊每次查询的设置开销
+
+    每个查询在执行器的独占会话中完成设置、查询和读取；两次查询之间如果有其他代码执行过查询，
+    下一个查询会重新调用Everything_Reset并设置全部参数。查询自身的执行器和缓存设置不生效。
+
+    Args:
+        queries: 查询字符串、SearchBuilder或Search的序列，可以是生成器
+        executor: 查询执行器，不指定则使用默认的共享执行器
+
+    Yields:
+        每个查询的BatchResult，顺序与queries相同；BatchResult.search.get_results()也返回该快照
+
+    Raises:
+        TypeError: 如果查询类型不支持
+        EverythingError: 如果某个查询出错（之前的查询结果已经返回）
+    """
+    executor = executor if executor is not None else get_executor()
+    applied: Optional[Dict[str, Any]] = None
+    generation: Optional[int] = None
+
+    for index, query in enumerate(queries):
+        search = to_search(query)
+        search._reset_state(False)
+        if search._shards:
+            # 分片查询在各分片的执行器中执行，不复用参数设置；之后的查询会检测到DLL状态已改变
+            started = time.perf_counter()
+            results = search._fetch_shards()
+            search._results = results
+            search._completed.set()
+            yield BatchResult(index, search, results, 0, time.perf_counter() - started, 0.0)
+            continue
+        with executor.session() as dll:
+            started = time.perf_counter()
+            if applied is None or current_query_generation(dll) != generation:
+                # 第一次查询，或DLL状态已被其他查询改变
+                dll.Everything_Reset()
+                applied = dict(RESET_SETTINGS)
+
+            setter_calls = 0
+            for name, value in search._settings():
+                if applied[name] != value:
+                    getattr(dll, name)(value)
+                    applied[name] = value
+                    setter_calls += 1
+            try:
+                search._run_query(dll)
+            finally:
+                generation = current_query_generation(dll)
+            queried = time.perf_counter()
+            results = ResultSnapshot.from_result_set(search._create_result_set(dll))
+            fetched = time.perf_counter()
+
+        search._results = results
+        search._completed.set()
+        yield BatchResult(
+            index, search, results, setter_calls, queried - started, fetched - queried
+        )
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分页游标模块
+Server-side paging cursor module
+
+游标使用Everything_SetOffset/Everything_SetMax按页重新执行查询，
+每页读取为不依赖DLL状态的快照，同一时间最多保留当前页和预取的下一页，
+因此无论匹配多少文件，内存占用都保持平稳。
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from ..core.snapshot import ResultSnapshot
+
+# 页面读取函数：(偏移量, 最大数量) -> 该页的快照
+PageFetcher = Callable[[int, int], ResultSnapshot]
+
+
+class SearchCursor:
+    """按页遍历搜索结果的游标"""
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        start: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        adaptive: bool = True,
+        target_latency: float = 0.05,
+        min_page_size: int = 100,
+        max_page_size: int = 100000,
+    ):
+        """初始化游标，通常使用SearchBuilder.cursor()创建
+
+        Args:
+            fetch_page: 页面读取函数
+            start: 第一个结果的偏移量
+            limit: 最多遍历的结果数量，None表示全部
+            page_size: 初始页大小
+            prefetch: 是否在消费当前页时于后台线程读取下一页
+            adaptive: 是否根据每页的读取耗时调整页大小
+            target_latency: 自适应时每页读取的目标耗时（秒）
+            min_page_size: 自适应时的最小页大小
+            max_page_size: 自适应时的最大页大小
+
+        Raises:
+            ValueError: 如果参数无效
+        """
+        if page_size < 1 or min_page_size < 1 or max_page_size < min_page_size:
+            raise ValueError("页大小必须大于0，且max_page_size不能小于min_page_size")
+        if target_latency <= 0:
+            raise ValueError("target_latency必须大于0")
+        if start < 0:
+            raise ValueError("偏移量不能为负数")
+        if limit is not None and limit < 0:
+            raise ValueError("limit不能为负数")
+        self._fetch_page = fetch_page
+        self._start = start
+        self._limit = limit
+        self._page_size = page_size
+        self._prefetch = prefetch
+        self._adaptive = adaptive
+        self._target_latency = target_latency
+        self._min_page_size = min_page_size
+        self._max_page_size = max_page_size
+        self._pages_fetched = 0
+        self._rows_fetched = 0
+        self._closed = False
+
+    def _timed_fetch(self, offset: int, count: int) -> Tuple[ResultSnapshot, float]:
+        """读取一页并返回读取耗时"""
+        started = time.perf_counter()
+        page = self._fetch_page(offset, count)
+        return page, time.perf_counter() - started
+
+    def _next_page_size(self, rows: int, elapsed: float) -> int:
+        """根据上一页的耗时计算下一页的大小，每次最多增大一倍"""
+        size = self._page_size
+        if not self._adaptive or rows == 0:
+            return size
+        ideal = int(self._target_latency / (elapsed / rows)) if elapsed > 0 else size * 2
+        return max(self._min_page_size, min(self._max_page_size, ideal, size * 2))
+
+    def batches(self) -> Iterator[ResultSnapshot]:
+        """逐页遍历结果
+
+        Yields:
+            每一页结果的快照
+
+        Raises:
+            EverythingError: 如果某一页的查询出错
+        """
+        if self._closed:
+            return
+        offset = self._start
+        remaining = self._limit
+        pool = ThreadPoolExecutor(max_workers=1) if self._prefetch else None
+
+        def submit(count: int) -> Any:
+            if remaining is not None:
+                count = min(count, remaining)
+            if pool is None:
+                future: Future = Future()
+                future.set_result(self._timed_fetch(offset, count))
+            else:
+                future = pool.submit(self._timed_fetch, offset, count)
+            return future, count
+
+        try:
+            if remaining == 0:
+                return
+            future, requested = submit(self._page_size)
+            while not self._closed:
+                page, elapsed = future.result()
+                self._pages_fetched += 1
+                self._rows_fetched += len(page)
+                self._page_size = self._next_page_size(len(page), elapsed)
+
+                offset += len(page)
+                if remaining is not None:
+                    remaining -= len(page)
+                done = len(page) < requested or remaining == 0
+                if not done and pool is not None:
+                    # 消费当前页的同时在后台读取下一页
+                    future, requested = submit(self._page_size)
+
+                if len(page):
+                    yield page
+                if done:
+                    return
+                if pool is None:
+                    future, requested = submit(self._page_size)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+    def __iter__(self) -> Iterator[Any]:
+        """逐行遍历结果
+
+        Yields:
+            FileResult对象；指定了投影字段时为投影记录
+        """
+        for page in self.batches():
+            yield from page
+
+    def close(self) -> None:
+        """停止遍历，之后不再读取新的页"""
+        self._closed = True
+
+    def __enter__(self) -> "SearchCursor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def page_size(self) -> int:
+        """下一页的大小"""
+        return self._page_size
+
+    @property
+    def pages_fetched(self) -> int:
+        """已读取的页数"""
+        return self._pages_fetched
+
+    @property
+    def rows_fetched(self) -> int:
+        """已读取的结果数"""
+        return self._rows_fetched
@@ -7,7 +7,10 @@ Search filters module for Everything SDK
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Set, Union
+from typing import Any, Iterable, List, Optional, Set, Union
+
+from ..core.query_compiler import CompiledQuery, compile_query, result_row
+from ..core.snapshot import ResultSnapshot
 
 
 class Filter(ABC):
@@ -22,6 +25,57 @@ class Filter(ABC):
         """
         pass
 
+    def compile(self) -> CompiledQuery:
+        """把过滤条件编译为本地谓词，与Everything对to_query_string()的求值一致
+
+        Returns:
+            CompiledQuery实例
+        """
+        return compile_query(self.to_query_string())
+
+    def is_local(self) -> bool:
+        """是否可以在本地求值（content:、dupe:、empty:等条件只能由Everything求值）"""
+        return self.compile().local
+
+    def matches(self, result: Any) -> bool:
+        """在本地检查单个结果是否满足过滤条件
+
+        Args:
+            result: FileResult、LazyFileResult或投影记录，日期可以是任一日期模式的值
+
+        Returns:
+            是否满足条件
+
+        Raises:
+            ValueError: 如果过滤条件无法在本地求值
+        """
+        return self._compile_local()(result_row(result))
+
+    def apply(
+        self, results: Union[ResultSnapshot, Iterable[Any]]
+    ) -> Union[ResultSnapshot, List[Any]]:
+        """在本地筛选满足过滤条件的结果，不访问Everything
+
+        Args:
+            results: ResultSnapshot，或FileResult等结果对象的序列（如ResultSet）
+
+        Returns:
+            快照时为只包含匹配行的新快照（按列求值），否则为匹配结果的列表；均保持原有顺序
+
+        Raises:
+            ValueError: 如果过滤条件无法在本地求值，或快照中没有所需的列
+        """
+        compiled = self._compile_local()
+        if isinstance(results, ResultSnapshot):
+            return results.refine(compiled)
+        return [item for item in results if compiled(result_row(item))]
+
+    def _compile_local(self) -> CompiledQuery:
+        compiled = self.compile()
+        if not compiled.local:
+            raise ValueError(f"过滤条件无法在本地求值: {self.to_query_string()}")
+        return compiled
+
 
 class FileFilter(Filter):
     """文件过滤器"""
@@ -96,9 +150,9 @@ class FileFilter(Filter):
         """
         parts = []
 
-        # 添加文件类型过滤
+        # 添加文件类型过滤（排序后输出，保证查询字符串稳定）
         if self._extensions:
-            exts = ";".join(self._extensions)
+            exts = ";".join(sorted(self._extensions))
             parts.append(f"ext:{exts}")
 
         # 添加大小过滤
@@ -111,10 +165,9 @@ class FileFilter(Filter):
                 parts.append(f"size:<{self._max_size}")
 
         # 添加内容过滤
-        if self._content:
-            # 使用引号包裹内容，确保空格不会被视为分隔符
-            content = self._content.replace('"', '\\"')  # 转义引号
-            parts.append(f'content:"{content}"')
+        content_term = self._content_term()
+        if content_term:
+            parts.append(content_term)
 
         # 添加重复文件过滤
         if self._duplicates:
@@ -122,6 +175,14 @@ class FileFilter(Filter):
 
         return " ".join(parts)
 
+    def _content_term(self) -> Optional[str]:
+        """内容过滤条件，未设置时为None"""
+        if not self._content:
+            return None
+        # 使用引号包裹内容，确保空格不会被视为分隔符
+        content = self._content.replace('"', '\\"')  # 转义引号
+        return f'content:"{content}"'
+
 
 class FolderFilter(Filter):
     """文件夹过滤器"""
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+边输入边搜索模块
+Search-as-you-type session module
+
+LiveSearch在后台线程中按输入执行查询：连续输入时只查询停顿后的最新文本（去抖），
+被新输入取代的查询不再执行，已在执行的查询不读取结果也不发布；每次只读取第一页。
+新文本是上一次文本的细化（如"rep" -> "repo"）且上一次的结果已全部读取时，
+直接在上一次的结果中本地筛选，不访问Everything，因此连续输入时延迟保持平稳。
+"""
+
+import copy
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, List, NamedTuple, Optional, Tuple
+
+from ..core.executor import get_executor
+from ..core.query_compiler import compile_query
+from ..core.query_parser import And, Node, Text, parse_query
+from ..core.snapshot import ResultSnapshot
+
+if TYPE_CHECKING:
+    from .search import SearchBuilder
+
+
+class LiveResult(NamedTuple):
+    """一次输入对应的搜索结果"""
+
+    text: str
+    generation: int
+    results: Optional[ResultSnapshot]
+    reused: bool
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def total(self) -> int:
+        """匹配的结果总数（不限于第一页）"""
+        if self.results is None:
+            return 0
+        return self.results.total_files + self.results.total_folders
+
+    @property
+    def complete(self) -> bool:
+        """第一页是否已包含全部匹配的结果"""
+        return self.results is not None and len(self.results) == self.total
+
+
+class LiveSearchStats(NamedTuple):
+    """LiveSearch的统计"""
+
+    updates: int
+    queries: int
+    reused: int
+    discarded: int
+
+
+def _conjuncts(text: str) -> List[Node]:
+    """查询文本的顶层"与"条件"""
+    node = parse_query(text)
+    return list(node.operands) if isinstance(node, And) else [node]
+
+
+def _implies(new: Node, old: Node, match_case: bool) -> bool:
+    """满足new的行是否一定满足old
+
+    除相同的条件外，只处理普通搜索词的子串关系（"repo"蕴含"rep"）；
+    通配符、包含路径分隔符的词以及其他条件都需要完全相同。
+    """
+    if new == old:
+        return True
+    if not (isinstance(new, Text) and isinstance(old, Text)):
+        return False
+    if old.wildcard or new.wildcard or "\\" in old.text or "\\" in new.text:
+        return False
+    if match_case:
+        return old.text in new.text
+    return old.text.casefold() in new.text.casefold()
+
+
+def extends_query(previous: str, text: str, match_case: bool = False) -> bool:
+    """检查text的匹配结果是否一定包含在previous的匹配结果中
+
+    每个顶层条件都必须被新文本的某个条件蕴含，例如"rep" -> "repo"、"rep" -> "rep ext:py"；
+    "rep" -> "rep|x"、"*.p" -> "*.py"和"ext:p" -> "ext:py"不是细化。
+    不处理全字匹配和正则，调用方需要自行排除。
+
+    Args:
+        previous: 上一次的查询文本
+        text: 新的查询文本
+        match_case: 是否区分大小写
+
+    Returns:
+        是否是细化
+    """
+    new_terms = _conjuncts(text)
+    return all(
+        any(_implies(term, old, match_case) for term in new_terms) for old in _conjuncts(previous)
+    )
+
+
+class _Superseded(Exception):
+    """查询已被更新的输入取代"""
+
+
+class LiveSearch:
+    """边输入边搜索的会话，通常使用SearchBuilder.live()创建"""
+
+    def __init__(
+        self,
+        builder: "SearchBuilder",
+        on_results: Optional[Callable[[LiveResult], Any]] = None,
+        debounce: float = 0.05,
+        page_size: int = 50,
+        reuse: bool = True,
+    ):
+        """初始化会话
+
+        Args:
+            builder: 查询模板，输入的文本追加为关键词，其他设置（过滤器、排序、投影、执行器等）照常生效
+            on_results: 发布结果时在后台线程中调用的函数
+            debounce: 去抖时间（秒），最后一次输入后等待该时间才执行查询
+            page_size: 第一页的大小，由Everything_SetMax在服务端限制
+            reuse: 新文本是上一次文本的细化时是否在上一次的结果中本地筛选
+
+        Raises:
+            ValueError: 如果参数无效
+        """
+        if debounce < 0:
+            raise ValueError("debounce不能为负数")
+        if page_size < 1:
+            raise ValueError("页大小必须大于0")
+        self._builder = copy.copy(builder)
+        self._builder._keywords = list(builder._keywords)
+        self._builder._filters = list(builder._filters)
+        self._on_results = on_results
+        self._debounce = debounce
+        self._page_size = page_size
+        self._reuse = reuse and not builder._regex and not builder._match_whole_word
+
+        self._condition = threading.Condition()
+        self._pending: Optional[Tuple[str, int, float]] = None
+        self._deadline = 0.0
+        self._generation = 0
+        self._latest: Optional[LiveResult] = None
+        self._basis: Optional[Tuple[str, ResultSnapshot]] = None
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._updates = 0
+        self._queries = 0
+        self._reused = 0
+        self._discarded = 0
+
+    def update(self, text: str) -> int:
+        """输入新的文本，去抖时间后在后台执行查询
+
+        Args:
+            text: 当前输入框中的文本
+
+        Returns:
+            本次输入的序号，与LiveResult.generation对应
+
+        Raises:
+            RuntimeError: 如果会话已关闭
+        """
+        now = time.perf_counter()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("会话已关闭")
+            self._generation += 1
+            self._updates += 1
+            self._pending = (text, self._generation, now)
+            self._deadline = now + self._debounce
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="LiveSearch", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+            return self._generation
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[LiveResult]:
+        """等待最新输入的结果
+
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+
+        Returns:
+            最新输入对应的结果；超时、会话已关闭或尚未输入时返回已发布的最新结果（可能为None）
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed
+                or self._generation == 0
+                or (self._latest is not None and self._latest.generation == self._generation),
+                timeout,
+            )
+            return self._latest
+
+    def search(self, text: str, timeout: Optional[float] = None) -> Optional[LiveResult]:
+        """输入文本并等待其结果，相当于update()后wait()"""
+        self.update(text)
+        return self.wait(timeout)
+
+    @property
+    def latest(self) -> Optional[LiveResult]:
+        """已发布的最新结果"""
+        return self._latest
+
+    @property
+    def stats(self) -> LiveSearchStats:
+        """输入次数、实际查询次数、本地筛选次数和丢弃的查询次数"""
+        with self._condition:
+            return LiveSearchStats(self._updates, self._queries, self._reused, self._discarded)
+
+    def close(self) -> None:
+        """关闭会话，未执行的输入不再查询"""
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify_all()
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+
+    def __enter__(self) -> "LiveSearch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _next_input(self) -> Optional[Tuple[str, int, float]]:
+        """等待去抖时间内没有新输入的文本，会话关闭时返回None（需持有锁）"""
+        while not self._closed:
+            if self._pending is None:
+                self._condition.wait()
+                continue
+            remaining = self._deadline - time.perf_counter()
+            if remaining > 0:
+                self._condition.wait(remaining)
+                continue
+            pending, self._pending = self._pending, None
+            return pending
+        return None
+
+    def _run(self) -> None:
+        """后台线程：逐个执行去抖后的输入，只发布仍是最新输入的结果"""
+        while True:
+            with self._condition:
+                pending = self._next_input()
+            if pending is None:
+                return
+            text, generation, requested = pending
+            error = None
+            try:
+                results, reused = self._evaluate(text, generation)
+            except _Superseded:
+                with self._condition:
+                    self._discarded += 1
+                continue
+            except Exception as e:  # noqa: B902
+                results, reused, error = None, False, e
+
+            result = LiveResult(
+                text, generation, results, reused, time.perf_counter() - requested, error
+            )
+            with self._condition:
+                if generation != self._generation or self._closed:
+                    self._discarded += 1
+                    continue
+                self._latest = result
+                self._condition.notify_all()
+            if self._on_results is not None:
+                self._on_results(result)
+
+    def _check_current(self, generation: int) -> None:
+        """输入已被取代时中止查询"""
+        if generation != self._generation:
+            raise _Superseded()
+
+    def _evaluate(self, text: str, generation: int) -> Tuple[ResultSnapshot, bool]:
+        """得到文本的第一页结果
+
+        Returns:
+            (第一页的快照, 是否由上一次的结果本地筛选得到)
+
+        Raises:
+            _Superseded: 如果读取结果之前输入已被取代
+        """
+        builder = self._builder
+        if not text.strip():
+            # 输入框为空时不查询
+            search = builder._create_search(max_results=self._page_size, offset=0)
+            search._complete_empty()
+            return search._results, False
+
+        basis = self._basis
+        if self._reuse and basis is not None and extends_query(basis[0], text, builder._match_case):
+            compiled = compile_query(text, builder._match_case, builder._match_path)
+            if basis[1].can_refine(compiled):
+                refined = basis[1].refine(compiled, max_results=self._page_size)
+                with self._condition:
+                    self._reused += 1
+                return self._remember(text, refined), True
+
+        parent = copy.copy(builder)
+        parent._keywords = builder._keywords + [text]
+        parent._max_results = self._page_size
+        parent._offset = 0
+        search = parent._create_search()
+        if parent._complete_locally(search):
+            return self._remember(text, search._results), False
+        if search._shards:
+            # 分片查询在各分片的执行器中执行，只能在读取后丢弃
+            return self._remember(text, search.snapshot()), False
+
+        executor = parent._executor if parent._executor is not None else get_executor()
+        with executor.session() as dll:
+            # 等待会话期间可能已有新的输入
+            self._check_current(generation)
+            with self._condition:
+                self._queries += 1
+            search._apply_query(dll)
+            # Everything的同步查询无法中断，但被取代的查询不再读取结果
+            self._check_current(generation)
+            snapshot = ResultSnapshot.from_result_set(search._create_result_set(dll))
+        return self._remember(text, snapshot), False
+
+    def _remember(self, text: str, snapshot: ResultSnapshot) -> ResultSnapshot:
+        """结果已全部读取时作为后续输入本地筛选的基础"""
+        if len(snapshot) == snapshot.total_files + snapshot.total_folders:
+            self._basis = (text, snapshot)
+        return snapshot
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多查询合并模块
+Multi-query multiplexing module
+
+仪表盘等场景常常同时查询多个类别（音频、视频、PDF……），每个类别都是一次Everything往返。
+multiplex_search()把匹配选项相同的查询合并为一个 <q1> | <q2> | ... 查询，只执行一次，
+再在本地对每一行求值，把结果分配回各个查询。N个类别只需要一次查询。
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from ..constants import RequestFlag
+from ..core.executor import QueryExecutor
+from ..core.query_compiler import compile_query
+from ..core.snapshot import ResultSnapshot, snapshot_columns, take_column
+from .search import Search, SearchBuilder, to_search
+
+MultiplexQuery = Union[SearchBuilder, Search, str]
+
+
+def local_request_flags(query_string: str) -> Optional[RequestFlag]:
+    """检查查询能否在本地求值
+
+    Args:
+        query_string: 查询字符串
+
+    Returns:
+        本地求值所需的请求标志位；使用了无法在本地求值的搜索函数（如content:、dupe:）时为None
+    """
+    compiled = compile_query(query_string)
+    return compiled.request_flags if compiled.local else None
+
+
+def _group_key(search: Search) -> Optional[Hashable]:
+    """可以合并的查询具有相同的键；不能合并时为None"""
+    if (
+        search._regex
+        or search._shards
+        or search._max_results is not None
+        or search._offset
+        or local_request_flags(search.query_string) is None
+    ):
+        return None
+    return (
+        bool(search._match_case),
+        bool(search._match_path),
+        bool(search._match_whole_word),
+        int(search._sort_type),
+        search._executor,
+    )
+
+
+def plan_queries(queries: Sequence[MultiplexQuery]) -> List[Tuple[int, ...]]:
+    """把查询分组，每组执行一次Everything查询
+
+    匹配选项、排序和执行器相同，且没有正则、分片、数量限制、偏移量和无法在本地求值的搜索函数的查询合并为一组；
+    其他查询各自单独成组。
+
+    Args:
+        queries: 查询字符串、SearchBuilder或Search的序列
+
+    Returns:
+        每组查询在queries中的下标，按每组第一个查询的位置排列
+    """
+    return _plan([to_search(query) for query in queries])
+
+
+def _plan(searches: List[Search]) -> List[Tuple[int, ...]]:
+    groups: Dict[Hashable, List[int]] = {}
+    plan: List[List[int]] = []
+    for index, search in enumerate(searches):
+        key = _group_key(search)
+        if key is None:
+            plan.append([index])
+        elif key in groups:
+            groups[key].append(index)
+        else:
+            groups[key] = [index]
+            plan.append(groups[key])
+    return [tuple(group) for group in plan]
+
+
+def _take(merged: ResultSnapshot, indexes: List[int], search: Search) -> ResultSnapshot:
+    """从合并查询的快照中取出属于某个查询的行和列"""
+    columns = {
+        name: take_column(merged.column(name), indexes)
+        for name in snapshot_columns(search._select, search._request_flags)
+    }
+    is_folder = merged.column("is_folder")
+    folders = sum(is_folder[i] for i in indexes)
+    return ResultSnapshot(
+        columns,
+        len(indexes),
+        len(indexes),
+        len(indexes) - folders,
+        folders,
+        tuple(search._select) if search._select else None,
+        search._record_type,
+        search._date_mode,
+    )
+
+
+def _run_group(searches: List[Search], executor: Optional[QueryExecutor]) -> List[ResultSnapshot]:
+    """执行一组合并的查询并把结果分配回各个查询"""
+    first = searches[0]
+    request_flags = RequestFlag(0)
+    for search in searches:
+        request_flags |= local_request_flags(search.query_string) | search._request_flags
+    merged_query = " | ".join(f"<{search.query_string}>" for search in searches)
+    merged = Search(
+        merged_query,
+        match_case=first._match_case,
+        match_path=first._match_path,
+        match_whole_word=first._match_whole_word,
+        sort_type=first._sort_type,
+        request_flags=request_flags,
+        executor=executor,
+        date_mode="raw",
+    ).snapshot()
+
+    columns = {name: merged.column(name) for name in merged.columns}
+    results = []
+    for search in searches:
+        compiled = compile_query(
+            search.query_string,
+            search._match_case,
+            search._match_path,
+            search._match_whole_word,
+        )
+        indexes = compiled.select(columns, len(merged))
+        results.append(_take(merged, indexes, search))
+    return results
+
+
+def multiplex_search(
+    queries: Sequence[MultiplexQuery], executor: Optional[QueryExecutor] = None
+) -> List[ResultSnapshot]:
+    """合并兼容的查询后执行，返回每个查询各自的结果
+
+    合并规则见plan_queries()。合并查询的结果在本地按各查询的条件求值后分配，
+    每个结果保持合并查询的排序，并只包含该查询请求的列；同一行可以属于多个查询。
+    本地求值使用query_compiler按列完成，与模拟后端的匹配规则相同；
+    使用了无法在本地求值的搜索函数的查询不合并。
+
+    Args:
+        queries: 查询字符串、SearchBuilder或Search的序列
+        executor: 执行合并查询的执行器，不指定则使用组内查询自身的设置；单独执行的查询总是使用自身的设置
+
+    Returns:
+        与queries顺序相同的结果快照列表
+
+    Raises:
+        TypeError: 如果查询类型不支持
+        EverythingError: 如果搜索出错
+    """
+    searches = [to_search(query) for query in queries]
+    results: List[Optional[ResultSnapshot]] = [None] * len(searches)
+    for group in _plan(searches):
+        if len(group) == 1:
+            results[group[0]] = searches[group[0]].snapshot()
+            continue
+        group_executor = executor if executor is not None else searches[group[0]]._executor
+        snapshots = _run_group([searches[index] for index in group], group_executor)
+        for index, snapshot in zip(group, snapshots):
+            results[index] = snapshot
+    return results
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+过滤器优化模块
+Filter canonicalizer and optimizer module
+
+Everything中空格分隔的条件是"与"的关系。优化器把多个过滤器的同类条件合并为一个：
+扩展名集合取交集，大小和日期范围取交集，其余条件去重；条件按固定顺序排列，
+同样的过滤器组合总是得到同样的查询字符串（缓存键稳定）。
+合并后为空的条件组合不可能匹配任何文件，SearchBuilder直接返回空结果而不访问Everything。
+"""
+
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .filters import DateFilter, FileFilter, Filter, SizeFilter
+
+# DateFilter的日期类型 -> 搜索函数，按输出顺序排列
+DATE_PREFIXES = {"created": "dc", "modified": "dm", "accessed": "da"}
+
+# 大小或日期范围：闭区间[下限, 上限]，None表示不限制
+Bounds = Tuple[Optional[int], Optional[int]]
+
+
+class OptimizedQuery(NamedTuple):
+    """优化后的过滤条件"""
+
+    terms: Tuple[str, ...]
+    satisfiable: bool
+
+    def to_query_string(self) -> str:
+        """按顺序拼接全部条件"""
+        return " ".join(self.terms)
+
+
+def _intersect(ranges: Iterable[Bounds]) -> Bounds:
+    """求多个闭区间的交集"""
+    low: Optional[int] = None
+    high: Optional[int] = None
+    for start, end in ranges:
+        if start is not None:
+            low = start if low is None else max(low, start)
+        if end is not None:
+            high = end if high is None else min(high, end)
+    return low, high
+
+
+def _is_empty(bounds: Bounds) -> bool:
+    low, high = bounds
+    return low is not None and high is not None and low > high
+
+
+def _size_bounds(min_size: Optional[int], max_size: Optional[int]) -> Bounds:
+    """把过滤器的大小设置转换为闭区间，与to_query_string()的含义一致
+
+    两端都有时为a..b（包含两端），只有下限时为>a，只有上限时为<b
+    """
+    if min_size is not None and max_size is not None:
+        return int(min_size), int(max_size)
+    if min_size is not None:
+        return int(min_size) + 1, None
+    return None, int(max_size) - 1
+
+
+def _size_term(bounds: Bounds) -> str:
+    low, high = bounds
+    if low is not None and high is not None:
+        return f"size:{low}..{high}"
+    if low is not None:
+        return f"size:>{low - 1}"
+    return f"size:<{high + 1}"
+
+
+def _parse_day(text: str) -> Optional[int]:
+    """把YYYY-MM-DD（或YYYY/MM/DD）解析为日期序数，无法解析时为None"""
+    try:
+        return datetime.datetime.strptime(text.replace("/", "-"), "%Y-%m-%d").toordinal()
+    except ValueError:
+        return None
+
+
+def _date_bounds(date_filter: DateFilter) -> Optional[Bounds]:
+    """把日期过滤器转换为以日期序数表示的闭区间，未设置日期或无法转换时为None"""
+    start, end = date_filter._start_date, date_filter._end_date
+    if start is None and end is None:
+        return None
+    low = _parse_day(start) if start is not None else None
+    high = _parse_day(end) if end is not None else None
+    if (start is not None and low is None) or (end is not None and high is None):
+        return None
+    if low is not None and high is not None:
+        return low, high
+    if low is not None:
+        return low + 1, None
+    return None, high - 1
+
+
+def _date_term(prefix: str, bounds: Bounds) -> str:
+    def day(ordinal: int) -> str:
+        return datetime.date.fromordinal(ordinal).isoformat()
+
+    low, high = bounds
+    if low is not None and high is not None:
+        return f"{prefix}:{day(low)}..{day(high)}"
+    if low is not None:
+        return f"{prefix}:>{day(low - 1)}"
+    return f"{prefix}:<{day(high + 1)}"
+
+
+def optimize_filters(filters: Iterable[Filter]) -> OptimizedQuery:
+    """合并、排序过滤条件并检测矛盾
+
+    FileFilter（包括MediaFilter、DocumentFilter）的扩展名集合取交集；FileFilter和SizeFilter的
+    大小范围取交集；DateFilter按日期类型分别取交集。其他条件（content:、dupe:、文件夹过滤器、
+    today等日期关键词以及未知的过滤器）原样保留并去重。输出顺序为ext:、size:、dc:、dm:、da:，
+    之后是按字母排序的其他条件。
+
+    Args:
+        filters: 过滤器序列
+
+    Returns:
+        OptimizedQuery；satisfiable为False时条件互相矛盾，此时矛盾的条件不合并，原样输出
+    """
+    extension_sets: List[Set[str]] = []
+    size_ranges: List[Bounds] = []
+    date_ranges: Dict[str, List[Bounds]] = {}
+    other_terms: Set[str] = set()
+
+    for item in filters:
+        if isinstance(item, FileFilter):
+            if item._extensions:
+                extension_sets.append({ext.lower() for ext in item._extensions})
+            if item._min_size is not None or item._max_size is not None:
+                size_ranges.append(_size_bounds(item._min_size, item._max_size))
+            content_term = item._content_term()
+            if content_term:
+                other_terms.add(content_term)
+            if item._duplicates:
+                other_terms.add("dupe:")
+        elif isinstance(item, SizeFilter):
+            if item._min_size is not None or item._max_size is not None:
+                size_ranges.append(_size_bounds(item._min_size, item._max_size))
+        elif isinstance(item, DateFilter) and item._type in DATE_PREFIXES:
+            bounds = _date_bounds(item)
+            if bounds is None:
+                other_terms.add(item.to_query_string())
+            else:
+                date_ranges.setdefault(DATE_PREFIXES[item._type], []).append(bounds)
+        else:
+            other_terms.add(item.to_query_string())
+
+    terms: List[str] = []
+    satisfiable = True
+
+    if extension_sets:
+        common = set.intersection(*extension_sets)
+        if common:
+            terms.append("ext:" + ";".join(sorted(common)))
+        else:
+            satisfiable = False
+            distinct = {";".join(sorted(extensions)) for extensions in extension_sets}
+            terms.extend(f"ext:{extensions}" for extensions in sorted(distinct))
+
+    if size_ranges:
+        bounds = _intersect(size_ranges)
+        if _is_empty(bounds) or (bounds[1] is not None and bounds[1] < 0):
+            satisfiable = False
+            terms.extend(sorted({_size_term(item) for item in size_ranges}))
+        else:
+            terms.append(_size_term(bounds))
+
+    for prefix in DATE_PREFIXES.values():
+        ranges = date_ranges.get(prefix)
+        if not ranges:
+            continue
+        bounds = _intersect(ranges)
+        if _is_empty(bounds):
+            satisfiable = False
+            terms.extend(sorted({_date_term(prefix, item) for item in ranges}))
+        else:
+            terms.append(_date_term(prefix, bounds))
+
+    terms.extend(sorted(term for term in other_terms if term))
+    return OptimizedQuery(tuple(terms), satisfiable)
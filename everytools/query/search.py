@@ -6,15 +6,54 @@
 Search module for Everything SDK
 """
 
-import time
+import asyncio
 import ctypes
-from typing import Any, Dict, List, Optional, Union, Callable
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union, Callable
 
+from ..core.cache import QueryCache, get_query_cache, normalize_query
 from ..core.dll_loader import get_dll_loader
-from ..core.result import ResultSet
+from ..core.executor import QueryExecutor, get_executor
+from ..core.query_compiler import compile_query
+from ..core.query_parser import And, format_query, parse_query
+from ..core.result import ResultSet, fields_to_request_flags, mark_query_changed
+from ..core.snapshot import ResultSnapshot
+from ..utils.time_utils import DATE_MODES
 from ..constants import RequestFlag, SortType
 from ..exceptions import EverythingError, raise_for_error_code
+from .cursor import SearchCursor
+from .live import LiveResult, LiveSearch
 from .filters import Filter
+from .optimizer import OptimizedQuery, optimize_filters
+from .shard import (
+    Shard,
+    ShardPager,
+    merge_columns,
+    merge_snapshots,
+    normalize_roots,
+    run_parallel,
+    scope_query,
+)
+
+
+# Everything_SetMax的默认值（不限制数量）
+MAX_RESULTS_UNLIMITED = 0xFFFFFFFF
+
+
+@lru_cache(maxsize=4096)
+def _conjuncts(query_string: str, match_case: bool) -> Tuple[Tuple[str, str], ...]:
+    """查询的顶层"与"条件
+
+    Returns:
+        (规范化的条件, 条件原文)元组，规范化的条件与缓存键中的查询字符串使用相同的规则
+    """
+    node = parse_query(query_string)
+    return tuple(
+        (normalize_query(text, match_case), text)
+        for text in map(format_query, node.operands if isinstance(node, And) else (node,))
+    )
 
 
 class SearchBuilder:
@@ -30,6 +69,7 @@ class SearchBuilder:
         self._regex = False
         self._sort_type = SortType.NAME_ASCENDING
         self._max_results = None
+        self._offset = 0
         self._request_flags = (
             RequestFlag.FILE_NAME
             | RequestFlag.PATH
@@ -39,6 +79,13 @@ class SearchBuilder:
             | RequestFlag.DATE_MODIFIED
             | RequestFlag.EXTENSION
         )
+        self._select: Optional[Sequence[str]] = None
+        self._record_type: Optional[Callable[..., Any]] = None
+        self._executor: Optional[QueryExecutor] = None
+        self._cache: Optional[QueryCache] = None
+        self._cache_ttl: Optional[float] = None
+        self._date_mode = "datetime"
+        self._shards: Optional[Tuple[Shard, ...]] = None
 
     def keywords(self, *keywords: str) -> "SearchBuilder":
         """添加关键词
@@ -132,10 +179,51 @@ class SearchBuilder:
 
         Returns:
             搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果max_results为负数
         """
+        if max_results < 0:
+            raise ValueError("max_results不能为负数")
         self._max_results = max_results
         return self
 
+    def offset(self, offset: int) -> "SearchBuilder":
+        """跳过前offset个结果（由Everything在服务端处理）
+
+        Args:
+            offset: 结果偏移量
+
+        Returns:
+            搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果offset为负数
+        """
+        if offset < 0:
+            raise ValueError("offset不能为负数")
+        self._offset = offset
+        return self
+
+    def top_k(self, n: int, sort_type: SortType) -> "SearchBuilder":
+        """只获取按指定方式排序后的前n个结果
+
+        排序和数量限制都在Everything中完成，传输量与n成正比而不是与匹配总数成正比。
+
+        Args:
+            n: 结果数量
+            sort_type: 排序类型，如SortType.SIZE_DESCENDING
+
+        Returns:
+            搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果n为负数
+        """
+        if n < 0:
+            raise ValueError("n不能为负数")
+        return self.sort_by(sort_type).limit(n)
+
     def request_flags(self, flags: RequestFlag) -> "SearchBuilder":
         """设置请求标志位
 
@@ -148,9 +236,115 @@ class SearchBuilder:
         self._request_flags = flags
         return self
 
+    def select(
+        self, *fields: str, record_type: Optional[Callable[..., Any]] = None
+    ) -> "SearchBuilder":
+        """只查询指定字段，结果以轻量记录返回
+
+        请求标志位会被设置为这些字段所需的最小集合，结果集也只读取这些字段，
+        例如select("name", "path")每行只需2次DLL调用。
+
+        Args:
+            fields: 字段名，如"name"、"path"、"full_path"、"size"、"date_modified"
+            record_type: 记录类型，按字段顺序以位置参数构造，默认为namedtuple
+
+        Returns:
+            搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果字段名无效
+        """
+        self._request_flags = fields_to_request_flags(fields)
+        self._select = fields
+        self._record_type = record_type
+        return self
+
+    def date_mode(self, mode: str) -> "SearchBuilder":
+        """设置结果中日期的格式
+
+        Args:
+            mode: "raw"（原始FILETIME整数）、"epoch"（Unix时间戳）、"datetime"（本地naive datetime，默认）、
+                "utc"（UTC aware datetime）、"iso"（UTC ISO 8601字符串）或"str"（本地时间字符串）
+
+        Returns:
+            搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果日期模式无效
+        """
+        if mode not in DATE_MODES:
+            raise ValueError(f"未知的日期模式: {mode}，可选值: {', '.join(DATE_MODES)}")
+        self._date_mode = mode
+        return self
+
+    def with_executor(self, executor: Optional[QueryExecutor] = None) -> "SearchBuilder":
+        """通过线程安全的执行器执行搜索
+
+        查询和结果读取作为一个整体串行执行，结果在返回前全部读取；
+        同时进行的相同查询只执行一次并共享同一份结果。
+
+        Args:
+            executor: 查询执行器，不指定则使用默认的共享执行器
+
+        Returns:
+            搜索构建器实例（链式调用）
+        """
+        self._executor = executor if executor is not None else get_executor()
+        return self
+
+    def with_cache(
+        self, cache: Optional[QueryCache] = None, ttl: Optional[float] = None
+    ) -> "SearchBuilder":
+        """缓存搜索结果
+
+        相同的查询（规范化的查询字符串、匹配选项、排序、请求标志位、数量限制等）
+        在过期前直接返回缓存的结果，不再访问Everything。
+        缓存的结果已全部读取，之后的查询不会影响它们。
+        在已缓存的查询上增加关键词或过滤器（细化）时，execute()在缓存的结果中本地筛选，
+        同样不访问Everything。
+
+        Args:
+            cache: 查询缓存，不指定则使用默认的共享缓存
+            ttl: 本查询结果的过期时间（秒），不指定则使用缓存的默认值
+
+        Returns:
+            搜索构建器实例（链式调用）
+        """
+        self._cache = cache if cache is not None else get_query_cache()
+        self._cache_ttl = ttl
+        return self
+
+    def shard_by(
+        self, roots: Union[str, Sequence[str], Mapping[str, Optional[QueryExecutor]]]
+    ) -> "SearchBuilder":
+        """按根目录拆分查询，各分片并行执行后按排序归并
+
+        每个根目录执行一个限定在该目录下的查询，不在任何根目录下的文件不会出现在结果中。
+        各分片的结果已由Everything排好序，本地按排序类型做k路归并；有数量限制时每个分片只读取
+        offset+limit行，归并取够后停止。文件数和文件夹数为各分片之和。
+        按类型名称排序的结果无法在本地归并；正则表达式匹配整个查询，无法追加根目录的路径条件，
+        两者执行时都抛出ValueError。
+
+        Args:
+            roots: 根目录（如"C:\\"、"D:\\Photos"）的序列，或根目录到QueryExecutor的映射，
+                映射时各分片在各自的执行器（可以对应不同的Everything实例或后端）中执行；
+                共用同一DLL加载器的执行器共享全局DLL状态，这些分片依次执行
+
+        Returns:
+            搜索构建器实例（链式调用）
+
+        Raises:
+            ValueError: 如果没有根目录，或根目录互相包含
+        """
+        self._shards = normalize_roots(roots)
+        return self
+
     def build_query_string(self) -> str:
         """构建查询字符串
 
+        过滤器经optimize_filters()合并和排序：同类条件取交集，重复条件去除，
+        添加顺序不同的相同过滤器得到相同的查询字符串。
+
         Returns:
             完整的查询字符串
         """
@@ -160,24 +354,283 @@ class SearchBuilder:
         parts.extend(self._keywords)
 
         # 添加过滤器
-        for f in self._filters:
-            filter_query = f.to_query_string()
-            if filter_query:
-                parts.append(filter_query)
+        parts.extend(self._optimize().terms)
 
         return " ".join(parts)
 
+    def is_satisfiable(self) -> bool:
+        """检查过滤条件是否可能匹配任何结果
+
+        例如ext:jpg与ext:png同时出现，或大小范围没有交集时返回False，
+        此时execute()、count()等方法直接返回空结果，不访问Everything。
+
+        Returns:
+            过滤条件没有矛盾时为True
+        """
+        return self._optimize().satisfiable
+
+    def _optimize(self) -> OptimizedQuery:
+        """合并当前的过滤器"""
+        return optimize_filters(self._filters)
+
     def execute(self, async_query: bool = False) -> "Search":
         """执行搜索
 
         Args:
-            async_query: 是否异步搜索（不阻塞等待结果）
+            async_query: 是否在后台线程中搜索（不阻塞等待结果）
 
         Returns:
             Search实例
         """
-        # 创建搜索实例
-        search = Search(
+        search = self._create_search()
+
+        # 执行搜索
+        if not self._complete_locally(search):
+            search.execute(async_query=async_query)
+
+        return search
+
+    async def execute_async(self, timeout: Optional[float] = None) -> "Search":
+        """在asyncio中执行搜索
+
+        查询和结果读取在线程池中完成，不阻塞事件循环，详见Search.execute_async()。
+
+        Args:
+            timeout: 超时时间（秒），None表示不限制
+
+        Returns:
+            已完成的Search实例
+
+        Raises:
+            asyncio.TimeoutError: 如果超时
+            EverythingError: 如果搜索出错
+        """
+        search = self._create_search()
+        if not self._complete_locally(search):
+            await search.execute_async(timeout=timeout)
+        return search
+
+    def _complete_locally(self, search: "Search") -> bool:
+        """尽量不访问Everything完成搜索
+
+        过滤条件互相矛盾时直接得到空结果；指定了缓存且本查询是某个已缓存查询的细化时，
+        在缓存的结果中筛选。
+
+        Returns:
+            是否已经完成
+        """
+        if not self.is_satisfiable():
+            search._complete_empty()
+            return True
+        refined = self._refine_from_cache(search)
+        if refined is None:
+            return False
+        search._complete_with(refined)
+        return True
+
+    def _refine_from_cache(self, search: "Search") -> Optional[ResultSnapshot]:
+        """在缓存中查找本查询放宽条件后的结果，在本地筛选得到本查询的结果
+
+        缓存按除查询字符串外的设置分组，只检查与本查询同组（不限数量、没有偏移量，其他设置相同）、
+        且顶层"与"条件是本查询条件子集的已缓存查询，不枚举条件的组合。如果多出的条件可以在本地求值，
+        就对缓存的快照按列求值。多出的条件越少越优先。本查询已经缓存或使用正则时不查找。
+
+        Args:
+            search: 本查询的Search实例
+
+        Returns:
+            筛选得到的快照，没有可用的缓存结果时为None
+        """
+        cache = self._cache
+        if cache is None or self._regex or search._shards:
+            return None
+        full = _conjuncts(search._query_string, bool(self._match_case))
+        if not full or cache.peek(search._query_key()) is not None:
+            return None
+
+        wanted = Counter(normalized for normalized, _ in full)
+        candidates = []
+        for key in cache.family_keys(search._settings_key(max_results=None, offset=0)):
+            parent = Counter(normalized for normalized, _ in _conjuncts(key[0], bool(self._match_case)))
+            if not parent - wanted:
+                candidates.append((sum(parent.values()), key, parent))
+        candidates.sort(key=lambda item: item[0], reverse=True)
+
+        for _, key, parent in candidates:
+            cached = cache.peek(key)
+            if not isinstance(cached, ResultSnapshot):
+                continue
+            # 本查询等价于"缓存的查询 与 多出的条件"
+            extra = []
+            for normalized, text in full:
+                if parent[normalized]:
+                    parent[normalized] -= 1
+                else:
+                    extra.append(text)
+            compiled = compile_query(
+                " ".join(extra), self._match_case, self._match_path, self._match_whole_word
+            )
+            if cached.can_refine(compiled):
+                return cached.refine(compiled, offset=self._offset, max_results=self._max_results)
+        return None
+
+    def count(self) -> int:
+        """统计匹配的结果总数，不读取任何结果
+
+        只请求文件名并设置Everything_SetMax(0)，数量来自Everything_GetTotFileResults和
+        Everything_GetTotFolderResults，没有逐行的DLL调用。不受limit()和offset()影响。
+
+        Returns:
+            匹配的文件和文件夹总数
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        if not self.is_satisfiable():
+            return 0
+        _, files, folders = self._create_count_search(0).totals()
+        return files + folders
+
+    def count_by_kind(self) -> Dict[str, int]:
+        """分别统计匹配的文件和文件夹数量，不读取任何结果
+
+        Returns:
+            {"files": 文件数量, "folders": 文件夹数量}
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        if not self.is_satisfiable():
+            return {"files": 0, "folders": 0}
+        _, files, folders = self._create_count_search(0).totals()
+        return {"files": files, "folders": folders}
+
+    def exists(self) -> bool:
+        """检查是否有匹配的结果，不读取任何结果
+
+        设置Everything_SetMax(1)，只检查返回的结果数量。
+
+        Returns:
+            是否至少有一个匹配的结果
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        if not self.is_satisfiable():
+            return False
+        returned, _, _ = self._create_count_search(1).totals()
+        return returned > 0
+
+    def first(self) -> Any:
+        """获取排序后的第一个结果
+
+        设置Everything_SetMax(1)，只读取一行；排序、偏移量和投影字段照常生效。
+
+        Returns:
+            第一个结果（FileResult或投影记录），没有匹配的结果时为None
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        if not self.is_satisfiable():
+            return None
+        snapshot = self._create_search(max_results=1).snapshot()
+        return snapshot[0] if len(snapshot) else None
+
+    def _create_count_search(self, max_results: int) -> "Search":
+        """创建只统计数量的搜索：只请求文件名，按索引顺序（名称）排序，不投影"""
+        return self._create_search(
+            sort_type=SortType.NAME_ASCENDING,
+            max_results=max_results,
+            offset=0,
+            request_flags=RequestFlag.FILE_NAME,
+            select=None,
+        )
+
+    def cursor(
+        self,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        adaptive: bool = True,
+        target_latency: float = 0.05,
+        min_page_size: int = 100,
+        max_page_size: int = 100000,
+    ) -> SearchCursor:
+        """创建按页遍历结果的游标
+
+        每页使用Everything_SetOffset/Everything_SetMax重新执行查询并读取为快照，
+        内存中最多同时保留两页，适合遍历匹配数百万文件的查询。
+        limit()和offset()限定遍历的范围。两页之间Everything的索引可能发生变化，
+        期间新增或删除的文件可能导致个别结果重复或遗漏。
+        分片查询时每个分片各自按页读取，并额外保留该分片的一页用于增量归并，见ShardPager。
+
+        Args:
+            page_size: 初始页大小
+            prefetch: 是否在消费当前页时于后台线程读取下一页
+            adaptive: 是否根据每页的读取耗时调整页大小
+            target_latency: 自适应时每页读取的目标耗时（秒）
+            min_page_size: 自适应时的最小页大小
+            max_page_size: 自适应时的最大页大小
+
+        Returns:
+            SearchCursor实例，迭代得到每一行，batches()得到每一页
+        """
+        query_string = self.build_query_string()
+
+        def fetch_page(offset: int, count: int) -> ResultSnapshot:
+            search = self._create_search(
+                query_string=query_string, max_results=count, offset=offset, cache=None
+            )
+            return search.snapshot()
+
+        if self._shards:
+            fetch_page = self._create_search(query_string=query_string, cache=None)._shard_pager()
+
+        return SearchCursor(
+            fetch_page,
+            start=self._offset,
+            limit=self._max_results if self.is_satisfiable() else 0,
+            page_size=page_size,
+            prefetch=prefetch,
+            adaptive=adaptive,
+            target_latency=target_latency,
+            min_page_size=min_page_size,
+            max_page_size=max_page_size,
+        )
+
+    def live(
+        self,
+        on_results: Optional[Callable[[LiveResult], Any]] = None,
+        debounce: float = 0.05,
+        page_size: int = 50,
+        reuse: bool = True,
+    ) -> LiveSearch:
+        """创建边输入边搜索的会话，以当前设置为查询模板
+
+        每次LiveSearch.update()输入的文本追加为关键词；连续输入时只查询停顿后的最新文本，
+        被取代的查询不读取结果，每次只读取前page_size个结果。新文本是上一次文本的细化且
+        上一次的结果已全部读取时，在上一次的结果中本地筛选。
+
+        Args:
+            on_results: 发布结果时在后台线程中调用的函数
+            debounce: 去抖时间（秒）
+            page_size: 第一页的大小
+            reuse: 是否在上一次的结果中本地筛选细化的输入
+
+        Returns:
+            LiveSearch实例，使用完毕后需要close()
+        """
+        return LiveSearch(
+            self, on_results=on_results, debounce=debounce, page_size=page_size, reuse=reuse
+        )
+
+    def _create_search(self, **overrides: Any) -> "Search":
+        """根据当前设置创建搜索实例
+
+        Args:
+            overrides: 覆盖当前设置的Search参数
+        """
+        options = dict(
             query_string=self.build_query_string(),
             match_case=self._match_case,
             match_path=self._match_path,
@@ -185,13 +638,18 @@ class SearchBuilder:
             regex=self._regex,
             sort_type=self._sort_type,
             max_results=self._max_results,
+            offset=self._offset,
             request_flags=self._request_flags,
+            select=self._select,
+            record_type=self._record_type,
+            executor=self._executor,
+            cache=self._cache,
+            cache_ttl=self._cache_ttl,
+            date_mode=self._date_mode,
+            shards=self._shards,
         )
-
-        # 执行搜索
-        search.execute(async_query=async_query)
-
-        return search
+        options.update(overrides)
+        return Search(**options)
 
 
 class Search:
@@ -206,6 +664,7 @@ class Search:
         regex: bool = False,
         sort_type: SortType = SortType.NAME_ASCENDING,
         max_results: Optional[int] = None,
+        offset: int = 0,
         request_flags: RequestFlag = RequestFlag.FILE_NAME
         | RequestFlag.PATH
         | RequestFlag.FULL_PATH_AND_FILE_NAME
@@ -213,6 +672,13 @@ class Search:
         | RequestFlag.DATE_CREATED
         | RequestFlag.DATE_MODIFIED
         | RequestFlag.EXTENSION,
+        select: Optional[Sequence[str]] = None,
+        record_type: Optional[Callable[..., Any]] = None,
+        executor: Optional[QueryExecutor] = None,
+        cache: Optional[QueryCache] = None,
+        cache_ttl: Optional[float] = None,
+        date_mode: str = "datetime",
+        shards: Optional[Sequence[Shard]] = None,
     ):
         """初始化搜索
 
@@ -223,9 +689,27 @@ class Search:
             match_whole_word: 是否全字匹配
             regex: 是否使用正则表达式
             sort_type: 排序类型
-            max_results: 最大结果数量
+            max_results: 最大结果数量，由Everything在服务端限制
+            offset: 结果偏移量，由Everything在服务端跳过
             request_flags: 请求标志位
+            select: 投影字段，指定后请求标志位由字段决定，结果以记录返回
+            record_type: 投影记录类型，默认为namedtuple
+            executor: 查询执行器，指定后查询和结果读取在执行器中原子完成，结果全部读取后返回
+            cache: 查询缓存，指定后优先返回缓存的结果
+            cache_ttl: 缓存结果的过期时间（秒），不指定则使用缓存的默认值
+            date_mode: 结果中日期的格式，见SearchBuilder.date_mode()
+            shards: 分片的(根目录, 执行器)，指定后按根目录拆分查询并归并结果，见SearchBuilder.shard_by()
+
+        Raises:
+            ValueError: 如果日期模式或投影字段无效，或max_results、offset为负数
         """
+        if date_mode not in DATE_MODES:
+            raise ValueError(f"未知的日期模式: {date_mode}，可选值: {', '.join(DATE_MODES)}")
+        if max_results is not None and max_results < 0:
+            raise ValueError("max_results不能为负数")
+        if offset < 0:
+            raise ValueError("offset不能为负数")
+
         self._dll_loader = get_dll_loader()
         self._dll = self._dll_loader.everything_dll
 
@@ -236,123 +720,494 @@ class Search:
         self._regex = regex
         self._sort_type = sort_type
         self._max_results = max_results
+        self._offset = offset
         self._request_flags = request_flags
-
-        self._results: Optional[ResultSet] = None
+        self._select: Optional[Sequence[str]] = None
+        self._record_type: Optional[Callable[..., Any]] = None
+        if select:
+            self.select(*select, record_type=record_type)
+        self._executor = executor
+        self._cache = cache
+        self._cache_ttl = cache_ttl
+        self._date_mode = date_mode
+        self._shards = tuple(shards) if shards else None
+
+        self._results: Optional[Union[ResultSet, ResultSnapshot]] = None
+        self._error: Optional[BaseException] = None
+        self._generation: Optional[int] = None
         self._is_executed = False
         self._is_async = False
-        self._async_completed = False
+        self._completed = threading.Event()
+
+    def select(
+        self, *fields: str, record_type: Optional[Callable[..., Any]] = None
+    ) -> "Search":
+        """只查询指定字段，需在execute之前调用
+
+        Args:
+            fields: 字段名
+            record_type: 记录类型，默认为namedtuple
+
+        Returns:
+            搜索实例（链式调用）
+
+        Raises:
+            ValueError: 如果字段名无效
+        """
+        self._request_flags = fields_to_request_flags(fields)
+        self._select = fields
+        self._record_type = record_type
+        return self
 
     def execute(self, async_query: bool = False) -> None:
         """执行搜索
 
         Args:
-            async_query: 是否异步搜索（不阻塞等待结果）
+            async_query: 是否在后台线程中搜索（不阻塞等待结果）。
+                后台搜索通过执行器完成，结果在完成前全部读取，
+                可以用wait_for_completion()等待，或在asyncio中使用execute_async()
 
         Raises:
             EverythingError: 如果搜索出错
         """
-        # 重置状态
-        self._dll.Everything_Reset()
+        self._reset_state(async_query)
 
-        # 设置搜索参数
-        self._dll.Everything_SetSearchW(self._query_string)
-        self._dll.Everything_SetMatchCase(self._match_case)
-        self._dll.Everything_SetMatchPath(self._match_path)
-        self._dll.Everything_SetMatchWholeWord(self._match_whole_word)
-        self._dll.Everything_SetRegex(self._regex)
-        self._dll.Everything_SetSort(self._sort_type)
-        self._dll.Everything_SetRequestFlags(self._request_flags)
-
-        # 执行查询
         if async_query:
-            self._is_async = True
-            self._async_completed = False
-            # 异步查询需要设置回调窗口，但在Python中实现较复杂
-            # 为简化实现，我们仍然使用同步查询
-            result = self._dll.Everything_QueryW(True)  # 同步查询
-            if not result:
-                # 检查错误
-                self._dll_loader.check_error()
-            self._async_completed = True  # 标记为已完成
+            thread = threading.Thread(target=self._run_in_background, daemon=True)
+            thread.start()
+            return
+
+        if self._executor is not None or self._cache is not None or self._shards:
+            # 在执行器中原子地完成查询和结果读取，相同查询共享一次执行
+            self._results = self._fetch_detached()
         else:
-            self._is_async = False
-            result = self._dll.Everything_QueryW(True)  # 同步查询
-            if not result:
-                # 检查错误
-                self._dll_loader.check_error()
+            # 设置参数、查询和创建结果集期间占用默认执行器的会话，避免与其他线程的设置交错；
+            # 之后按需读取的行会再次确认查询代数，被替换时抛出StaleResultError
+            with get_executor().session():
+                self._apply_query(self._dll)
+                self._results = self._create_result_set(self._dll)
+        self._completed.set()
+
+    async def execute_async(self, timeout: Optional[float] = None) -> None:
+        """在asyncio中执行搜索
+
+        查询和结果读取在线程池中通过执行器原子完成，等待期间事件循环可以处理其他协程；
+        完成后get_results()返回已全部读取的结果集，可用aiter()异步迭代。
 
+        超时或协程被取消时立即返回，已提交给Everything的查询仍会在后台线程中完成，
+        其结果被丢弃（或由合并的相同查询继续使用）。超时、取消或出错后搜索标记为失败，
+        get_results()抛出同一个异常，可以再次调用execute()或execute_async()重新执行。
+
+        Args:
+            timeout: 超时时间（秒），None表示不限制
+
+        Raises:
+            asyncio.TimeoutError: 如果超时
+            asyncio.CancelledError: 如果协程被取消
+            EverythingError: 如果搜索出错
+        """
+        self._reset_state(False)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, self._fetch_detached)
+        try:
+            self._results = await asyncio.wait_for(future, timeout)
+        except BaseException as e:  # noqa: B902
+            self._error = e
+            raise
+        finally:
+            self._completed.set()
+
+    def _reset_state(self, async_query: bool) -> None:
+        """执行前重置结果和完成状态"""
+        self._results = None
+        self._error = None
+        self._is_async = async_query
+        self._completed.clear()
         self._is_executed = True
 
-    def wait_for_completion(self, timeout_ms: int = 10000) -> bool:
-        """等待异步搜索完成
+    def _complete_empty(self) -> None:
+        """不执行查询，直接以空结果完成（过滤条件互相矛盾时使用）"""
+        self._complete_with(
+            ResultSnapshot.empty(self._select, self._request_flags, self._record_type, self._date_mode)
+        )
+
+    def _complete_with(self, results: ResultSnapshot) -> None:
+        """不执行查询，直接以给定的结果完成"""
+        self._reset_state(False)
+        self._results = results
+        self._completed.set()
+
+    def _fetch_detached(self) -> ResultSnapshot:
+        """通过执行器查询并读取全部结果，指定了缓存时优先使用缓存
+
+        Returns:
+            不依赖DLL状态的结果集
+        """
+        if self._shards:
+            return self._fetch_shards()
+        executor = self._executor if self._executor is not None else get_executor()
+        key = self._query_key()
+        if self._cache is None:
+            return executor.run(key, self._query_and_fetch)
+        return self._cache.get_or_load(
+            key,
+            lambda: executor.run(key, self._query_and_fetch),
+            ttl=self._cache_ttl,
+            family=self._settings_key(max_results=None, offset=0),
+        )
+
+    def _run_in_background(self) -> None:
+        """后台线程入口，保存结果或错误后标记完成"""
+        try:
+            self._results = self._fetch_detached()
+        except BaseException as e:  # noqa: B902
+            self._error = e
+        finally:
+            self._completed.set()
+
+    def _apply_query(self, dll: Any) -> None:
+        """设置搜索参数并执行一次同步查询
 
         Args:
-            timeout_ms: 超时时间（毫秒）
+            dll: Everything DLL实例
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        # 重置状态
+        dll.Everything_Reset()
+
+        # 设置搜索参数
+        dll.Everything_SetSearchW(self._query_string)
+        dll.Everything_SetMatchCase(self._match_case)
+        dll.Everything_SetMatchPath(self._match_path)
+        dll.Everything_SetMatchWholeWord(self._match_whole_word)
+        dll.Everything_SetRegex(self._regex)
+        dll.Everything_SetSort(self._sort_type)
+        dll.Everything_SetRequestFlags(self._request_flags)
+
+        # 在Everything中完成分页，避免传输全部结果
+        if self._max_results is not None:
+            dll.Everything_SetMax(self._max_results)
+        if self._offset:
+            dll.Everything_SetOffset(self._offset)
+
+        self._run_query(dll)
+
+    def _settings(self) -> Tuple[Tuple[str, Any], ...]:
+        """搜索参数对应的DLL设置函数和取值，按_apply_query()中的调用顺序
+
+        Returns:
+            (函数名, 取值)元组；不限制数量时Everything_SetMax的取值为MAX_RESULTS_UNLIMITED
+        """
+        return (
+            ("Everything_SetSearchW", self._query_string),
+            ("Everything_SetMatchCase", bool(self._match_case)),
+            ("Everything_SetMatchPath", bool(self._match_path)),
+            ("Everything_SetMatchWholeWord", bool(self._match_whole_word)),
+            ("Everything_SetRegex", bool(self._regex)),
+            ("Everything_SetSort", int(self._sort_type)),
+            ("Everything_SetRequestFlags", int(self._request_flags)),
+            (
+                "Everything_SetMax",
+                MAX_RESULTS_UNLIMITED if self._max_results is None else self._max_results,
+            ),
+            ("Everything_SetOffset", self._offset),
+        )
+
+    def _run_query(self, dll: Any) -> None:
+        """按DLL中已有的设置执行一次同步查询
+
+        Args:
+            dll: Everything DLL实例
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        # 执行查询，之前查询的ResultSet从此失效
+        self._generation = mark_query_changed(dll)
+        result = dll.Everything_QueryW(True)  # 同步查询
+        if not result:
+            # 检查错误
+            raise_for_error_code(dll.Everything_GetLastError())
+
+    def _query_and_fetch(self, dll: Any) -> ResultSnapshot:
+        """执行查询并读取全部结果（在执行器会话中调用）
+
+        Args:
+            dll: Everything DLL实例
+
+        Returns:
+            已全部读取的结果集
+        """
+        self._apply_query(dll)
+        return ResultSnapshot.from_result_set(self._create_result_set(dll))
+
+    def totals(self) -> Tuple[int, int, int]:
+        """执行查询但不读取任何结果，只返回数量
+
+        在执行器中原子地查询并读取数量，不改变get_results()的状态，也不使用缓存。
+
+        Returns:
+            (返回的结果数量, 匹配的文件总数, 匹配的文件夹总数)
+
+        Raises:
+            EverythingError: 如果搜索出错
+        """
+        if self._shards:
+            return self._shard_totals()
+        executor = self._executor if self._executor is not None else get_executor()
+        return executor.run(("totals",) + self._query_key(), self._query_totals)
+
+    def _query_totals(self, dll: Any) -> Tuple[int, int, int]:
+        """执行查询并读取数量（在执行器会话中调用）"""
+        self._apply_query(dll)
+        return (
+            dll.Everything_GetNumResults(),
+            dll.Everything_GetTotFileResults(),
+            dll.Everything_GetTotFolderResults(),
+        )
+
+    def _shard_searches(self, **overrides: Any) -> List["Search"]:
+        """每个根目录一个限定路径的查询，其他设置与本查询相同
+
+        Args:
+            overrides: 覆盖本查询设置的Search参数
+
+        Raises:
+            ValueError: 如果使用正则表达式
+        """
+        return [Search(**options) for options in self._shard_options(**overrides)]
+
+    def _shard_options(self, **overrides: Any) -> List[Dict[str, Any]]:
+        """各分片查询的Search参数，见_shard_searches()
+
+        不同的执行器如果共用同一个DLL加载器（同一份全局DLL状态），并行执行会互相覆盖查询状态，
+        因此这些分片统一使用其中第一个执行器，在它的会话锁上依次执行。
+        """
+        if self._regex:
+            raise ValueError("分片查询不支持正则表达式：根目录条件会成为正则的一部分")
+        default = self._executor if self._executor is not None else get_executor()
+        by_loader: Dict[int, QueryExecutor] = {}
+        shards = []
+        for root, executor in self._shards:
+            if executor is None:
+                executor = default
+            executor = by_loader.setdefault(id(executor.dll_loader), executor)
+            options = dict(
+                query_string=scope_query(self._query_string, root),
+                match_case=self._match_case,
+                match_path=self._match_path,
+                match_whole_word=self._match_whole_word,
+                sort_type=self._sort_type,
+                max_results=self._max_results,
+                offset=self._offset,
+                request_flags=self._request_flags,
+                select=self._select,
+                record_type=self._record_type,
+                executor=executor,
+                cache=self._cache,
+                cache_ttl=self._cache_ttl,
+                date_mode=self._date_mode,
+            )
+            options.update(overrides)
+            shards.append(options)
+        return shards
+
+    def _merge_overrides(self) -> Dict[str, Any]:
+        """分片查询额外读取归并比较所需的列
+
+        Raises:
+            ValueError: 如果排序类型不支持归并
+        """
+        sort_columns = merge_columns(self._sort_type)
+        if self._select:
+            extra = tuple(name for name in sort_columns if name not in self._select)
+            return dict(select=tuple(self._select) + extra, record_type=None)
+        return dict(request_flags=self._request_flags | fields_to_request_flags(sort_columns))
+
+    def _fetch_shards(self) -> ResultSnapshot:
+        """并行执行各分片的查询，按排序类型k路归并为一个快照
+
+        每个分片不跳过任何行，最多读取offset+max_results行，并额外读取归并比较所需的列。
+
+        Raises:
+            ValueError: 如果排序类型不支持归并，或使用正则表达式
+        """
+        stop = None if self._max_results is None else self._offset + self._max_results
+        searches = self._shard_searches(max_results=stop, offset=0, **self._merge_overrides())
+        snapshots = run_parallel(
+            [search.snapshot for search in searches], [search._executor for search in searches]
+        )
+        return merge_snapshots(
+            snapshots,
+            self._sort_type,
+            self._offset,
+            self._max_results,
+            self._select,
+            self._request_flags,
+            self._record_type,
+            self._date_mode,
+        )
+
+    def _shard_pager(self) -> ShardPager:
+        """分片游标的页面读取函数，各分片按页读取并增量归并
+
+        Raises:
+            ValueError: 如果排序类型不支持归并，或使用正则表达式
+        """
+        def fetcher(options: Dict[str, Any]) -> Callable[[int, int], ResultSnapshot]:
+            def fetch_page(offset: int, count: int) -> ResultSnapshot:
+                return Search(**dict(options, max_results=count, offset=offset)).snapshot()
+
+            return fetch_page
+
+        shards = self._shard_options(cache=None, **self._merge_overrides())
+        stop = None if self._max_results is None else self._offset + self._max_results
+        return ShardPager(
+            [fetcher(options) for options in shards],
+            self._sort_type,
+            stop,
+            self._select,
+            self._request_flags,
+            self._record_type,
+            self._date_mode,
+        )
+
+    def _shard_totals(self) -> Tuple[int, int, int]:
+        """并行统计各分片的数量并求和"""
+        searches = self._shard_searches(max_results=0, offset=0)
+        totals = run_parallel(
+            [search.totals for search in searches], [search._executor for search in searches]
+        )
+        files = sum(item[1] for item in totals)
+        folders = sum(item[2] for item in totals)
+        returned = max(files + folders - self._offset, 0)
+        if self._max_results is not None:
+            returned = min(returned, self._max_results)
+        return returned, files, folders
+
+    def snapshot(self) -> ResultSnapshot:
+        """获取不依赖DLL状态的结果快照
+
+        已执行的搜索复制当前的结果列表；尚未执行的搜索在执行器中原子地查询并复制。
+        快照不可变，可以缓存、在线程间传递并多次迭代；之后的get_results()也返回该快照。
 
         Returns:
-            是否成功完成
+            ResultSnapshot实例
 
         Raises:
-            EverythingError: 如果没有执行异步搜索
+            EverythingError: 如果搜索尚未完成或执行出错
         """
         if not self._is_executed:
-            raise EverythingError("搜索尚未执行")
+            self._results = self._fetch_detached()
+            self._is_executed = True
+            self._completed.set()
+            return self._results
 
-        if not self._is_async:
-            return True  # 同步搜索已经完成
+        results = self.get_results()
+        if isinstance(results, ResultSnapshot):
+            return results
 
-        if self._async_completed:
-            return True  # 已经完成
+        # 复制期间占用默认执行器的会话，避免其他线程修改DLL状态
+        with get_executor().session():
+            self._results = ResultSnapshot.from_result_set(results)
+        return self._results
+
+    def _create_result_set(self, dll: Any) -> ResultSet:
+        """基于当前DLL状态创建结果集"""
+        return ResultSet(
+            dll,
+            max_results=self._max_results,
+            fields=self._select,
+            record_type=self._record_type,
+            date_mode=self._date_mode,
+            generation=self._generation,
+        )
 
-        # 等待完成
-        start_time = time.time()
-        while time.time() - start_time < timeout_ms / 1000:
-            if self.is_completed():
-                self._async_completed = True
-                return True
-            time.sleep(0.01)  # 短暂睡眠避免CPU占用
+    def _query_key(self) -> Hashable:
+        """查询的唯一标识，用于合并相同的并发查询
 
-        return False
+        Returns:
+            由所有影响结果的参数组成的元组，第一项是规范化的查询字符串
+        """
+        return (normalize_query(self._query_string, self._match_case, self._regex),) + self._settings_key()
 
-    def is_completed(self) -> bool:
-        """检查异步搜索是否完成
+    def _settings_key(self, **overrides: Any) -> Tuple[Any, ...]:
+        """除查询字符串外影响结果的参数，缓存按其分组以查找可细化的查询
+
+        Args:
+            **overrides: 替换的参数，例如max_results=None、offset=0
 
         Returns:
-            是否完成
+            参数元组
+        """
+        max_results = overrides.get("max_results", self._max_results)
+        offset = overrides.get("offset", self._offset)
+        return (
+            bool(self._match_case),
+            bool(self._match_path),
+            bool(self._match_whole_word),
+            bool(self._regex),
+            int(self._sort_type),
+            int(self._request_flags),
+            max_results,
+            offset,
+            tuple(self._select) if self._select else None,
+            self._record_type,
+            self._date_mode,
+            self._shards,
+        )
+
+    def wait_for_completion(self, timeout_ms: int = 10000) -> bool:
+        """等待后台搜索完成
+
+        Args:
+            timeout_ms: 超时时间（毫秒）
+
+        Returns:
+            是否在超时前完成
+
+        Raises:
+            EverythingError: 如果搜索尚未执行
         """
         if not self._is_executed:
-            return False
+            raise EverythingError("搜索尚未执行")
 
-        if not self._is_async:
-            return True  # 同步搜索已经完成
+        return self._completed.wait(timeout_ms / 1000)
 
-        # 异步查询需要使用不同的方式检查完成状态
-        # 在这个简化版本中，我们直接返回True，因为Everything_IsQueryReply需要消息处理循环
-        # 实际应用中应该使用Windows消息循环和Everything_IsQueryReply函数
-        return True
+    def is_completed(self) -> bool:
+        """检查搜索是否完成
+
+        Returns:
+            是否完成
+        """
+        return self._completed.is_set()
 
-    def get_results(self) -> ResultSet:
+    def get_results(self) -> Union[ResultSet, ResultSnapshot]:
         """获取搜索结果
 
         Returns:
-            结果集
+            结果集；使用执行器、缓存、后台搜索或execute_async()时为已全部读取的ResultSnapshot
 
         Raises:
-            EverythingError: 如果搜索尚未执行或异步搜索尚未完成
+            EverythingError: 如果搜索尚未执行、尚未完成或执行出错
         """
         if not self._is_executed:
             raise EverythingError("搜索尚未执行")
 
-        if self._is_async and not self.is_completed():
-            raise EverythingError("异步搜索尚未完成")
+        if not self.is_completed():
+            raise EverythingError("搜索尚未完成")
+
+        if self._error is not None:
+            raise self._error
 
         # 如果已经有缓存的结果，直接返回
         if self._results is not None:
             return self._results
 
         # 创建结果集
-        self._results = ResultSet(self._dll, max_results=self._max_results)
+        self._results = self._create_result_set(self._dll)
         return self._results
 
     @property
@@ -365,6 +1220,27 @@ class Search:
         return self._query_string
 
 
+def to_search(query: Union["SearchBuilder", Search, str]) -> Search:
+    """把查询字符串、SearchBuilder或Search统一为Search
+
+    Args:
+        query: 查询字符串、SearchBuilder或Search
+
+    Returns:
+        Search实例（传入Search时原样返回）
+
+    Raises:
+        TypeError: 如果查询类型不支持
+    """
+    if isinstance(query, Search):
+        return query
+    if isinstance(query, SearchBuilder):
+        return query._create_search()
+    if isinstance(query, str):
+        return Search(query)
+    raise TypeError(f"不支持的查询类型: {type(query).__name__}")
+
+
 if __name__ == "__main__":
     # 调试代码
     search_builder = SearchBuilder()
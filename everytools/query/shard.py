@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分片搜索模块
+Sharded search and k-way merge module
+
+搜索多个盘符或卷时，默认由一个Everything查询统一决定排序和max_results截断。
+SearchBuilder.shard_by()按根目录把查询拆分为多个限定路径的查询，分别在各自的执行器
+（可以对应不同的Everything实例或后端）中并行执行，再按排序类型对各分片已排好序的结果
+做基于堆的k路归并。有数量限制时每个分片只读取offset+limit行，归并取够后立即停止，
+因此跨卷的前N个结果代价很小。分页游标为每个分片保留一页结果，逐页增量归并。
+"""
+
+import heapq
+import itertools
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ..constants import RequestFlag, SortType
+from ..core.executor import QueryExecutor
+from ..core.query_parser import Text, format_query
+from ..core.result import COLUMNS, UNKNOWN_SIZE
+from ..core.snapshot import Column, ResultSnapshot, snapshot_columns
+
+T = TypeVar("T")
+
+# 一个分片：(根目录, 执行器)，执行器为None时使用查询自身的执行器
+Shard = Tuple[str, Optional[QueryExecutor]]
+
+# 升序排序类型 -> 归并时比较的列；同值时再按名称比较，与Everything一致。
+# 类型名称由系统提供，无法在本地比较，不支持归并
+MERGE_COLUMNS: Dict[SortType, Tuple[str, ...]] = {
+    SortType.NAME_ASCENDING: ("name",),
+    SortType.PATH_ASCENDING: ("path", "name"),
+    SortType.SIZE_ASCENDING: ("size", "name"),
+    SortType.EXTENSION_ASCENDING: ("extension", "name"),
+    SortType.DATE_CREATED_ASCENDING: ("date_created", "name"),
+    SortType.DATE_MODIFIED_ASCENDING: ("date_modified", "name"),
+    SortType.ATTRIBUTES_ASCENDING: ("attributes", "name"),
+    SortType.FILE_LIST_FILENAME_ASCENDING: ("name",),
+    SortType.RUN_COUNT_ASCENDING: ("run_count", "name"),
+    SortType.DATE_ACCESSED_ASCENDING: ("date_accessed", "name"),
+    SortType.DATE_RUN_ASCENDING: ("date_run", "name"),
+}
+
+
+def normalize_roots(
+    roots: Union[str, Sequence[str], Mapping[str, Optional[QueryExecutor]]]
+) -> Tuple[Shard, ...]:
+    """规范化分片的根目录
+
+    根目录统一使用反斜杠并以反斜杠结尾（"C:" -> "C:\\"），只匹配其下的文件和文件夹。
+
+    Args:
+        roots: 根目录、根目录序列，或根目录到执行器的映射
+
+    Returns:
+        (根目录, 执行器)元组
+
+    Raises:
+        ValueError: 如果没有根目录、根目录为空，或根目录互相包含（同一文件会出现在多个分片中）
+    """
+    if isinstance(roots, str):
+        roots = [roots]
+    items = roots.items() if isinstance(roots, Mapping) else ((root, None) for root in roots)
+    shards = []
+    for root, executor in items:
+        root = root.strip().replace("/", "\\")
+        if not root:
+            raise ValueError("根目录不能为空")
+        if not root.endswith("\\"):
+            root += "\\"
+        shards.append((root, executor))
+    if not shards:
+        raise ValueError("至少需要一个根目录")
+    folded = [root.casefold() for root, _ in shards]
+    for outer, inner in itertools.permutations(range(len(shards)), 2):
+        if folded[inner].startswith(folded[outer]):
+            raise ValueError(f"根目录重叠: {shards[outer][0]} 包含 {shards[inner][0]}")
+    return tuple(shards)
+
+
+def scope_query(query_string: str, root: str) -> str:
+    """把查询限定在根目录下：追加根目录作为路径条件"""
+    return " ".join(part for part in (query_string, format_query(Text(root))) if part)
+
+
+def merge_columns(sort_type: SortType) -> Tuple[str, ...]:
+    """按排序类型归并时需要比较的列
+
+    Args:
+        sort_type: 排序类型
+
+    Returns:
+        列名
+
+    Raises:
+        ValueError: 如果排序类型不支持归并
+    """
+    sort_type = SortType(sort_type)
+    ascending = SortType(sort_type if sort_type % 2 == 1 else sort_type - 1)
+    columns = MERGE_COLUMNS.get(ascending)
+    if columns is None:
+        raise ValueError(f"排序类型不支持分片归并: {sort_type.name}")
+    return columns
+
+
+def merge_request_flags(sort_type: SortType) -> RequestFlag:
+    """归并比较所需列的请求标志位"""
+    flags = RequestFlag(0)
+    for name in merge_columns(sort_type):
+        flags |= COLUMNS[name][0]
+    return flags
+
+
+def _key_reader(
+    snapshot: ResultSnapshot, columns: Sequence[str]
+) -> Callable[[int], Tuple[Any, ...]]:
+    """快照中一行的归并键：字符串不区分大小写，未知大小排在最前"""
+    readers: List[Callable[[int], Any]] = []
+    for name in columns:
+        column = snapshot.column(name)
+        if name == "size":
+            readers.append(lambda i, c=column: -1 if c[i] == UNKNOWN_SIZE else c[i])
+        elif isinstance(column, memoryview):
+            readers.append(column.__getitem__)
+        else:
+            readers.append(lambda i, c=column: (c[i] or "").lower())
+    return lambda i: tuple(read(i) for read in readers)
+
+
+def _keyed_rows(
+    snapshot: ResultSnapshot, shard: int, columns: Sequence[str]
+) -> Iterator[Tuple[Tuple[Any, ...], int, int]]:
+    """按顺序逐行得到(归并键, 分片下标, 行下标)"""
+    key = _key_reader(snapshot, columns)
+    for index in range(len(snapshot)):
+        yield key(index), shard, index
+
+
+def merge_order(
+    snapshots: Sequence[ResultSnapshot], sort_type: SortType, limit: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """k路归并各分片已排好序的结果
+
+    每个分片的归并键在取用时才计算，取够limit行后停止，不会读取其余的行。
+    键相同时靠前的分片优先。
+
+    Args:
+        snapshots: 各分片的结果，已按sort_type排序并包含merge_columns()中的列
+        sort_type: 排序类型
+        limit: 最多归并的行数，None表示全部
+
+    Yields:
+        按排序类型依次得到的(分片下标, 行下标)
+
+    Raises:
+        ValueError: 如果排序类型不支持归并
+    """
+    columns = merge_columns(sort_type)
+    streams = [_keyed_rows(snapshot, shard, columns) for shard, snapshot in enumerate(snapshots)]
+    merged = heapq.merge(*streams, key=itemgetter(0), reverse=int(sort_type) % 2 == 0)
+    for _, shard, index in itertools.islice(merged, limit):
+        yield shard, index
+
+
+def _gather(columns: Sequence[Column], order: Sequence[Tuple[int, int]]) -> Column:
+    """按归并顺序从各分片的同名列中取出数据，保持列的类型"""
+    values = [columns[shard][index] for shard, index in order]
+    if isinstance(columns[0], memoryview):
+        return memoryview(array(columns[0].format, values).tobytes()).cast(columns[0].format)
+    return tuple(values)
+
+
+def _merged_snapshot(
+    segments: Sequence[ResultSnapshot],
+    order: Sequence[Tuple[int, int]],
+    total_files: int,
+    total_folders: int,
+    fields: Optional[Sequence[str]],
+    request_flags: RequestFlag,
+    record_type: Optional[Callable[..., Any]],
+    date_mode: str,
+) -> ResultSnapshot:
+    """按归并顺序(快照下标, 行下标)从各快照取出行，组成一个快照"""
+    if not segments:
+        return ResultSnapshot.empty(fields, request_flags, record_type, date_mode)
+    columns = {
+        name: _gather([segment.column(name) for segment in segments], order)
+        for name in snapshot_columns(fields, request_flags)
+    }
+    return ResultSnapshot(
+        columns,
+        len(order),
+        len(order),
+        total_files,
+        total_folders,
+        tuple(fields) if fields else None,
+        record_type,
+        date_mode,
+    )
+
+
+def merge_snapshots(
+    snapshots: Sequence[ResultSnapshot],
+    sort_type: SortType,
+    offset: int = 0,
+    max_results: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    request_flags: RequestFlag = RequestFlag.FILE_NAME | RequestFlag.PATH,
+    record_type: Optional[Callable[..., Any]] = None,
+    date_mode: str = "datetime",
+) -> ResultSnapshot:
+    """把各分片的结果归并为一个快照
+
+    与Everything一样，offset和max_results只限制返回的行，文件数和文件夹数为各分片之和。
+
+    Args:
+        snapshots: 各分片的结果，见merge_order()
+        sort_type: 排序类型
+        offset: 跳过的行数
+        max_results: 最多返回的行数，None表示不限制
+        fields: 结果的投影字段，未投影时为None
+        request_flags: 结果的请求标志位，决定保存哪些列
+        record_type: 投影记录类型
+        date_mode: 日期模式
+
+    Returns:
+        归并后的ResultSnapshot
+
+    Raises:
+        ValueError: 如果排序类型不支持归并
+    """
+    stop = None if max_results is None else offset + max_results
+    order = list(merge_order(snapshots, sort_type, stop))[offset:]
+    return _merged_snapshot(
+        snapshots,
+        order,
+        sum(snapshot.total_files for snapshot in snapshots),
+        sum(snapshot.total_folders for snapshot in snapshots),
+        fields,
+        request_flags,
+        record_type,
+        date_mode,
+    )
+
+
+class ShardPager:
+    """分片游标的页面读取函数
+
+    每个分片只保留当前读到的一页结果，这一页归并完后才按偏移量读取该分片的下一页；
+    归并状态在各页之间保留，因此遍历M行时每个分片共读取约M行，内存中最多保留每个分片一页。
+    只能按偏移量递增的顺序依次读取（SearchCursor即如此），不能回退。
+    """
+
+    def __init__(
+        self,
+        fetchers: Sequence[Callable[[int, int], ResultSnapshot]],
+        sort_type: SortType,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        request_flags: RequestFlag = RequestFlag.FILE_NAME | RequestFlag.PATH,
+        record_type: Optional[Callable[..., Any]] = None,
+        date_mode: str = "datetime",
+    ):
+        """初始化页面读取函数
+
+        Args:
+            fetchers: 各分片的页面读取函数：(偏移量, 最大数量) -> 已按sort_type排序、
+                包含merge_columns()中的列的快照
+            sort_type: 排序类型
+            limit: 从第0行起最多归并的行数（offset+limit），None表示全部
+            fields: 结果的投影字段，未投影时为None
+            request_flags: 结果的请求标志位，决定保存哪些列
+            record_type: 投影记录类型
+            date_mode: 日期模式
+
+        Raises:
+            ValueError: 如果排序类型不支持归并
+        """
+        self._fetchers = fetchers
+        self._columns = merge_columns(sort_type)
+        self._reverse = int(sort_type) % 2 == 0
+        self._limit = limit
+        self._fields = fields
+        self._request_flags = request_flags
+        self._record_type = record_type
+        self._date_mode = date_mode
+        self._count = 0
+        self._position = 0
+        # 各分片最近一页的快照，文件数和文件夹数取自这里
+        self._latest: List[Optional[ResultSnapshot]] = [None] * len(fetchers)
+        self._merged: Optional[Iterator[Tuple[Tuple[Any, ...], int, ResultSnapshot, int]]] = None
+
+    def _shard_rows(
+        self, shard: int
+    ) -> Iterator[Tuple[Tuple[Any, ...], int, ResultSnapshot, int]]:
+        """逐行得到一个分片的(归并键, 分片下标, 快照, 行下标)，当前页归并完后才读取下一页"""
+        offset = 0
+        while True:
+            count = self._count
+            if self._limit is not None:
+                count = min(count, self._limit - offset)
+            if count <= 0:
+                return
+            page = self._fetchers[shard](offset, count)
+            self._latest[shard] = page
+            key = _key_reader(page, self._columns)
+            for index in range(len(page)):
+                yield key(index), shard, page, index
+            if len(page) < count:
+                return
+            offset += len(page)
+
+    def __call__(self, offset: int, count: int) -> ResultSnapshot:
+        """读取归并后从offset开始的count行
+
+        Raises:
+            ValueError: 如果offset小于已读取的位置
+        """
+        if offset < self._position:
+            raise ValueError("分片游标只能按顺序读取")
+        self._count = count
+        if self._merged is None:
+            streams = [self._shard_rows(shard) for shard in range(len(self._fetchers))]
+            self._merged = heapq.merge(*streams, key=itemgetter(0), reverse=self._reverse)
+        # 跳过游标起始偏移量之前的行
+        for _ in itertools.islice(self._merged, offset - self._position):
+            pass
+        rows = list(itertools.islice(self._merged, count))
+        self._position = offset + len(rows)
+
+        segments: List[ResultSnapshot] = []
+        indexes: Dict[int, int] = {}
+        order = []
+        for _, _, page, index in rows:
+            segment = indexes.get(id(page))
+            if segment is None:
+                segment = indexes[id(page)] = len(segments)
+                segments.append(page)
+            order.append((segment, index))
+        latest = [page for page in self._latest if page is not None]
+        return _merged_snapshot(
+            segments,
+            order,
+            sum(page.total_files for page in latest),
+            sum(page.total_folders for page in latest),
+            self._fields,
+            self._request_flags,
+            self._record_type,
+            self._date_mode,
+        )
+
+
+def run_parallel(
+    tasks: Sequence[Callable[[], T]], executors: Optional[Sequence[Any]] = None
+) -> List[T]:
+    """在线程中执行各分片的任务，按顺序返回结果
+
+    使用同一执行器的任务在同一个线程中依次执行；不同执行器（不同的Everything实例或后端）的任务并行执行。
+
+    Args:
+        tasks: 各分片的任务
+        executors: 各任务使用的执行器，不指定则所有任务并行执行
+
+    Returns:
+        各任务的结果
+    """
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(tasks)):
+        key = id(executors[index]) if executors is not None else index
+        groups.setdefault(key, []).append(index)
+    results: List[Any] = [None] * len(tasks)
+
+    def run(indexes: List[int]) -> None:
+        for index in indexes:
+            results[index] = tasks[index]()
+
+    if len(groups) == 1:
+        run(list(range(len(tasks))))
+        return results
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        for future in [pool.submit(run, indexes) for indexes in groups.values()]:
+            future.result()
+    return results
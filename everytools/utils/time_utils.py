@@ -9,7 +9,7 @@ Time utility module
 import datetime
 import struct
 import time
-from typing import Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 # 调试开关
 DEBUG = False
@@ -128,3 +128,317 @@ def datetime_to_filetime(dt: Union[datetime.datetime, float, None]) -> bytes:
 
     winticks = int(timestamp * WINDOWS_TICKS + WINDOWS_TICKS_TO_POSIX_EPOCH)
     return struct.pack("<Q", winticks)
+
+
+# 批量转换：一次计算有效范围，逐个处理FILETIME整数，不经过struct打包和解包
+
+# 有效范围上限：现在+100年
+MAX_FUTURE_SECONDS = 3153600000
+
+# 日期模式：
+#   raw      原始FILETIME整数
+#   epoch    Unix时间戳（浮点秒数）
+#   datetime 本地时间的naive datetime（与filetime_to_datetime一致）
+#   utc      UTC时区的aware datetime
+#   iso      UTC时间的ISO 8601字符串
+#   str      本地时间的"%Y-%m-%d %H:%M:%S"字符串（与filetime_to_str一致）
+DATE_MODES = ("raw", "epoch", "datetime", "utc", "iso", "str")
+
+# 列式转换额外支持numpy.datetime64数组
+DATE_FORMATS = DATE_MODES + ("datetime64",)
+
+UTC_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# 每天的FILETIME刻度数，以及FILETIME起点（1601-01-01）的日期序数
+TICKS_PER_DAY = 86400 * WINDOWS_TICKS
+FILETIME_EPOCH_ORDINAL = WINDOWS_EPOCH.toordinal()
+POSIX_EPOCH_ORDINAL = POSIX_EPOCH.toordinal()
+SECONDS_PER_DAY = 86400
+
+
+def max_valid_filetime(now: Optional[float] = None) -> int:
+    """计算有效FILETIME的上限（现在+100年）
+
+    Args:
+        now: 当前Unix时间戳，不指定则使用time.time()
+
+    Returns:
+        FILETIME上限值
+    """
+    if now is None:
+        now = time.time()
+    return int((now + MAX_FUTURE_SECONDS) * WINDOWS_TICKS + WINDOWS_TICKS_TO_POSIX_EPOCH)
+
+
+class FiletimeDecoder:
+    """按日期模式转换FILETIME整数
+
+    有效范围在创建时计算一次，之后每次转换只做一次比较；
+    utc和iso模式直接由整数计算，不查询本地时区。
+    datetime和str模式按UTC日期缓存本地时区的偏移量，同一天内只做整数运算，
+    只有包含夏令时切换的日期才逐个查询本地时间。
+    """
+
+    __slots__ = ("mode", "max_ticks", "_convert", "_offsets", "_days")
+
+    def __init__(self, mode: str = "datetime", max_ticks: Optional[int] = None):
+        """初始化转换器
+
+        Args:
+            mode: 日期模式，见DATE_MODES
+            max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+        Raises:
+            ValueError: 如果日期模式无效
+        """
+        if mode not in DATE_MODES:
+            raise ValueError(f"未知的日期模式: {mode}，可选值: {', '.join(DATE_MODES)}")
+        self.mode = mode
+        self.max_ticks = max_valid_filetime() if max_ticks is None else max_ticks
+        self._convert = getattr(self, f"_to_{mode}")
+        # UTC日期 -> 当天的本地时区偏移（秒），当天偏移有变化时为None
+        self._offsets: Dict[int, Optional[int]] = {}
+        # 本地日期 -> "%Y-%m-%d"字符串
+        self._days: Dict[int, str] = {}
+
+    def __call__(self, value: int) -> Any:
+        """转换一个FILETIME整数
+
+        Args:
+            value: FILETIME整数
+
+        Returns:
+            转换后的值，0、0xFFFFFFFFFFFFFFFF和超出范围的值为None
+        """
+        if not WINDOWS_TICKS_TO_POSIX_EPOCH < value <= self.max_ticks:
+            return None
+        try:
+            return self._convert(value)
+        except (ValueError, OSError, OverflowError):
+            return None
+
+    def decode_many(self, ticks: Iterable[int]) -> List[Any]:
+        """批量转换FILETIME整数
+
+        Args:
+            ticks: FILETIME整数序列（例如array('Q')）
+
+        Returns:
+            转换后的值列表
+        """
+        return [self(value) for value in ticks]
+
+    @staticmethod
+    def _to_raw(value: int) -> int:
+        return value
+
+    @staticmethod
+    def _to_epoch(value: int) -> float:
+        # 与filetime_to_timestamp使用相同的浮点运算，结果完全一致
+        return (value - WINDOWS_TICKS_TO_POSIX_EPOCH) / WINDOWS_TICKS
+
+    def _offset(self, day: int) -> Optional[int]:
+        """UTC日期（Unix天数）的本地时区偏移（秒），当天有夏令时切换时为None"""
+        start = day * SECONDS_PER_DAY
+        first = time.localtime(start).tm_gmtoff
+        last = time.localtime(start + SECONDS_PER_DAY - 1).tm_gmtoff
+        offset = first if first == last else None
+        self._offsets[day] = offset
+        return offset
+
+    def _to_datetime(self, value: int) -> datetime.datetime:
+        # 与filetime_to_datetime使用相同的浮点时间戳，微秒的舍入与datetime.fromtimestamp相同
+        timestamp = (value - WINDOWS_TICKS_TO_POSIX_EPOCH) / WINDOWS_TICKS
+        seconds = int(timestamp)
+        day = seconds // SECONDS_PER_DAY
+        offset = self._offsets[day] if day in self._offsets else self._offset(day)
+        if offset is None:
+            return datetime.datetime.fromtimestamp(timestamp)
+        microseconds = round((timestamp - seconds) * 1000000)
+        return POSIX_EPOCH + datetime.timedelta(0, seconds + offset, microseconds)
+
+    @staticmethod
+    def _to_utc(value: int) -> datetime.datetime:
+        microseconds = (value - int(WINDOWS_TICKS_TO_POSIX_EPOCH)) // 10
+        return UTC_EPOCH + datetime.timedelta(microseconds=microseconds)
+
+    @classmethod
+    def _to_iso(cls, value: int) -> str:
+        return cls._to_utc(value).isoformat()
+
+    def _to_str(self, value: int) -> str:
+        # 与time.localtime()一样舍去小数部分
+        seconds = int((value - WINDOWS_TICKS_TO_POSIX_EPOCH) / WINDOWS_TICKS)
+        day = seconds // SECONDS_PER_DAY
+        offset = self._offsets[day] if day in self._offsets else self._offset(day)
+        if offset is None:
+            return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+        days, rest = divmod(seconds + offset, SECONDS_PER_DAY)
+        date = self._days.get(days)
+        if date is None:
+            date = datetime.date.fromordinal(POSIX_EPOCH_ORDINAL + days).isoformat()
+            self._days[days] = date
+        minutes, second = divmod(rest, 60)
+        hour, minute = divmod(minutes, 60)
+        return f"{date} {hour:02d}:{minute:02d}:{second:02d}"
+
+
+def filetimes_to_timestamps(
+    ticks: Iterable[int], max_ticks: Optional[int] = None
+) -> List[Optional[float]]:
+    """批量将FILETIME整数转换为Unix时间戳
+
+    Args:
+        ticks: FILETIME整数序列（例如array('Q')）
+        max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+    Returns:
+        Unix时间戳列表，0、0xFFFFFFFFFFFFFFFF和超出范围的值为None
+    """
+    return FiletimeDecoder("epoch", max_ticks).decode_many(ticks)
+
+
+def filetimes_to_datetimes(
+    ticks: Iterable[int],
+    tz: Optional[datetime.tzinfo] = None,
+    max_ticks: Optional[int] = None,
+) -> List[Optional[datetime.datetime]]:
+    """批量将FILETIME整数转换为datetime对象
+
+    Args:
+        ticks: FILETIME整数序列（例如array('Q')）
+        tz: 时区，不指定则返回本地时间的naive datetime（与filetime_to_datetime一致）
+        max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+    Returns:
+        datetime列表，0、0xFFFFFFFFFFFFFFFF和超出范围的值为None
+    """
+    if tz is None:
+        return FiletimeDecoder("datetime", max_ticks).decode_many(ticks)
+    return [
+        value.astimezone(tz) if value is not None else None
+        for value in FiletimeDecoder("utc", max_ticks).decode_many(ticks)
+    ]
+
+
+def filetimes_to_iso(ticks: Iterable[int], max_ticks: Optional[int] = None) -> List[Optional[str]]:
+    """批量将FILETIME整数转换为UTC时间的ISO 8601字符串
+
+    只用整数运算拆分日期和时间，日期部分按天缓存，不为每个值创建datetime对象；
+    结果与FiletimeDecoder("iso")逐个转换相同。
+
+    Args:
+        ticks: FILETIME整数序列（例如array('Q')）
+        max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+    Returns:
+        ISO 8601字符串列表，0、0xFFFFFFFFFFFFFFFF和超出范围的值为None
+    """
+    if max_ticks is None:
+        max_ticks = max_valid_filetime()
+    low = int(WINDOWS_TICKS_TO_POSIX_EPOCH)
+    days_cache: Dict[int, str] = {}
+    result: List[Optional[str]] = []
+    append = result.append
+    for value in ticks:
+        if not low < value <= max_ticks:
+            append(None)
+            continue
+        days, rest = divmod(value, TICKS_PER_DAY)
+        day = days_cache.get(days)
+        if day is None:
+            day = datetime.date.fromordinal(FILETIME_EPOCH_ORDINAL + days).isoformat()
+            days_cache[days] = day
+        seconds, microsecond = divmod(rest // 10, 1000000)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        if microsecond:
+            append(f"{day}T{hour:02d}:{minute:02d}:{second:02d}.{microsecond:06d}+00:00")
+        else:
+            append(f"{day}T{hour:02d}:{minute:02d}:{second:02d}+00:00")
+    return result
+
+
+def filetimes_to_datetime64(ticks: Any, max_ticks: Optional[int] = None) -> Any:
+    """批量将FILETIME整数转换为numpy.datetime64[ns]数组（UTC）
+
+    需要安装numpy。ticks可以是array('Q')、memoryview或numpy数组，转换时不复制输入。
+
+    Args:
+        ticks: FILETIME整数序列
+        max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+    Returns:
+        numpy.datetime64[ns]数组，0、0xFFFFFFFFFFFFFFFF和超出范围的值为NaT
+
+    Raises:
+        ImportError: 如果没有安装numpy
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("filetimes_to_datetime64需要numpy，请先安装: pip install numpy") from e
+
+    if max_ticks is None:
+        max_ticks = max_valid_filetime()
+    values = np.asarray(ticks, dtype=np.uint64)
+    epoch = np.uint64(int(WINDOWS_TICKS_TO_POSIX_EPOCH))
+    valid = (values > epoch) & (values <= np.uint64(max_ticks))
+    # 无效值先替换为起点，避免无符号减法溢出
+    offsets = (np.where(valid, values, epoch) - epoch).astype(np.int64) * 100
+    result = offsets.view("datetime64[ns]")
+    result[~valid] = np.datetime64("NaT")
+    return result
+
+
+def convert_filetimes(ticks: Any, date_format: str = "raw", max_ticks: Optional[int] = None) -> Any:
+    """按格式批量转换FILETIME整数
+
+    Args:
+        ticks: FILETIME整数序列
+        date_format: DATE_MODES中的日期模式或"datetime64"；"raw"原样返回输入
+        max_ticks: 有效FILETIME的上限，不指定则使用max_valid_filetime()
+
+    Returns:
+        转换后的序列
+
+    Raises:
+        ValueError: 如果格式无效
+    """
+    if date_format == "raw":
+        return ticks
+    if date_format == "datetime64":
+        return filetimes_to_datetime64(ticks, max_ticks)
+    if date_format == "iso":
+        return filetimes_to_iso(ticks, max_ticks)
+    if date_format not in DATE_MODES:
+        raise ValueError(f"未知的日期格式: {date_format}，可选值: {', '.join(DATE_FORMATS)}")
+    return FiletimeDecoder(date_format, max_ticks).decode_many(ticks)
+
+
+def to_filetime(value: Any) -> int:
+    """把任一日期模式得到的值转换回FILETIME整数（FiletimeDecoder的逆运算）
+
+    Args:
+        value: FILETIME整数、Unix时间戳、datetime（没有时区时为本地时间）
+            或iso、str模式的字符串
+
+    Returns:
+        FILETIME整数，None或无法解析的值为0（未知）
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        timestamp = value
+    elif isinstance(value, datetime.datetime):
+        timestamp = value.timestamp()
+    elif isinstance(value, str):
+        try:
+            timestamp = datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return 0
+    else:
+        return 0
+    return int(timestamp * WINDOWS_TICKS) + int(WINDOWS_TICKS_TO_POSIX_EPOCH)
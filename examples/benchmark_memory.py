@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EveryTools内存占用基准测试
+比较不同结果表示方式保存大量结果时占用的内存，使用模拟DLL，无需Windows
+
+用法:
+    python examples/benchmark_memory.py            # 默认10万条结果
+    python examples/benchmark_memory.py 1000000    # 100万条结果
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from everytools import Search
+from everytools.constants import RequestFlag
+from everytools.core import EmulatedDLL, FileResult, use_backend
+
+# 默认请求的字段，与SearchBuilder一致
+REQUEST_FLAGS = (
+    RequestFlag.FILE_NAME
+    | RequestFlag.PATH
+    | RequestFlag.FULL_PATH_AND_FILE_NAME
+    | RequestFlag.SIZE
+    | RequestFlag.DATE_CREATED
+    | RequestFlag.DATE_MODIFIED
+    | RequestFlag.EXTENSION
+)
+
+
+class DictFileResult:
+    """改为__slots__之前的FileResult：16个属性保存在实例__dict__中，full_path在创建时拼接"""
+
+    def __init__(self, item: FileResult):
+        self.name = item.name
+        self.path = item.path
+        self.full_path = os.path.join(item.path, item.name)
+        self.size = item.size
+        self.date_created = item.date_created
+        self.date_modified = item.date_modified
+        self.date_accessed = item.date_accessed
+        self.date_run = item.date_run
+        self.extension = item.extension
+        self.attributes = item.attributes
+        self.is_file = item.is_file
+        self.is_folder = item.is_folder
+        self.is_volume = item.is_volume
+        self.run_count = item.run_count
+        self.highlighted_name = item.highlighted_name
+        self.highlighted_path = item.highlighted_path
+
+
+def measure(build):
+    """返回build()的结果在内存中占用的字节数（不含各方式共享的字符串）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main(count: int) -> None:
+    """运行基准测试
+
+    Args:
+        count: 结果数量
+    """
+    print(f"生成 {count:,} 条模拟结果...")
+    with use_backend(EmulatedDLL(file_count=count, seed=1)):
+        search = Search("", request_flags=REQUEST_FLAGS)
+        search.execute()
+        results = search.get_results()
+
+        # 先读取一次，名称、路径等字符串由各种表示方式共享，不计入对比
+        rows = list(results)
+        snapshot, snapshot_bytes = measure(search.snapshot)
+
+    _, dict_bytes = measure(lambda: [DictFileResult(item) for item in rows])
+    _, slots_bytes = measure(
+        lambda: [
+            FileResult(
+                name=item.name,
+                path=item.path,
+                size=item.size,
+                date_created=item.date_created,
+                date_modified=item.date_modified,
+                extension=item.extension,
+                is_file=item.is_file,
+                is_folder=item.is_folder,
+            )
+            for item in rows
+        ]
+    )
+
+    print()
+    print(f"{'表示方式':<28}{'总计':>12}{'每条':>10}")
+    for label, size in (
+        ("__dict__ FileResult（旧）", dict_bytes),
+        ("__slots__ FileResult", slots_bytes),
+        ("ResultSnapshot（列式）", snapshot_bytes),
+    ):
+        print(f"{label:<28}{size / 1024 / 1024:>10.1f}MB{size / count:>9.0f}B")
+    print()
+    print(f"__slots__ FileResult占用旧实现的 {slots_bytes / dict_bytes:.0%}")
+    print(f"快照中保存的列: {', '.join(snapshot.columns)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
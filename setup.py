@@ -31,6 +31,10 @@ setup(
     long_description=README,
     long_description_content_type="text/markdown",
     install_requires=INSTALL_PACKAGES,
+    extras_require={
+        "arrow": ["pyarrow"],
+        "pandas": ["pyarrow", "pandas"],
+    },
     version=VERSION,
     url="https://github.com/yangjiada/everytools",
     author="Jan Yang",
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试Arrow与pandas导出 - 列类型正确，数值与逐行读取一致
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.core.arrow import columns_to_arrow
+from everytools.core.result import UNKNOWN_SIZE
+from everytools.utils.time_utils import filetimes_to_datetime64
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def test_arrow_types_and_values():
+    """大小为uint64，日期为timestamp[ns]，扩展名为字典编码，数值与逐行读取一致"""
+    if pa is None:
+        return
+    with use_backend(EmulatedDLL(file_count=500)):
+        search = SearchBuilder().execute()
+        results = search.get_results()
+        raw = results.to_columns()
+        table = results.to_arrow()
+        snapshot_table = search.snapshot().to_arrow()
+
+    assert table.schema.field("size").type == pa.uint64()
+    assert table.schema.field("date_modified").type == pa.timestamp("ns")
+    assert pa.types.is_dictionary(table.schema.field("extension").type)
+    assert table.schema.field("is_folder").type == pa.bool_()
+    sizes = [None if value == UNKNOWN_SIZE else value for value in raw["size"]]
+    assert table.column("size").to_pylist() == sizes
+    assert table.column("extension").to_pylist() == raw["extension"]
+    expected = filetimes_to_datetime64(raw["date_modified"])
+    assert table.column("date_modified").to_numpy().tolist() == expected.tolist()
+    for name in table.column_names:
+        assert snapshot_table.column(name).equals(table.column(name))
+
+
+def test_unknown_values_are_null():
+    """未知大小和无效FILETIME转换为null"""
+    if pa is None:
+        return
+    from array import array
+
+    table = columns_to_arrow(
+        {
+            "size": array("Q", [1, UNKNOWN_SIZE]),
+            "date_modified": array("Q", [0, 132000000000000000]),
+        }
+    )
+    assert table.column("size").to_pylist() == [1, None]
+    assert table.column("date_modified").null_count == 1
+
+
+def test_pandas():
+    """to_pandas()得到可空整数和datetime64列"""
+    try:
+        import pandas as pd
+    except ImportError:
+        return
+    with use_backend(EmulatedDLL(file_count=200)):
+        results = SearchBuilder().select("name", "size", "date_modified").execute().get_results()
+        frame = results.to_pandas()
+        names = [row.name for row in results]
+    assert list(frame.columns) == ["name", "size", "date_modified", "is_folder"]
+    assert frame["size"].dtype == pd.UInt64Dtype()
+    assert str(frame["date_modified"].dtype) == "datetime64[ns]"
+    assert frame["name"].tolist() == names
+
+
+if __name__ == "__main__":
+    test_arrow_types_and_values()
+    test_unknown_values_are_null()
+    test_pandas()
+    print("全部通过")
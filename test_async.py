@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试asyncio搜索接口 - 使用模拟DLL验证不阻塞事件循环、超时和异步迭代
+"""
+
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import Search, SearchBuilder
+from everytools.constants import ErrorCode
+from everytools.core import EmulatedDLL, use_backend
+from everytools.exceptions import IPCError
+
+
+def test_execute_async_does_not_block_loop():
+    """查询期间其他协程继续运行"""
+    dll = EmulatedDLL(file_count=500, latency={"Everything_QueryW": 0.2})
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        search = await SearchBuilder().keywords("report").limit(10).execute_async()
+        task.cancel()
+        return search, ticks
+
+    with use_backend(dll):
+        search, ticks = asyncio.run(main())
+    assert search.is_completed()
+    assert len(search.get_results()) <= 10
+    assert ticks >= 5
+
+
+def test_execute_async_timeout():
+    """超时立即抛出asyncio.TimeoutError"""
+    dll = EmulatedDLL(file_count=100, latency={"Everything_QueryW": 0.5})
+
+    async def main():
+        started = time.perf_counter()
+        try:
+            await SearchBuilder().keywords("data").execute_async(timeout=0.05)
+        except asyncio.TimeoutError:
+            return time.perf_counter() - started
+        raise AssertionError("应当超时")
+
+    with use_backend(dll):
+        elapsed = asyncio.run(main())
+    assert elapsed < 0.4
+
+
+def test_execute_async_timeout_can_retry():
+    """超时后搜索标记为失败，get_results()抛出超时异常，同一个实例可以重新执行"""
+    dll = EmulatedDLL(file_count=100, latency={"Everything_QueryW": 0.2})
+    search = None
+
+    async def main():
+        nonlocal search
+        search = Search("data")
+        try:
+            await search.execute_async(timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("应当超时")
+        assert search.is_completed()
+        try:
+            search.get_results()
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("get_results()应当抛出超时异常")
+        await search.execute_async(timeout=5)
+
+    with use_backend(dll):
+        asyncio.run(main())
+        expected = [row.name for row in SearchBuilder().keywords("data").execute().get_results()]
+    assert [row.name for row in search.get_results()] == expected
+
+
+def test_execute_async_error():
+    """搜索错误在await处抛出"""
+    dll = EmulatedDLL(file_count=100)
+    dll.inject_error(ErrorCode.EVERYTHING_ERROR_IPC)
+
+    async def main():
+        await SearchBuilder().keywords("data").execute_async()
+
+    with use_backend(dll):
+        try:
+            asyncio.run(main())
+        except IPCError:
+            pass
+        else:
+            raise AssertionError("应当抛出IPCError")
+
+
+def test_aiter():
+    """异步迭代结果与同步迭代一致"""
+    dll = EmulatedDLL(file_count=2000)
+
+    async def collect(results):
+        return [row async for row in results.aiter(chunk_size=7)]
+
+    with use_backend(dll):
+        builder = SearchBuilder().keywords("photo").select("name", "size")
+        expected = list(builder.execute().get_results())
+
+        search = asyncio.run(builder.execute_async())
+        assert asyncio.run(collect(search.get_results())) == expected
+
+        # 直接读取DLL状态的ResultSet同样支持异步迭代
+        assert asyncio.run(collect(builder.execute().get_results())) == expected
+
+
+def test_background_execute():
+    """async_query=True在后台线程中执行，wait_for_completion等待完成"""
+    dll = EmulatedDLL(file_count=100, latency={"Everything_QueryW": 0.1})
+    with use_backend(dll):
+        search = SearchBuilder().keywords("notes").execute(async_query=True)
+        assert not search.is_completed()
+        assert search.wait_for_completion(5000)
+        assert search.get_results().total_results >= 0
+
+
+if __name__ == "__main__":
+    test_execute_async_does_not_block_loop()
+    test_execute_async_timeout()
+    test_execute_async_timeout_can_retry()
+    test_execute_async_error()
+    test_aiter()
+    test_background_execute()
+    print("全部通过")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试批量搜索 - 结果与逐个执行相同，只调用取值变化的设置函数
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import Search, SearchBuilder, batch_search
+from everytools.constants import SortType
+from everytools.core import EmulatedDLL, use_backend
+
+def make_queries():
+    return [
+        "report",
+        SearchBuilder().keywords("photo").limit(20),
+        SearchBuilder().keywords("photo").limit(20).sort_by(SortType.SIZE_DESCENDING),
+        Search("music", match_case=True),
+        "notes",
+    ]
+
+
+def test_matches_individual_queries():
+    """每个查询的结果与单独执行相同，结果按顺序逐个返回"""
+    with use_backend(EmulatedDLL(file_count=500)):
+        expected = []
+        for query in make_queries():
+            if isinstance(query, str):
+                query = Search(query)
+            elif isinstance(query, SearchBuilder):
+                query = query._create_search()
+            expected.append([item.to_dict() for item in query.snapshot()])
+
+        batch = list(batch_search(make_queries()))
+        assert [item.index for item in batch] == list(range(5))
+        assert [[row.to_dict() for row in item.results] for item in batch] == expected
+        assert all(item.search.get_results() is item.results for item in batch)
+        assert all(item.elapsed >= item.query_time >= 0 for item in batch)
+
+
+def test_only_changed_setters():
+    """整个批次只重置一次，相同的设置不重复调用"""
+    dll = EmulatedDLL(file_count=300)
+    with use_backend(dll):
+        dll.reset_call_counts()
+        batch = list(batch_search(make_queries()))
+        assert dll.call_counts["Everything_Reset"] == 1
+        assert dll.call_counts["Everything_QueryW"] == 5
+        # 第三个查询只改变排序，第四个恢复排序并改变搜索、大小写和数量
+        assert batch[2].setter_calls == 1
+        assert batch[3].setter_calls == 4
+        setter_calls = sum(
+            count for name, count in dll.call_counts.items() if name.startswith("Everything_Set")
+        )
+        assert setter_calls == sum(item.setter_calls for item in batch)
+
+
+def test_external_query_forces_reset():
+    """两个查询之间有其他查询时重新设置全部参数"""
+    dll = EmulatedDLL(file_count=200)
+    with use_backend(dll):
+        dll.reset_call_counts()
+        results = []
+        for item in batch_search(["report", "report"]):
+            Search("photo").execute()
+            results.append([row.name for row in item.results])
+        assert results[0] == results[1]
+        assert dll.call_counts["Everything_Reset"] == 4
+
+
+if __name__ == "__main__":
+    test_matches_individual_queries()
+    test_only_changed_setters()
+    test_external_query_forces_reset()
+    print("全部通过")
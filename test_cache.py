@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试查询结果缓存 - TTL、LRU淘汰、stale-while-revalidate和统计信息
+"""
+
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import QueryCache, SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.core.cache import normalize_query
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_search_results_are_cached():
+    """相同的查询只访问一次Everything，规范化后等价的查询共享缓存"""
+    dll = EmulatedDLL(file_count=500)
+    cache = QueryCache()
+    with use_backend(dll):
+        first = SearchBuilder().keywords("Report").limit(5).with_cache(cache).execute().get_results()
+        # 之后的其他查询不会影响已缓存的结果
+        SearchBuilder().keywords("photo").execute()
+        second = SearchBuilder().keywords(" report ").limit(5).with_cache(cache).execute().get_results()
+    assert second is first
+    assert dll.call_counts["Everything_QueryW"] == 2
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_normalize_keeps_case_sensitive_parts():
+    """case:和regex:修饰的部分以及区分大小写的查询保持原有大小写"""
+    assert normalize_query("  Report   EXT:PDF ") == normalize_query("report ext:pdf")
+    assert normalize_query('"My  Report"') == '"my  report"'
+    assert normalize_query("case:Foo") != normalize_query("case:foo")
+    assert normalize_query("Bar case:<Foo|X>") == "bar case:<Foo|X>"
+    assert normalize_query('regex:"^Foo"') != normalize_query('regex:"^foo"')
+    assert normalize_query("nocase:Foo") == normalize_query("nocase:foo")
+    assert normalize_query("Foo", match_case=True) != normalize_query("foo", match_case=True)
+    assert normalize_query(" ^Foo  +", regex=True) == "^Foo  +"
+
+
+def test_ttl_expiry():
+    """过期的条目重新加载"""
+    clock = FakeClock()
+    cache = QueryCache(ttl=10, clock=clock)
+    loads = []
+    cache.get_or_load("k", lambda: loads.append(1) or "v1")
+    clock.now = 5
+    assert cache.get_or_load("k", lambda: "v2") == "v1"
+    clock.now = 11
+    assert cache.get_or_load("k", lambda: "v2") == "v2"
+    assert cache.get_or_load("short", lambda: "x", ttl=1) == "x"
+    clock.now = 12.5
+    assert cache.get_or_load("short", lambda: "y") == "y"
+    assert cache.stats.misses == 4
+
+
+def test_lru_eviction():
+    """超过条目数或行数上限时淘汰最久未使用的条目"""
+    cache = QueryCache(max_entries=2, max_rows=10)
+    cache.put("a", [1, 2, 3])
+    cache.put("b", [1, 2, 3])
+    cache.get_or_load("a", list)
+    cache.put("c", [1])
+    assert "a" in cache and "c" in cache and "b" not in cache
+    cache.put("d", list(range(9)))
+    assert "a" not in cache and len(cache) == 2
+    cache.put("huge", list(range(11)))
+    assert "huge" not in cache
+    assert cache.stats.evictions == 2
+    assert cache.stats.rows == 10
+
+
+def test_stale_while_revalidate():
+    """过期后立即返回旧结果，并在后台刷新"""
+    clock = FakeClock()
+    cache = QueryCache(ttl=10, stale_while_revalidate=True, clock=clock)
+    cache.put("k", "old")
+    clock.now = 20
+    assert cache.get_or_load("k", lambda: time.sleep(0.05) or "new") == "old"
+    deadline = time.time() + 2
+    while cache.stats.refreshes == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_load("k", lambda: "unused") == "new"
+    assert cache.stats.stale_hits == 1
+
+
+if __name__ == "__main__":
+    test_search_results_are_cached()
+    test_normalize_keeps_case_sensitive_parts()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_stale_while_revalidate()
+    print("全部通过")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试列式读取 - 列的数组类型、默认列集合、列名校验以及与FileResult的一致性
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.constants import RequestFlag
+from everytools.core import EmulatedDLL, EmulatedFile, use_backend
+from everytools.core.result import UNKNOWN_SIZE
+
+FLAGS = (
+    RequestFlag.FILE_NAME
+    | RequestFlag.PATH
+    | RequestFlag.EXTENSION
+    | RequestFlag.SIZE
+    | RequestFlag.DATE_CREATED
+    | RequestFlag.DATE_MODIFIED
+    | RequestFlag.ATTRIBUTES
+)
+
+
+def make_dll():
+    """创建包含未知大小和未知日期的模拟DLL"""
+    files = [
+        EmulatedFile("alpha.py", "C:\\src", size=300, date_modified=132000000000000000),
+        EmulatedFile("unknown.bin", "C:\\src", date_created=131000000000000000),
+        EmulatedFile("notes.txt", "D:\\docs", size=0, attributes=0x21),
+        EmulatedFile("src", "C:\\", attributes=0x10, is_folder=True),
+    ]
+    return EmulatedDLL(files=files)
+
+
+def test_column_typecodes():
+    """大小和日期列为array('Q')，属性列为array('I')，布尔列为array('B')，文本列为字符串列表"""
+    with use_backend(make_dll()):
+        results = SearchBuilder().request_flags(FLAGS).execute().get_results()
+        columns = results.to_columns(
+            ["name", "size", "date_created", "date_modified", "attributes", "run_count", "is_folder"]
+        )
+
+    assert columns["size"].typecode == "Q"
+    assert columns["date_created"].typecode == "Q"
+    assert columns["date_modified"].typecode == "Q"
+    assert columns["attributes"].typecode == "I"
+    assert columns["run_count"].typecode == "I"
+    assert columns["is_folder"].typecode == "B"
+    assert sorted(columns["name"]) == ["alpha.py", "notes.txt", "src", "unknown.bin"]
+    assert all(len(column) == 4 for column in columns.values())
+
+
+def test_default_columns():
+    """不指定列时读取请求过的所有列和is_folder，顺序与COLUMNS一致"""
+    with use_backend(make_dll()):
+        results = SearchBuilder().request_flags(FLAGS).execute().get_results()
+        columns = results.to_columns()
+        default = SearchBuilder().execute().get_results().to_columns()
+
+    assert list(columns) == [
+        "name", "path", "extension", "size", "date_created", "date_modified", "attributes", "is_folder",
+    ]
+    assert "attributes" not in default and "is_folder" in default
+
+
+def test_unknown_column():
+    """未知的列名抛出ValueError"""
+    with use_backend(make_dll()):
+        results = SearchBuilder().execute().get_results()
+        for call in (
+            lambda: results.to_columns(["name", "owner"]),
+            lambda: next(results.iter_columns(["owner"])),
+        ):
+            try:
+                call()
+            except ValueError as e:
+                assert "owner" in str(e)
+            else:
+                raise AssertionError("未知的列应抛出ValueError")
+
+
+def test_parity_with_file_results():
+    """列数据与逐行读取的FileResult一致，未知大小为UNKNOWN_SIZE"""
+    with use_backend(make_dll()):
+        results = SearchBuilder().request_flags(FLAGS).execute().get_results()
+        columns = results.to_columns(dates="datetime")
+        rows = list(results)
+
+    unknown = columns["name"].index("unknown.bin")
+    assert columns["size"][unknown] == UNKNOWN_SIZE and rows[unknown].size is None
+    assert columns["date_modified"][unknown] is None and rows[unknown].date_modified is None
+    for i, row in enumerate(rows):
+        assert columns["name"][i] == row.name
+        assert columns["path"][i] == row.path
+        assert columns["extension"][i] == row.extension
+        assert columns["size"][i] == (UNKNOWN_SIZE if row.size is None else row.size)
+        assert columns["date_created"][i] == row.date_created
+        assert columns["date_modified"][i] == row.date_modified
+        assert columns["attributes"][i] == row.attributes
+        assert bool(columns["is_folder"][i]) == row.is_folder
+
+
+if __name__ == "__main__":
+    test_column_typecodes()
+    test_default_columns()
+    test_unknown_column()
+    test_parity_with_file_results()
+    print("全部通过")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试数量与存在性查询 - 结果与完整查询一致，不读取任何行
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.constants import RequestFlag, SortType
+from everytools.core import EmulatedDLL, use_backend
+
+# 读取单行数据的DLL函数
+ROW_FUNCTIONS = ("Everything_GetResult", "Everything_Is")
+
+
+def row_calls(dll):
+    """统计逐行读取的DLL调用次数"""
+    return sum(
+        count
+        for name, count in dll.call_counts.items()
+        if name.startswith(ROW_FUNCTIONS) and name != "Everything_GetResultListRequestFlags"
+    )
+
+
+def test_count_matches_full_query():
+    """count()和count_by_kind()与完整查询的结果数量一致，没有逐行调用"""
+    dll = EmulatedDLL(file_count=1000)
+    with use_backend(dll):
+        builder = SearchBuilder().keywords("report").limit(5)
+        full = SearchBuilder().keywords("report").execute().get_results()
+        folders = sum(1 for item in full if item.is_folder)
+
+        dll.reset_call_counts()
+        assert builder.count() == len(full)
+        assert builder.count_by_kind() == {"files": len(full) - folders, "folders": folders}
+        assert row_calls(dll) == 0
+        assert dll.call_counts["Everything_SetMax"] == 2
+        assert dll._request_flags == RequestFlag.FILE_NAME
+        assert dll._max == 0
+
+
+def test_exists_and_first():
+    """exists()不读取行；first()只读取排序后的第一行"""
+    dll = EmulatedDLL(file_count=500)
+    with use_backend(dll):
+        dll.reset_call_counts()
+        assert SearchBuilder().keywords("photo").exists()
+        assert not SearchBuilder().keywords("no-such-file-anywhere").exists()
+        assert row_calls(dll) == 0
+
+        builder = SearchBuilder().keywords("photo").sort_by(SortType.SIZE_DESCENDING).select("name", "size")
+        expected = builder.execute().get_results()[0]
+        dll.reset_call_counts()
+        assert builder.first() == expected
+        assert row_calls(dll) == 2
+        assert SearchBuilder().keywords("no-such-file-anywhere").first() is None
+
+
+if __name__ == "__main__":
+    test_count_matches_full_query()
+    test_exists_and_first()
+    print("全部通过")
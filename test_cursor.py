@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试分页游标 - 按页读取的结果与一次性读取一致，页大小随耗时调整
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, ResultSnapshot, use_backend
+from everytools.query import SearchCursor
+
+
+def test_pages_match_full_query():
+    """逐页读取的结果与一次性读取的结果相同且顺序一致"""
+    dll = EmulatedDLL(file_count=2000)
+    with use_backend(dll):
+        builder = SearchBuilder().select("name", "path", "size")
+        expected = list(builder.execute().snapshot())
+        for prefetch in (True, False):
+            dll.reset_call_counts()
+            cursor = builder.cursor(page_size=300, prefetch=prefetch, adaptive=False)
+            pages = list(cursor.batches())
+            assert all(isinstance(page, ResultSnapshot) for page in pages)
+            assert [len(page) for page in pages][:-1] == [300] * (len(pages) - 1)
+            assert [row for page in pages for row in page] == expected
+            assert cursor.rows_fetched == len(expected)
+            assert dll.call_counts["Everything_QueryW"] == cursor.pages_fetched == len(pages)
+
+
+def test_offset_and_limit():
+    """offset()和limit()限定遍历范围"""
+    with use_backend(EmulatedDLL(file_count=1000)):
+        builder = SearchBuilder().select("name")
+        expected = list(builder.execute().snapshot())[50:400]
+        rows = list(builder.offset(50).limit(350).cursor(page_size=100))
+        assert rows == expected
+        assert list(builder.limit(0).cursor()) == []
+        try:
+            builder.cursor(page_size=0)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当抛出ValueError")
+
+
+def test_adaptive_page_size():
+    """页读取快时页大小翻倍增长，不超过上限；慢时缩小到下限"""
+    pages = []
+
+    def fetch_page(offset, count):
+        pages.append(count)
+        return SearchBuilder().select("name").offset(offset).limit(count).execute().snapshot()
+
+    with use_backend(EmulatedDLL(file_count=3000)):
+        cursor = SearchCursor(fetch_page, page_size=100, target_latency=10.0, max_page_size=800)
+        assert sum(len(page) for page in cursor.batches()) == 3000
+        assert pages[:4] == [100, 200, 400, 800]
+        assert max(pages) == 800
+
+    with use_backend(EmulatedDLL(file_count=500, latency={"Everything_QueryW": 0.02})):
+        cursor = SearchBuilder().select("name").cursor(
+            page_size=400, target_latency=0.001, min_page_size=50
+        )
+        next(cursor.batches())
+        assert cursor.page_size == 50
+
+
+if __name__ == "__main__":
+    test_pages_match_full_query()
+    test_offset_and_limit()
+    test_adaptive_page_size()
+    print("全部通过")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试Everything DLL模拟器 - 无需Windows即可运行
+"""
+
+import ctypes
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import EveryTools, Search, SearchBuilder, FileFilter, SortType
+from everytools.constants import ErrorCode, RequestFlag
+from everytools.core import EmulatedDLL, EmulatedFile, get_api, use_backend
+from everytools.exceptions import IPCError
+
+
+def make_dll(**kwargs):
+    """创建带固定文件表的模拟DLL"""
+    files = [
+        EmulatedFile("alpha.py", "C:\\src", size=300, date_modified=132000000000000000),
+        EmulatedFile("beta.py", "C:\\src", size=100, date_modified=133000000000000000),
+        EmulatedFile("notes.txt", "D:\\docs", size=200, date_modified=131000000000000000),
+        EmulatedFile("src", "C:\\", attributes=0x10, is_folder=True),
+    ]
+    return EmulatedDLL(files=files, **kwargs)
+
+
+def test_search_builder():
+    """SearchBuilder和ResultSet在模拟器上原样运行"""
+    with use_backend(make_dll()):
+        search = (
+            SearchBuilder()
+            .filter(FileFilter().with_extensions("py"))
+            .sort_by(SortType.SIZE_DESCENDING)
+            .execute()
+        )
+        results = search.get_results()
+        assert len(results) == 2
+        assert [r.name for r in results] == ["alpha.py", "beta.py"]
+        assert [r.size for r in results] == [300, 100]
+        assert results.total_files == 2
+
+
+def test_request_flags_are_honoured():
+    """未请求的字段返回空值并设置INVALIDREQUEST"""
+    dll = make_dll()
+    with use_backend(dll):
+        search = Search("notes", request_flags=RequestFlag.FILE_NAME)
+        search.execute()
+        assert dll.Everything_GetResultFileNameW(0) == "notes.txt"
+        assert dll.Everything_GetResultPathW(0) is None
+        assert dll.Everything_GetLastError() == ErrorCode.EVERYTHING_ERROR_INVALIDREQUEST
+
+
+def test_out_parameters():
+    """日期和大小支持c_ulonglong和ctypes.byref两种传参方式"""
+    with use_backend(make_dll()):
+        api = get_api()
+        api.set_search("beta")
+        api.set_request_flags(RequestFlag.FILE_NAME | RequestFlag.SIZE)
+        api.query()
+        assert api.get_result_size(0) == 100
+        buffer = ctypes.c_ulonglong(0)
+        api._dll.Everything_GetResultSize(0, buffer)
+        assert buffer.value == 100
+
+
+def test_legacy_everytools():
+    """传统EveryTools接口同样可以使用模拟器"""
+    with use_backend(make_dll()):
+        et = EveryTools()
+        et.search_ext("py")
+        assert et.get_num_total_results() == 2
+        names = sorted(item["name"] for item in et.results())
+        assert names == ["alpha.py", "beta.py"]
+
+
+def test_legacy_single_query():
+    """传统接口的search和results只执行一次查询"""
+    dll = make_dll()
+    with use_backend(dll):
+        et = EveryTools()
+        et.search("py", sort_type=SortType.SIZE_ASCENDING, max_num=1)
+        rows = list(et.results(max_num=1, as_tuple=True))
+        assert [row[0] for row in rows] == ["beta.py"]
+        assert et.get_num_total_results() == 1
+        assert et.get_num_matched_results() == 2
+        assert dll.call_counts["Everything_QueryW"] == 1
+
+
+def test_legacy_results_requery():
+    """results()需要的数量超过search()时读取的数量时重新查询"""
+    dll = make_dll()
+    with use_backend(dll):
+        et = EveryTools()
+        et.search("py", sort_type=SortType.SIZE_ASCENDING, max_num=1)
+        rows = list(et.results())
+        assert [row["name"] for row in rows] == ["beta.py", "alpha.py"]
+        assert et.get_num_total_results() == 2
+        assert dll.call_counts["Everything_QueryW"] == 2
+
+
+def test_error_injection():
+    """注入的错误码按SDK规则抛出异常"""
+    dll = make_dll()
+    dll.inject_error(ErrorCode.EVERYTHING_ERROR_IPC)
+    with use_backend(dll):
+        try:
+            Search("alpha").execute()
+        except IPCError:
+            pass
+        else:
+            raise AssertionError("应当抛出IPCError")
+        # 只注入一次，第二次查询成功
+        Search("alpha").execute()
+
+
+def test_latency_and_call_counts():
+    """调用计数可用于统计每行的FFI调用次数"""
+    dll = make_dll(latency={"Everything_QueryW": 0.001})
+    with use_backend(dll):
+        Search("alpha").execute()
+        assert dll.call_counts["Everything_QueryW"] == 1
+
+
+def test_select_projection():
+    """select只读取投影字段，名称+路径每行2次DLL调用"""
+    dll = make_dll()
+    with use_backend(dll):
+        results = SearchBuilder().keywords("py").select("name", "path").execute().get_results()
+        dll.reset_call_counts()
+        rows = list(results)
+        assert rows == [("alpha.py", "C:\\src"), ("beta.py", "C:\\src")]
+        assert rows[0].name == "alpha.py"
+        assert sum(dll.call_counts.values()) == 2 * len(rows)
+
+
+def test_limit_and_offset_are_sent_to_everything():
+    """limit和offset通过Everything_SetMax/Everything_SetOffset发送，结果列表只包含该页"""
+    dll = EmulatedDLL(file_count=200)
+    with use_backend(dll):
+        dll.reset_call_counts()
+        search = SearchBuilder().sort_by(SortType.NAME_ASCENDING).offset(10).limit(5).execute()
+        assert dll.call_counts["Everything_SetMax"] == 1
+        assert dll.call_counts["Everything_SetOffset"] == 1
+        # DLL中的结果数量已是限制后的数量，没有在客户端切片
+        assert dll.Everything_GetNumResults() == 5
+        assert dll.Everything_GetTotResults() == 200
+        names = [row.name for row in search.get_results()]
+        assert dll.call_counts["Everything_GetResultFileNameW"] == 5
+
+        everything = [row.name for row in SearchBuilder().sort_by(SortType.NAME_ASCENDING).execute().get_results()]
+        assert names == everything[10:15]
+
+
+def test_offset_follows_sort():
+    """offset按指定的排序跳过结果"""
+    with use_backend(make_dll()):
+        search = SearchBuilder().keywords("py").sort_by(SortType.SIZE_DESCENDING).offset(1).execute()
+        assert [row.name for row in search.get_results()] == ["beta.py"]
+        search = SearchBuilder().keywords("py").sort_by(SortType.SIZE_ASCENDING).offset(1).execute()
+        assert [row.name for row in search.get_results()] == ["alpha.py"]
+
+
+def test_top_k():
+    """top_k返回完整排序结果的前n个"""
+    dll = EmulatedDLL(file_count=300)
+    with use_backend(dll):
+        sort_type = SortType.SIZE_DESCENDING
+        full = [row.name for row in SearchBuilder().sort_by(sort_type).execute().get_results()]
+        dll.reset_call_counts()
+        top = [row.name for row in SearchBuilder().top_k(7, sort_type).execute().get_results()]
+        assert top == full[:7]
+        assert dll.call_counts["Everything_SetMax"] == 1
+        assert dll.call_counts["Everything_GetResultFileNameW"] == 7
+
+
+def test_negative_limit_and_offset():
+    """负数的limit、offset和top_k抛出ValueError"""
+    for call in (
+        lambda: SearchBuilder().limit(-1),
+        lambda: SearchBuilder().offset(-1),
+        lambda: SearchBuilder().top_k(-1, SortType.SIZE_DESCENDING),
+        lambda: Search("a", max_results=-1),
+        lambda: Search("a", offset=-1),
+    ):
+        try:
+            with use_backend(make_dll()):
+                call()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("负数参数应抛出ValueError")
+
+
+def test_generated_table_is_reproducible():
+    """相同种子生成相同的文件表"""
+    assert EmulatedDLL(file_count=50, seed=7).files == EmulatedDLL(file_count=50, seed=7).files
+
+
+if __name__ == "__main__":
+    test_search_builder()
+    test_request_flags_are_honoured()
+    test_out_parameters()
+    test_legacy_everytools()
+    test_legacy_single_query()
+    test_legacy_results_requery()
+    test_error_injection()
+    test_latency_and_call_counts()
+    test_select_projection()
+    test_limit_and_offset_are_sent_to_everything()
+    test_offset_follows_sort()
+    test_top_k()
+    test_negative_limit_and_offset()
+    test_generated_table_is_reproducible()
+    print("全部通过")
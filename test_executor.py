@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试线程安全的查询执行器 - 使用模拟DLL在高并发下运行
+"""
+
+import sys
+import threading
+
+sys.path.insert(0, ".")
+
+from everytools import QueryExecutor, SearchBuilder
+from everytools.constants import ErrorCode
+from everytools.core import EmulatedDLL, use_backend
+from everytools.core.dll_loader import DLLLoader
+from everytools.exceptions import IPCError, StaleResultError
+
+KEYWORDS = ["report", "invoice", "photo", "notes", "config", "draft", "music", "build"]
+
+
+def run_threads(count, target):
+    """启动count个线程执行target(i)并等待结束，返回各线程的结果"""
+    results = [None] * count
+    errors = []
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target(i)
+        except BaseException as e:  # noqa: B902
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_serialized_queries_under_contention():
+    """不同查询并发执行时互不干扰"""
+    # 每次设置参数都让出CPU，放大交错的机会
+    dll = EmulatedDLL(file_count=3000, latency=0.00005)
+    with use_backend(dll):
+        expected = {
+            kw: [r.name for r in SearchBuilder().keywords(kw).limit(20).execute().get_results()]
+            for kw in KEYWORDS
+        }
+        executor = QueryExecutor()
+
+        def query(i):
+            kw = KEYWORDS[i % len(KEYWORDS)]
+            names = [
+                r.name
+                for r in SearchBuilder()
+                .keywords(kw)
+                .limit(20)
+                .with_executor(executor)
+                .execute()
+                .get_results()
+            ]
+            return kw, names
+
+        results, errors = run_threads(32, query)
+        assert not errors
+        for kw, names in results:
+            assert names == expected[kw]
+
+
+def test_executors_share_backend_lock():
+    """多个执行器（包括不同的DLLLoader）使用同一后端时共用会话锁，并发查询互不干扰"""
+    dll = EmulatedDLL(file_count=3000, latency=0.00005)
+    with use_backend(dll):
+        expected = {
+            kw: [r.name for r in SearchBuilder().keywords(kw).limit(20).execute().get_results()]
+            for kw in KEYWORDS
+        }
+        executors = [QueryExecutor(), QueryExecutor(), QueryExecutor(DLLLoader(backend=dll))]
+
+        def query(i):
+            kw = KEYWORDS[i % len(KEYWORDS)]
+            search = SearchBuilder().keywords(kw).limit(20).with_executor(executors[i % len(executors)])
+            return kw, [r.name for r in search.execute().get_results()]
+
+        for _ in range(3):
+            results, errors = run_threads(24, query)
+            assert not errors
+            for kw, names in results:
+                assert names == expected[kw]
+
+
+def test_plain_results_never_mix():
+    """不使用执行器的并发搜索读取延迟结果集时，要么得到本查询的行，要么抛出StaleResultError"""
+    dll = EmulatedDLL(file_count=3000, latency=0.00005)
+    with use_backend(dll):
+        expected = {
+            kw: [r.name for r in SearchBuilder().keywords(kw).limit(20).execute().get_results()]
+            for kw in KEYWORDS
+        }
+
+        def query(i):
+            kw = KEYWORDS[i % len(KEYWORDS)]
+            results = SearchBuilder().keywords(kw).limit(20).execute().get_results()
+            try:
+                return kw, [r.name for r in results]
+            except StaleResultError:
+                return kw, None
+
+        results, errors = run_threads(24, query)
+        assert not errors
+        for kw, names in results:
+            assert names is None or names == expected[kw]
+
+
+def test_identical_queries_are_coalesced():
+    """相同的并发查询共享一次执行和同一份结果"""
+    dll = EmulatedDLL(file_count=1000, latency={"Everything_QueryW": 0.1})
+    with use_backend(dll):
+        executor = QueryExecutor()
+
+        def query(i):
+            return SearchBuilder().keywords("report").with_executor(executor).execute().get_results()
+
+        results, errors = run_threads(16, query)
+        assert not errors
+        assert executor.executed + executor.coalesced == 16
+        assert executor.executed < 16
+        assert len({id(r) for r in results}) == executor.executed
+        assert dll.call_counts["Everything_QueryW"] == executor.executed
+
+
+def test_errors_are_shared_with_waiters():
+    """合并的调用同样收到执行中的错误"""
+    dll = EmulatedDLL(file_count=100, latency={"Everything_QueryW": 0.1})
+    dll.inject_error(ErrorCode.EVERYTHING_ERROR_IPC, times=None)
+    with use_backend(dll):
+        executor = QueryExecutor()
+
+        def query(i):
+            return SearchBuilder().keywords("data").with_executor(executor).execute()
+
+        results, errors = run_threads(8, query)
+        assert len(errors) == 8
+        assert all(isinstance(e, IPCError) for e in errors)
+
+
+if __name__ == "__main__":
+    test_serialized_queries_under_contention()
+    test_executors_share_backend_lock()
+    test_plain_results_never_mix()
+    test_identical_queries_are_coalesced()
+    test_errors_are_shared_with_waiters()
+    print("全部通过")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试流式导出 - CSV、JSON Lines和Parquet的内容与逐行读取一致，支持压缩
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.core.export import detect_format
+from everytools.utils.time_utils import FiletimeDecoder, filetimes_to_iso, max_valid_filetime
+
+
+def test_iso_matches_decoder():
+    """整数运算得到的ISO字符串与FiletimeDecoder("iso")相同"""
+    rng = random.Random(3)
+    ticks = [rng.randrange(116444736000000001, max_valid_filetime()) for _ in range(2000)]
+    ticks += [0, 0xFFFFFFFFFFFFFFFF, 132000000000000000]
+    assert filetimes_to_iso(ticks) == FiletimeDecoder("iso").decode_many(ticks)
+
+
+def test_csv_and_jsonl():
+    """分块写出的CSV和JSON Lines与逐行读取的结果一致"""
+    with use_backend(EmulatedDLL(file_count=300)):
+        results = SearchBuilder().select("name", "size", "date_modified").date_mode("iso").execute().get_results()
+        expected = [(row.name, row.size, row.date_modified) for row in results]
+
+        text = io.StringIO()
+        assert results.export(text, format="csv", chunk_size=70) == len(expected)
+        rows = list(csv.reader(io.StringIO(text.getvalue())))
+        assert rows[0] == ["name", "size", "date_modified", "is_folder"]
+        assert [(name, int(size) if size else None, date or None) for name, size, date, _ in rows[1:]] == expected
+
+        binary = io.BytesIO()
+        results.export(binary, format="jsonl", compression="gzip", chunk_size=70)
+        lines = gzip.decompress(binary.getvalue()).decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [(r["name"], r["size"], r["date_modified"]) for r in records] == expected
+        assert all(isinstance(r["is_folder"], bool) for r in records)
+
+
+def test_snapshot_and_path_detection():
+    """快照导出与结果集导出相同；根据扩展名判断格式和压缩"""
+    assert detect_format("files.csv.gz") == ("csv", "gzip")
+    assert detect_format("files.parquet") == ("parquet", None)
+    with use_backend(EmulatedDLL(file_count=120)):
+        search = SearchBuilder().select("name", "path", "date_created").execute()
+        results = search.get_results()
+        columns = ["name", "path", "date_created"]
+        from_results = io.BytesIO()
+        results.export(from_results, format="jsonl", columns=columns, dates="epoch")
+        from_snapshot = io.BytesIO()
+        search.snapshot().export(from_snapshot, format="jsonl", columns=columns, dates="epoch")
+        assert from_results.getvalue() == from_snapshot.getvalue()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "files.csv.gz")
+            assert results.export(path) == len(results)
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+                assert len(list(csv.reader(f))) == len(results) + 1
+    try:
+        results.export(io.BytesIO())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应当抛出ValueError")
+
+
+def test_parquet():
+    """pyarrow可用时写出Parquet，内容与to_arrow()相同"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return
+    with use_backend(EmulatedDLL(file_count=250)):
+        results = SearchBuilder().execute().get_results()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "files.parquet")
+            assert results.export(path, compression="zstd", chunk_size=100) == len(results)
+            table = pq.read_table(path)
+            assert table.to_pylist() == results.to_arrow().to_pylist()
+            assert pq.ParquetFile(path).num_row_groups == 3
+
+        empty = SearchBuilder().keywords("no-such-file-anywhere").execute().get_results()
+        buffer = io.BytesIO()
+        assert empty.export(buffer, format="parquet") == 0
+        assert pq.read_table(io.BytesIO(buffer.getvalue())).num_rows == 0
+
+
+if __name__ == "__main__":
+    test_iso_matches_decoder()
+    test_csv_and_jsonl()
+    test_snapshot_and_path_detection()
+    test_parquet()
+    print("全部通过")
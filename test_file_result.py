@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试FileResult - 使用__slots__保存字段，派生字段、序列化和比较的行为不变
+"""
+
+import copy
+import os
+import pickle
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.constants import RequestFlag
+from everytools.core import EmulatedDLL, use_backend
+from everytools.core.result import FileResult
+
+
+def make_result(**kwargs):
+    """创建字段齐全的FileResult"""
+    values = dict(
+        name="report.final.pdf",
+        path="C:\\docs",
+        size=2048,
+        date_modified="2024-01-02 03:04:05",
+        attributes=0x20,
+        run_count=3,
+    )
+    values.update(kwargs)
+    return FileResult(**values)
+
+
+def test_no_instance_dict():
+    """FileResult没有__dict__，不能添加字段以外的属性"""
+    result = make_result()
+    assert not hasattr(result, "__dict__")
+    try:
+        result.owner = "admin"
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("应当不能添加新属性")
+
+
+def test_derived_fields():
+    """full_path、extension和类型标志与之前在构造函数中计算的值一致"""
+    result = make_result()
+    assert result.full_path == os.path.join("C:\\docs", "report.final.pdf")
+    assert result.extension == "pdf"
+    assert result.is_file and not result.is_folder and not result.is_volume
+
+    folder = FileResult("src", "C:\\", is_file=False, is_folder=True)
+    assert folder.extension == "" and folder.is_folder and not folder.is_file
+    assert FileResult("Makefile", "C:\\src").extension == ""
+    assert FileResult("name", "").full_path is None
+
+    # 显式传入或赋值的值优先于派生值
+    explicit = make_result(full_path="D:\\link.pdf", extension="PDF")
+    assert explicit.full_path == "D:\\link.pdf" and explicit.extension == "PDF"
+    explicit.full_path = None
+    explicit.extension = None
+    assert explicit.full_path == result.full_path and explicit.extension == "pdf"
+    explicit.is_volume = True
+    explicit.is_file = False
+    assert explicit.is_volume and not explicit.is_file and explicit.extension == ""
+
+    assert result.to_dict() == {
+        "name": "report.final.pdf",
+        "path": "C:\\docs",
+        "full_path": os.path.join("C:\\docs", "report.final.pdf"),
+        "size": 2048,
+        "date_created": None,
+        "date_modified": "2024-01-02 03:04:05",
+        "date_accessed": None,
+        "date_run": None,
+        "extension": "pdf",
+        "attributes": 0x20,
+        "is_file": True,
+        "is_folder": False,
+        "is_volume": False,
+        "run_count": 3,
+        "highlighted_name": None,
+        "highlighted_path": None,
+    }
+
+
+def test_derived_fields_match_everything():
+    """未请求扩展名时由文件名得出的扩展名与Everything返回的一致"""
+    dll = EmulatedDLL(file_count=300)
+    with use_backend(dll):
+        flags = RequestFlag.FILE_NAME | RequestFlag.PATH
+        derived = list(SearchBuilder().request_flags(flags).execute().get_results())
+        fetched = list(
+            SearchBuilder().request_flags(flags | RequestFlag.EXTENSION).execute().get_results()
+        )
+    expected = {(f.path, f.name): f.extension for f in dll.files}
+    for a, b in zip(derived, fetched):
+        assert a.full_path == b.full_path == os.path.join(a.path, a.name)
+        assert a.extension == b.extension == expected[(a.path, a.name)]
+
+
+def test_pickle_copy_and_equality():
+    """pickle、copy和deepcopy保留全部字段；比较和哈希仍按对象身份"""
+    result = make_result(highlighted_name="*report*.pdf", is_file=False, is_folder=True)
+    result.full_path = "C:\\docs\\renamed"
+    for clone in (
+        pickle.loads(pickle.dumps(result)),
+        copy.copy(result),
+        copy.deepcopy(result),
+    ):
+        assert type(clone) is FileResult
+        assert clone.to_dict() == result.to_dict()
+        assert clone is not result and clone != result
+    assert result == result
+    assert len({result, result, copy.copy(result)}) == 2
+
+
+if __name__ == "__main__":
+    test_no_instance_dict()
+    test_derived_fields()
+    test_derived_fields_match_everything()
+    test_pickle_copy_and_equality()
+    print("全部通过")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试延迟读取行 - 只在读取属性时调用DLL，查询替换后检测失效
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import QueryExecutor, Search, SearchBuilder
+from everytools.core import EmulatedDLL, FileResult, use_backend
+from everytools.core.dll_loader import DLLLoader
+from everytools.exceptions import StaleResultError
+
+
+def test_attributes_fetched_on_demand():
+    """只读取name和full_path时每行两次DLL调用"""
+    dll = EmulatedDLL(file_count=200)
+    with use_backend(dll):
+        results = SearchBuilder().keywords("report").execute().get_results()
+        dll.reset_call_counts()
+        rows = [(row.name, row.full_path) for row in results.iter_lazy()]
+        assert sum(dll.call_counts.values()) == 2 * len(rows)
+        assert rows == [(item.name, item.full_path) for item in results]
+
+
+def test_lazy_matches_eager():
+    """materialize()得到与立即读取相同的FileResult"""
+    with use_backend(EmulatedDLL(file_count=200)):
+        results = SearchBuilder().keywords("photo").execute().get_results()
+        eager = [item.to_dict() for item in results]
+        lazy = [row.materialize() for row in results.iter_lazy()]
+        assert all(isinstance(item, FileResult) for item in lazy)
+        assert [item.to_dict() for item in lazy] == eager
+        row = next(results.iter_lazy())
+        assert row.extension == eager[0]["extension"]
+        assert row.date_accessed is None  # 未请求的字段
+
+
+def test_flyweight_and_staleness():
+    """享元迭代复用同一个对象；查询替换后读取未缓存的属性抛出StaleResultError"""
+    with use_backend(EmulatedDLL(file_count=200)):
+        search = Search("notes")
+        search.execute()
+        results = search.get_results()
+        rows = list(results.iter_lazy(flyweight=True))
+        assert len({id(row) for row in rows}) == 1
+
+        first = next(results.iter_lazy())
+        name = first.name
+        kept = next(results.iter_lazy()).materialize()
+
+        Search("music").execute()
+        assert results.is_stale
+        assert first.name == name  # 已缓存的值仍然可用
+        try:
+            first.size
+        except StaleResultError:
+            pass
+        else:
+            raise AssertionError("应当抛出StaleResultError")
+        assert kept.name == name and kept.size is not None
+
+
+def test_staleness_per_backend():
+    """查询代数按后端记录：其他后端的查询不会使本后端的结果集失效"""
+    other = QueryExecutor(DLLLoader(backend=EmulatedDLL(file_count=100)))
+    with use_backend(EmulatedDLL(file_count=200)):
+        results = SearchBuilder().keywords("notes").execute().get_results()
+        row = next(results.iter_lazy())
+        SearchBuilder().keywords("music").with_executor(other).execute()
+        assert not results.is_stale
+        assert row.size == results[0].size
+        Search("music").execute()
+        assert results.is_stale
+        try:
+            row.date_modified
+        except StaleResultError:
+            pass
+        else:
+            raise AssertionError("应当抛出StaleResultError")
+
+
+if __name__ == "__main__":
+    test_attributes_fetched_on_demand()
+    test_lazy_matches_eager()
+    test_flyweight_and_staleness()
+    test_staleness_per_backend()
+    print("全部通过")
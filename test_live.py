@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试边输入边搜索 - 去抖、丢弃被取代的查询、只读取第一页、在上一次的结果中本地筛选细化的输入
+"""
+
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.query.live import extends_query
+
+
+def fresh(builder, text, page_size):
+    """直接查询得到的第一页"""
+    snapshot = builder.keywords(text).limit(page_size).execute().snapshot()
+    return snapshot.to_list(), snapshot.total_files, snapshot.total_folders
+
+
+def test_extends_query():
+    """只有新文本的结果一定包含在上一次的结果中时才是细化"""
+    assert extends_query("rep", "repo")
+    assert extends_query("Rep", "xREPORT")
+    assert extends_query("rep", "rep ext:py")
+    assert extends_query("rep ext:py", "ext:py report")
+    assert extends_query("", "anything")
+    assert not extends_query("Rep", "report", match_case=True)
+    assert not extends_query("rep", "rep|x")
+    assert not extends_query("*.p", "*.py")
+    assert not extends_query("ext:p", "ext:py")
+    assert not extends_query("rep !x", "rep !xy")
+    assert not extends_query("foo", "foo\\")
+    assert not extends_query("repo", "rep")
+
+
+def test_debounce():
+    """连续输入只查询停顿后的最新文本，且只读取第一页"""
+    dll = EmulatedDLL(file_count=3000)
+    with use_backend(dll):
+        with SearchBuilder().live(debounce=0.05, page_size=10) as live:
+            for text in ["d", "da", "dat", "data"]:
+                live.update(text)
+            result = live.wait(5)
+        assert live.stats.updates == 4 and live.stats.queries == 1
+        assert dll.call_counts["Everything_QueryW"] == 1
+        assert dll.call_counts["Everything_SetMax"] == 1
+        assert result.text == "data" and result.generation == 4
+        assert len(result.results) == 10 and result.total > 10 and not result.complete
+        assert result.results.to_list() == fresh(SearchBuilder(), "data", 10)[0]
+
+
+def test_superseded_query_discarded():
+    """执行中被取代的查询不读取结果，也不发布"""
+    dll = EmulatedDLL(file_count=2000, latency={"Everything_QueryW": 0.1})
+    published = []
+    with use_backend(dll):
+        with SearchBuilder().live(on_results=published.append, debounce=0, page_size=20) as live:
+            live.update("report")
+            time.sleep(0.03)
+            live.update("photo")
+            result = live.wait(5)
+        assert result.text == "photo"
+        assert [item.text for item in published] == ["photo"]
+        assert live.stats.discarded == 1 and live.stats.queries == 2
+        # 被取代的查询只执行了Everything_QueryW，没有逐行读取
+        assert dll.call_counts["Everything_GetResultFileNameW"] == len(result.results)
+
+
+def test_prefix_reuse():
+    """细化的输入在上一次的结果中本地筛选，结果与重新查询相同"""
+    dll = EmulatedDLL(file_count=3000)
+    with use_backend(dll):
+        template = SearchBuilder().keywords("!ext:log")
+        with template.live(debounce=0, page_size=1000) as live:
+            typed = ["rep", "repo", "report", "report ext:pdf", "report ext:pdf 1"]
+            results = [live.search(text, timeout=5) for text in typed]
+        assert results[0].complete and not results[0].reused
+        assert all(item.reused for item in results[1:])
+        assert live.stats.queries == 1
+        assert dll.call_counts["Everything_QueryW"] == 1
+        for text, result in zip(typed, results):
+            rows, files, folders = fresh(SearchBuilder().keywords("!ext:log"), text, 1000)
+            assert result.results.to_list() == rows, text
+            assert (result.results.total_files, result.results.total_folders) == (files, folders)
+
+
+def test_requery_when_incomplete():
+    """上一次只读取了部分结果、或新文本不是细化时重新查询"""
+    dll = EmulatedDLL(file_count=3000)
+    with use_backend(dll):
+        with SearchBuilder().live(debounce=0, page_size=5) as live:
+            live.search("data", timeout=5)
+            live.search("data_1", timeout=5)
+            result = live.search("dat", timeout=5)
+        assert live.stats.queries == 3 and live.stats.reused == 0
+        assert not result.reused
+
+
+def test_empty_and_errors():
+    """空输入不查询；参数无效时抛出ValueError，关闭后不能再输入"""
+    dll = EmulatedDLL(file_count=100)
+    with use_backend(dll):
+        live = SearchBuilder().live(debounce=0)
+        result = live.search("   ", timeout=5)
+        assert len(result.results) == 0 and result.total == 0
+        assert dll.call_counts["Everything_QueryW"] == 0
+        live.close()
+        try:
+            live.update("x")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("应当抛出RuntimeError")
+    for options in ({"debounce": -1}, {"page_size": 0}):
+        try:
+            SearchBuilder().live(**options)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当抛出ValueError")
+
+
+def test_latency_stays_flat():
+    """逐字输入时，结果全部读取后的输入不再访问Everything"""
+    dll = EmulatedDLL(file_count=20000, latency={"Everything_QueryW": 0.02})
+    with use_backend(dll):
+        with SearchBuilder().live(debounce=0, page_size=1000) as live:
+            text = "report_archive"
+            results = [live.search(text[: i + 1], timeout=5) for i in range(len(text))]
+        # 第一次全部读取之后的输入都在本地筛选
+        first = next(i for i, item in enumerate(results) if item.complete)
+        assert first < 4 and all(item.reused for item in results[first + 1:])
+        reused = [item.latency for item in results if item.reused]
+        assert dll.call_counts["Everything_QueryW"] == len(results) - len(reused)
+        assert max(reused) < 0.02
+
+
+if __name__ == "__main__":
+    test_extends_query()
+    test_debounce()
+    test_superseded_query_discarded()
+    test_prefix_reuse()
+    test_requery_when_incomplete()
+    test_empty_and_errors()
+    test_latency_stays_flat()
+    print("全部通过")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试多查询合并 - 合并执行的结果与逐个执行相同，兼容的查询只执行一次
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import DocumentFilter, MediaFilter, SearchBuilder, multiplex_search
+from everytools.constants import SortType
+from everytools.core import EmulatedDLL, use_backend
+from everytools.query import plan_queries
+from everytools.query.multiplex import local_request_flags
+from everytools.query.search import to_search
+
+
+def category_queries():
+    return [
+        SearchBuilder().filter(MediaFilter("audio")),
+        SearchBuilder().filter(MediaFilter("video")),
+        SearchBuilder().filter(DocumentFilter("pdf")),
+        SearchBuilder().keywords("report", "size:>4kb").select("name", "size"),
+        "C:\\ <ext:jpg|ext:png>",
+    ]
+
+
+def test_plan():
+    """匹配选项相同的查询合并；有数量限制、正则或无法本地求值的查询单独执行"""
+    queries = category_queries() + [
+        SearchBuilder().keywords("photo").limit(10),
+        SearchBuilder().keywords("notes").sort_by(SortType.SIZE_DESCENDING),
+        "content:invoice",
+        SearchBuilder().keywords("music").sort_by(SortType.SIZE_DESCENDING),
+    ]
+    with use_backend(EmulatedDLL(file_count=10)):
+        assert plan_queries(queries) == [(0, 1, 2, 3, 4), (5,), (6, 8), (7,)]
+    assert local_request_flags("D:\\archive\\ file:size:>1mb") is not None
+    assert local_request_flags("dupe: ext:mp3") is None
+
+
+def test_results_match_individual_queries():
+    """每个查询得到的结果与单独执行相同，合并组只执行一次查询"""
+    dll = EmulatedDLL(file_count=2000)
+    with use_backend(dll):
+        queries = category_queries()
+        expected = []
+        for query in queries:
+            snapshot = to_search(query).snapshot()
+            expected.append((snapshot.columns, snapshot.to_list(), snapshot.total_folders))
+
+        dll.reset_call_counts()
+        results = multiplex_search(queries)
+        assert dll.call_counts["Everything_QueryW"] == 1
+        for snapshot, (columns, rows, folders) in zip(results, expected):
+            assert snapshot.columns == columns
+            assert snapshot.to_list() == rows
+            assert snapshot.total_results == len(rows)
+            assert snapshot.total_folders == folders
+        assert all(len(snapshot) for snapshot in results)
+
+
+if __name__ == "__main__":
+    test_plan()
+    test_results_match_individual_queries()
+    print("全部通过")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试过滤条件优化 - 查询字符串稳定，同类条件取交集，矛盾的条件不访问Everything
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.query import optimize_filters
+from everytools.query.filters import DateFilter, FileFilter, FolderFilter, SizeFilter
+
+
+def test_single_filters_unchanged():
+    """单个过滤器的查询字符串保持不变"""
+    filters = [
+        SizeFilter().larger_than(1048576),
+        SizeFilter().smaller_than(4096),
+        SizeFilter().between(10, 20),
+        FileFilter().with_extensions("py", "md"),
+        DateFilter().by_created_date().after("2024-01-01"),
+        DateFilter().by_modified_date().in_range("2024-01-01", "2024-02-01"),
+        DateFilter.today(),
+        FolderFilter().empty_only(),
+    ]
+    for item in filters:
+        assert optimize_filters([item]).to_query_string() == item.to_query_string()
+
+
+def test_deterministic_order():
+    """添加顺序不同、包含重复条件的过滤器得到相同的查询字符串"""
+    a = FileFilter().with_extensions("png", "jpg")
+    b = FileFilter().with_extensions("jpg", "png").with_content("invoice")
+    c = DateFilter.today()
+    first = SearchBuilder().keywords("photo").filter(a, b, c, c).build_query_string()
+    second = SearchBuilder().keywords("photo").filter(c, b, a).build_query_string()
+    assert first == second == 'photo ext:jpg;png content:"invoice" today'
+
+
+def test_intersection():
+    """扩展名、大小和日期范围分别取交集"""
+    optimized = optimize_filters([
+        FileFilter().with_extensions("jpg", "png"),
+        FileFilter().with_extensions("PNG", "gif").with_size_range(max_size=500),
+        SizeFilter().larger_than(100),
+        DateFilter().by_modified_date().after("2024-01-01"),
+        DateFilter().by_modified_date().before("2024-03-01"),
+        DateFilter().by_created_date().before("2024-03-01"),
+    ])
+    assert optimized.satisfiable
+    assert optimized.terms == (
+        "ext:png",
+        "size:101..499",
+        "dc:<2024-03-01",
+        "dm:2024-01-02..2024-02-29",
+    )
+
+
+def test_empty_date_filter():
+    """未设置日期的DateFilter不产生条件"""
+    assert optimize_filters([DateFilter()]).terms == ()
+    assert optimize_filters([DateFilter().by_created_date()]).terms == ()
+    assert SearchBuilder().keywords("a").filter(DateFilter()).build_query_string() == "a"
+    optimized = optimize_filters([
+        DateFilter().by_modified_date(),
+        DateFilter().by_modified_date().after("2024-01-01"),
+    ])
+    assert optimized.satisfiable and optimized.terms == ("dm:>2024-01-01",)
+
+
+def test_contradiction_skips_query():
+    """矛盾的条件直接返回空结果，不调用Everything_QueryW"""
+    dll = EmulatedDLL(file_count=500)
+    with use_backend(dll):
+        builders = [
+            SearchBuilder().filter(FileFilter().with_extensions("jpg"), FileFilter().with_extensions("png")),
+            SearchBuilder().filter(SizeFilter().larger_than(4096), SizeFilter().smaller_than(1024)),
+            SearchBuilder().filter(
+                DateFilter().by_modified_date().after("2024-05-01"),
+                DateFilter().by_modified_date().before("2024-03-01"),
+            ),
+        ]
+        dll.reset_call_counts()
+        for builder in builders:
+            assert not builder.is_satisfiable()
+            results = builder.select("name", "size").execute().get_results()
+            assert len(results) == 0 and results.columns == ("name", "size")
+            assert builder.count() == 0
+            assert builder.count_by_kind() == {"files": 0, "folders": 0}
+            assert not builder.exists()
+            assert builder.first() is None
+            assert list(builder.cursor(page_size=10)) == []
+        assert dll.call_counts.get("Everything_QueryW", 0) == 0
+
+        assert SearchBuilder().filter(FileFilter().with_extensions("jpg")).is_satisfiable()
+
+
+if __name__ == "__main__":
+    test_single_filters_unchanged()
+    test_deterministic_order()
+    test_intersection()
+    test_empty_date_filter()
+    test_contradiction_skips_query()
+    print("全部通过")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试查询语法解析和本地求值 - 与Everything对同一文件表的应答一致，逐行和按列求值结果相同
+"""
+
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import SearchBuilder
+from everytools.core import EmulatedDLL, EmulatedFile, generate_file_table, use_backend
+from everytools.core.emulator import timestamp_to_filetime
+from everytools.core.query_compiler import compile_query
+from everytools.core.query_parser import And, Function, Modifier, Not, Or, Text, format_query, parse_query
+
+
+def local(year, month, day, hour=12):
+    """本地时间 -> FILETIME"""
+    return timestamp_to_filetime(time.mktime((year, month, day, hour, 0, 0, 0, 0, -1)))
+
+
+def folder(name, path, modified):
+    return EmulatedFile(name, path, date_modified=modified, attributes=0x10, is_folder=True)
+
+
+TABLE = [
+    EmulatedFile("Report 2024.pdf", "C:\\Users\\amy\\Documents", 250000, date_modified=local(2024, 3, 15)),
+    EmulatedFile("report_draft.docx", "C:\\Users\\amy\\Documents", 12000, date_modified=local(2024, 1, 10)),
+    EmulatedFile("holiday.JPG", "D:\\Photos\\2023", 3500000, date_modified=local(2023, 8, 1)),
+    EmulatedFile("holiday.png", "D:\\Photos\\2023", 900000, date_modified=local(2023, 8, 2)),
+    EmulatedFile("notes.txt", "C:\\Users\\amy", 0, date_modified=local(2024, 2, 29)),
+    folder("Documents", "C:\\Users\\amy", local(2024, 3, 15)),
+    folder("Empty Folder", "D:\\Photos", local(2021, 5, 5)),
+    folder("Photos", "D:\\", local(2023, 8, 2)),
+    folder("2023", "D:\\Photos", local(2023, 8, 2)),
+    EmulatedFile("setup.exe", "C:\\Temp", 50000000, date_modified=local(2022, 12, 31, 23)),
+    EmulatedFile("README", "C:\\Temp", 1024, date_modified=local(2024, 3, 1)),
+    EmulatedFile("my report.md", "C:\\Temp\\report archive", 2048, date_modified=local(2024, 3, 2)),
+]
+
+REPORTS = ["Report 2024.pdf", "report_draft.docx", "my report.md"]
+FOLDERS = ["Documents", "Empty Folder", "Photos", "2023"]
+
+# (查询, 匹配选项, Everything对TABLE的应答)
+RECORDED = [
+    ("report", {}, REPORTS),
+    ("report", {"match_case": True}, ["report_draft.docx", "my report.md"]),
+    ("report", {"match_whole_word": True}, ["Report 2024.pdf", "my report.md"]),
+    ("ww:report", {}, ["Report 2024.pdf", "my report.md"]),
+    ("report", {"match_path": True}, REPORTS),
+    ("archive", {"match_path": True}, ["my report.md"]),
+    ("*.jpg", {}, ["holiday.JPG"]),
+    ("*.jpg", {"match_case": True}, []),
+    ("holiday.???", {}, ["holiday.JPG", "holiday.png"]),
+    ("ext:jpg;png", {}, ["holiday.JPG", "holiday.png"]),
+    ("size:>1mb", {}, ["holiday.JPG", "setup.exe"]),
+    ("size:1kb..1mb", {}, ["Report 2024.pdf", "report_draft.docx", "holiday.png", "README", "my report.md"]),
+    ("size:empty", {}, ["notes.txt"]),
+    ("size:huge", {}, ["setup.exe"]),
+    ("dm:2024", {}, REPORTS[:2] + ["notes.txt", "Documents", "README", "my report.md"]),
+    ("dm:2024-03", {}, ["Report 2024.pdf", "Documents", "README", "my report.md"]),
+    ("dm:<2024-01-01", {}, ["holiday.JPG", "holiday.png", "Empty Folder", "Photos", "2023", "setup.exe"]),
+    ("dm:2024-02-29..2024-03-01", {}, ["notes.txt", "README"]),
+    ("dm:>=2024/3/2", {}, ["Report 2024.pdf", "Documents", "my report.md"]),
+    ("folder:", {}, FOLDERS),
+    ("file: report", {}, REPORTS),
+    ("folder:photos", {}, ["Photos"]),
+    ("empty:", {}, ["Empty Folder"]),
+    ("folder: empty:", {}, ["Empty Folder"]),
+    ("holiday !ext:png", {}, ["holiday.JPG"]),
+    ("ext:pdf|ext:md report", {}, ["Report 2024.pdf", "my report.md"]),
+    ("<ext:pdf report>|size:empty", {}, ["Report 2024.pdf", "notes.txt"]),
+    ('"my report"', {}, ["my report.md"]),
+    ("C:\\Temp\\", {}, ["setup.exe", "README", "my report.md"]),
+    ("path:photos", {}, ["holiday.JPG", "holiday.png", "Empty Folder", "Photos", "2023"]),
+    ("case:README", {}, ["README"]),
+    ("nocase:readme", {"match_case": True}, ["README"]),
+    ('regex:"^holiday\\.(jpg|png)$"', {}, ["holiday.JPG", "holiday.png"]),
+    ("^report", {"regex": True}, ["Report 2024.pdf", "report_draft.docx"]),
+    ("!<folder: | ext:pdf>", {}, [
+        "report_draft.docx", "holiday.JPG", "holiday.png", "notes.txt", "setup.exe", "README", "my report.md",
+    ]),
+]
+
+NONEMPTY = {f.path.lower().rstrip("\\") for f in TABLE}
+
+
+def to_columns(rows):
+    """按列保存文件表（没有extension和full_path列）"""
+    fields = ("name", "path", "size", "date_created", "date_modified", "date_accessed", "is_folder")
+    return {field: [getattr(row, field) for row in rows] for field in fields}
+
+
+def test_parse_tree():
+    """解析得到预期的语法树，|的优先级高于空格，比较运算符不是分组"""
+    assert parse_query("a b|c") == And((Text("a"), Or((Text("b"), Text("c")))))
+    assert parse_query("<size:>1mb ext:jpg> | <folder: empty:>") == Or((
+        And((Function("size", ">1mb"), Function("ext", "jpg"))),
+        And((Modifier("folder", None), Function("empty", ""))),
+    ))
+    assert parse_query('!"a b" content:"x y" C:\\Temp') == And((
+        Not(Text("a b")), Function("content", "x y"), Text("C:\\Temp"),
+    ))
+    assert parse_query("file:<a|b>") == Modifier("file", Or((Text("a"), Text("b"))))
+    assert parse_query("") == And(())
+
+
+def test_format_round_trip():
+    """format_query()的输出重新解析得到相同的语法树"""
+    queries = [query for query, _, _ in RECORDED] + [
+        'content:"x y" dupe: ab:c "cd:e" a>b',
+        "!<a b>|c size:>=10 <dm:<2024-01-01>",
+        '"" "!x" "<y>"',
+    ]
+    for query in queries:
+        node = parse_query(query)
+        assert parse_query(format_query(node)) == node, query
+
+
+def test_recorded_answers():
+    """逐行和按列求值都与记录的Everything应答一致"""
+    columns = to_columns(TABLE)
+    for query, options, expected in RECORDED:
+        compiled = compile_query(query, nonempty_folders=NONEMPTY, **options)
+        assert [row.name for row in compiled.filter(TABLE)] == expected, query
+        assert [TABLE[i].name for i in compiled.select(columns)] == expected, query
+
+
+def test_row_column_parity():
+    """在生成的文件表上，逐行和按列求值得到相同的行"""
+    rows = generate_file_table(3000, seed=7)
+    columns = to_columns(rows)
+    queries = [
+        "report|photo !ext:log",
+        "<ext:py;md size:<10kb> | folder:src",
+        "*_1??.* dm:2018..2020",
+        "path:archive\\ da:>2023-06-30",
+        "file:<data|main> dc:<=2016-05",
+    ]
+    for query in queries:
+        compiled = compile_query(query)
+        expected = [i for i, row in enumerate(rows) if compiled(row)]
+        assert compiled.select(columns) == expected, query
+        assert expected, query
+
+
+def test_compile_metadata():
+    """高亮词、所需请求标志位、无法本地求值的函数和相对日期"""
+    compiled = compile_query("report !draft *.pdf size:>1kb dm:today content:x")
+    assert compiled.highlights == ["report"]
+    assert compiled.unsupported == {"content"} and not compiled.local
+    assert compile_query("empty:").unsupported == {"empty"}
+    assert compile_query("dm:today", now=time.time())(
+        EmulatedFile("a.txt", "C:\\", date_modified=timestamp_to_filetime(time.time()))
+    )
+    assert not compile_query("size:>1kb")(EmulatedFile("folder", "C:\\", is_folder=True))
+
+
+def test_emulator_uses_compiler():
+    """模拟后端的应答与记录一致"""
+    with use_backend(EmulatedDLL(files=TABLE)):
+        for query, options, expected in RECORDED:
+            builder = SearchBuilder().keywords(query)
+            builder.match_case(options.get("match_case", False))
+            builder.match_path(options.get("match_path", False))
+            builder.match_whole_word(options.get("match_whole_word", False))
+            builder.use_regex(options.get("regex", False))
+            names = sorted(item.name for item in builder.execute().get_results())
+            assert names == sorted(expected), query
+
+
+if __name__ == "__main__":
+    test_parse_tree()
+    test_format_round_trip()
+    test_recorded_answers()
+    test_row_column_parity()
+    test_compile_metadata()
+    test_emulator_uses_compiler()
+    print("全部通过")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试结果集的随机访问 - 索引、负数索引、切片和窗口读取只访问对应的行
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import Search, SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.exceptions import StaleResultError
+
+
+def test_getitem():
+    """整数索引、负数索引和切片与顺序迭代一致"""
+    with use_backend(EmulatedDLL(file_count=500)):
+        results = SearchBuilder().execute().get_results()
+        names = [item.name for item in results]
+        assert results[0].name == names[0]
+        assert results[-1].name == names[-1]
+        assert [item.name for item in results[10:20]] == names[10:20]
+        assert [item.name for item in results[-5:]] == names[-5:]
+        assert [item.name for item in results[::50]] == names[::50]
+        assert results[5:2] == []
+        try:
+            results[len(names)]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError("应当抛出IndexError")
+
+
+def test_only_requested_rows_are_read():
+    """读取末尾的行不需要读取前面的行"""
+    dll = EmulatedDLL(file_count=2000)
+    with use_backend(dll):
+        results = SearchBuilder().select("name").execute().get_results()
+        dll.reset_call_counts()
+        last = results[-100:]
+        assert len(last) == 100
+        assert sum(dll.call_counts.values()) == 100
+
+
+def test_rows_viewport():
+    """rows()按窗口读取，可以只读取部分字段"""
+    with use_backend(EmulatedDLL(file_count=500)):
+        search = SearchBuilder().execute()
+        results = search.get_results()
+        window = results.rows(100, 110, fields=("name", "size", "date_accessed"))
+        assert [row.name for row in window] == [item.name for item in results[100:110]]
+        assert all(row.date_accessed is None for row in window)  # 未请求的字段
+        assert [item.name for item in results.rows(-3)] == [item.name for item in results[-3:]]
+        assert [row.name for row in search.snapshot().rows(100, 110, fields=("name",))] == [
+            row.name for row in window
+        ]
+
+        Search("music").execute()
+        try:
+            results.rows(0, 10)
+        except StaleResultError:
+            pass
+        else:
+            raise AssertionError("应当抛出StaleResultError")
+
+
+if __name__ == "__main__":
+    test_getitem()
+    test_only_requested_rows_are_read()
+    test_rows_viewport()
+    print("全部通过")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试本地细化 - 过滤器在本地求值的结果与Everything一致，细化已缓存的查询不再访问Everything
+"""
+
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import QueryCache, SearchBuilder
+from everytools.core import EmulatedDLL, use_backend
+from everytools.query.filters import DateFilter, FileFilter, FolderFilter, MediaFilter, SizeFilter
+
+
+def local_filters():
+    return [
+        SizeFilter().larger_than(20000),
+        SizeFilter().between(2048, 65536),
+        DateFilter().by_modified_date().after("2020-06-30"),
+        DateFilter().by_created_date().in_range("2016-01-01", "2017-12-31"),
+        FileFilter().with_extensions("py", "md").with_size_range(max_size=8192),
+        MediaFilter("audio"),
+        FolderFilter(),
+    ]
+
+
+def names(results):
+    return [item.name for item in results]
+
+
+def test_filters_match_everything():
+    """过滤器对FileResult和快照的本地求值与Everything的查询结果一致"""
+    with use_backend(EmulatedDLL(file_count=3000)):
+        # 之后的查询会替换DLL中的结果列表，先读取为FileResult列表
+        base = list(SearchBuilder().keywords("data").execute().get_results())
+        snapshot = SearchBuilder().keywords("data").execute().snapshot()
+        for item in local_filters():
+            assert item.is_local()
+            expected = names(SearchBuilder().keywords("data").filter(item).execute().get_results())
+            assert expected, item.to_query_string()
+            assert names(item.apply(base)) == expected, item.to_query_string()
+            assert [row.name for row in base if item.matches(row)] == expected
+            refined = item.apply(snapshot)
+            assert names(refined) == expected
+            assert refined.total_folders == sum(1 for row in refined if row.is_folder)
+
+
+def test_non_local_filter():
+    """content:等条件不能在本地求值"""
+    item = FileFilter().with_content("invoice")
+    assert not item.is_local()
+    try:
+        item.apply([])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应当抛出ValueError")
+
+
+def test_refinement_uses_cache():
+    """在已缓存的查询上增加条件时，在缓存的结果中筛选，结果与重新查询相同"""
+    dll = EmulatedDLL(file_count=3000)
+    cache = QueryCache()
+    with use_backend(dll):
+        SearchBuilder().keywords("report").with_cache(cache).execute()
+        refinements = [
+            SearchBuilder().keywords("report").filter(SizeFilter().larger_than(10000)),
+            SearchBuilder().keywords("report", "!ext:log").filter(MediaFilter("video")),
+            SearchBuilder()
+            .keywords("report")
+            .filter(
+                DateFilter().by_modified_date().before("2021-01-01"),
+                FileFilter().with_size_range(1000, 50000),
+            )
+            .offset(3)
+            .limit(5),
+        ]
+        expected = []
+        for builder in refinements:
+            fresh = builder.execute().snapshot()
+            expected.append((fresh.to_list(), fresh.total_files, fresh.total_folders))
+
+        dll.reset_call_counts()
+        for builder, (rows, files, folders) in zip(refinements, expected):
+            results = builder.with_cache(cache).execute().get_results()
+            assert results.to_list() == rows
+            assert (results.total_files, results.total_folders) == (files, folders)
+        assert dll.call_counts["Everything_QueryW"] == 0
+
+
+def test_requery_when_not_refinable():
+    """条件无法在本地求值、改变了查询含义或缓存中缺少所需的列时重新查询"""
+    dll = EmulatedDLL(file_count=1000)
+    cache = QueryCache()
+    with use_backend(dll):
+        SearchBuilder().keywords("report").with_cache(cache).execute()
+        SearchBuilder().keywords("photo").select("name", "path", "is_folder").with_cache(cache).execute()
+        dll.reset_call_counts()
+        SearchBuilder().keywords("report").filter(FileFilter().with_content("x")).with_cache(cache).execute()
+        SearchBuilder().keywords("report", "|", "notes").with_cache(cache).execute()
+        SearchBuilder().keywords("photo").filter(SizeFilter().larger_than(100)).select(
+            "name", "path", "is_folder"
+        ).with_cache(cache).execute()
+        assert dll.call_counts["Everything_QueryW"] == 3
+
+
+class CountingCache(QueryCache):
+    """统计peek()次数的缓存"""
+
+    peeks = 0
+
+    def peek(self, key):
+        self.peeks += 1
+        return super().peek(key)
+
+
+def test_miss_cost():
+    """未命中时只检查同组且条件是子集的已缓存查询，代价不随条件数指数增长"""
+    dll = EmulatedDLL(file_count=500)
+    cache = CountingCache(max_entries=256)
+    with use_backend(dll):
+        for i in range(100):
+            SearchBuilder().keywords(f"unrelated{i}").with_cache(cache).execute()
+        SearchBuilder().keywords("report", "a").with_cache(cache).execute()
+        SearchBuilder().keywords("report").select("name").with_cache(cache).execute()
+        terms = ["report", "a", "b", "c", "d", "e", "f", "content:x"]
+        builders = [SearchBuilder().keywords(*terms, f"miss{i}").with_cache(cache) for i in range(50)]
+        cache.peeks = 0
+        started = time.perf_counter()
+        for builder in builders:
+            builder._refine_from_cache(builder._create_search())
+        elapsed = time.perf_counter() - started
+        # 每次未命中：查询本身1次，加上唯一的候选"report a"（content:无法本地求值）1次
+        assert cache.peeks == 2 * len(builders)
+        assert elapsed / len(builders) < 0.005
+
+        # 条件顺序不同的等价查询直接在缓存的结果中得到
+        dll.reset_call_counts()
+        rows = SearchBuilder().keywords("a", "report").with_cache(cache).execute().snapshot().to_list()
+        assert dll.call_counts["Everything_QueryW"] == 0
+        assert rows == SearchBuilder().keywords("report", "a").execute().snapshot().to_list()
+
+
+if __name__ == "__main__":
+    test_filters_match_everything()
+    test_non_local_filter()
+    test_refinement_uses_cache()
+    test_requery_when_not_refinable()
+    test_miss_cost()
+    print("全部通过")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试分片搜索 - 按根目录拆分的查询归并后与单个查询的结果一致，各分片并行执行，有数量限制时提前结束
+"""
+
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from everytools import QueryExecutor, SearchBuilder, SortType
+from everytools.core import EmulatedDLL, generate_file_table, use_backend
+from everytools.core.dll_loader import DLLLoader
+from everytools.query.shard import merge_columns, normalize_roots
+
+TABLE = generate_file_table(4000, seed=3, roots=("C:\\", "D:\\", "E:\\"))
+
+
+def volume(root, **options):
+    """只包含一个卷的模拟后端"""
+    return EmulatedDLL(files=[f for f in TABLE if f.path.startswith(root)], **options)
+
+
+def rows(builder):
+    snapshot = builder.execute().snapshot()
+    return snapshot.to_list(), snapshot.total_files, snapshot.total_folders
+
+
+def test_merge_matches_single_query():
+    """各排序类型、偏移量、数量限制和投影下，归并结果与单个查询相同"""
+    with use_backend(EmulatedDLL(files=TABLE)):
+        for sort_type in SortType:
+            if sort_type.name.startswith(("TYPE_NAME", "DATE_RECENTLY_CHANGED")):
+                continue
+            builder = SearchBuilder().keywords("data|report").sort_by(sort_type).offset(5).limit(30)
+            expected = rows(builder)
+            assert rows(builder.shard_by(["C:", "D:\\", "E:\\"])) == expected, sort_type.name
+        for builder in (
+            SearchBuilder().keywords("*.py").select("full_path", "size").sort_by(SortType.SIZE_DESCENDING),
+            SearchBuilder().keywords("photo").date_mode("iso"),
+            SearchBuilder().keywords("zzz_no_match"),
+        ):
+            expected = rows(builder)
+            assert rows(builder.shard_by(["C:\\", "D:\\", "E:\\"])) == expected
+
+
+def test_only_roots_searched():
+    """不在任何根目录下的文件不出现在结果中，count()等统计各分片之和"""
+    with use_backend(EmulatedDLL(files=TABLE)):
+        expected = rows(SearchBuilder().keywords("data", "!E:\\").sort_by(SortType.PATH_ASCENDING))
+        sharded = SearchBuilder().keywords("data").sort_by(SortType.PATH_ASCENDING).shard_by(["C:", "D:"])
+        assert rows(sharded) == expected
+        assert sharded.count() == expected[1] + expected[2]
+        assert sharded.count_by_kind() == {"files": expected[1], "folders": expected[2]}
+        assert sharded.exists()
+        assert sharded.first().full_path == expected[0][0]["full_path"]
+        with sharded.cursor(page_size=50, adaptive=False) as cursor:
+            assert [row.full_path for row in cursor] == [row["full_path"] for row in expected[0]]
+        assert not SearchBuilder().keywords("data").shard_by(["F:"]).exists()
+
+
+def test_backends_in_parallel():
+    """每个根目录使用各自的执行器和后端，各分片并行执行"""
+    backends = {root: volume(root, latency={"Everything_QueryW": 0.1}) for root in ("C:\\", "D:\\", "E:\\")}
+    executors = {root: QueryExecutor(DLLLoader(backend=dll)) for root, dll in backends.items()}
+    with use_backend(EmulatedDLL(files=TABLE)):
+        builder = SearchBuilder().keywords("report").sort_by(SortType.DATE_MODIFIED_DESCENDING)
+        expected = rows(builder)
+        started = time.perf_counter()
+        assert rows(builder.shard_by(executors)) == expected
+        assert time.perf_counter() - started < 0.25
+    for dll in backends.values():
+        assert dll.call_counts["Everything_QueryW"] == 1
+
+
+def test_shared_loader_runs_in_sequence():
+    """不同执行器共用同一DLL加载器时，这些分片通过同一执行器依次执行，不会同时修改全局DLL状态"""
+    executors = {root: QueryExecutor() for root in ("C:\\", "D:\\")}
+    executors["E:\\"] = None
+    with use_backend(EmulatedDLL(files=TABLE, latency={"Everything_QueryW": 0.05})):
+        builder = SearchBuilder().keywords("data").sort_by(SortType.NAME_ASCENDING)
+        expected = rows(builder)
+        started = time.perf_counter()
+        assert rows(builder.shard_by(executors)) == expected
+        assert time.perf_counter() - started >= 0.15
+    # 三个分片都由第一个执行器执行
+    assert executors["C:\\"].executed == 3
+    assert executors["D:\\"].executed == 0
+
+
+def test_limit_terminates_early():
+    """有数量限制时每个分片最多读取offset+limit行"""
+    backends = {root: volume(root) for root in ("C:\\", "D:\\", "E:\\")}
+    executors = {root: QueryExecutor(DLLLoader(backend=dll)) for root, dll in backends.items()}
+    with use_backend(EmulatedDLL(files=TABLE)):
+        builder = SearchBuilder().sort_by(SortType.SIZE_DESCENDING).offset(2).limit(8)
+        expected = rows(builder)
+        assert rows(builder.shard_by(executors)) == expected
+    for dll in backends.values():
+        assert dll.call_counts["Everything_SetMax"] == 1
+        assert dll.call_counts["Everything_GetResultFileNameW"] <= 10
+        assert dll.call_counts["Everything_GetResultSize"] <= 10
+
+
+def test_cursor_merges_incrementally():
+    """游标逐页增量归并：结果与单个查询相同，每个分片的每一行只读取一次"""
+    backends = {root: volume(root) for root in ("C:\\", "D:\\", "E:\\")}
+    executors = {root: QueryExecutor(DLLLoader(backend=dll)) for root, dll in backends.items()}
+
+    def template():
+        return SearchBuilder().sort_by(SortType.SIZE_DESCENDING).select("full_path", "size")
+
+    with use_backend(EmulatedDLL(files=TABLE)):
+        expected = list(template().execute().snapshot())
+        window = list(template().offset(250).limit(420).execute().snapshot())
+        sharded = template().shard_by(executors)
+        for prefetch in (True, False):
+            with sharded.cursor(page_size=100, prefetch=prefetch, adaptive=False) as cursor:
+                pages = list(cursor.batches())
+            assert [row for page in pages for row in page] == expected
+            assert all(len(page) == 100 for page in pages[:-1])
+            assert pages[-1].total_files + pages[-1].total_folders == len(TABLE)
+        # 两次遍历，每次每个分片读取的行数等于该分片的结果数，而不是随页数平方增长
+        for root, dll in backends.items():
+            assert dll.call_counts["Everything_GetResultFileNameW"] == 2 * len(dll.files), root
+
+        with sharded.offset(250).limit(420).cursor(page_size=64, adaptive=False) as cursor:
+            assert list(cursor) == window
+
+
+def test_invalid_shards():
+    """根目录为空、重叠、排序类型无法归并或使用正则表达式时抛出ValueError"""
+    assert normalize_roots("C:") == (("C:\\", None),)
+    assert normalize_roots(["D:/Photos", "D:\\Photos2"]) == (("D:\\Photos\\", None), ("D:\\Photos2\\", None))
+    assert merge_columns(SortType.PATH_DESCENDING) == ("path", "name")
+    for roots in ([], [""], ["C:\\", "c:\\Users"], ["D:", "D:\\"]):
+        try:
+            SearchBuilder().shard_by(roots)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"应当抛出ValueError: {roots}")
+    with use_backend(EmulatedDLL(file_count=100)):
+        try:
+            SearchBuilder().sort_by(SortType.TYPE_NAME_ASCENDING).shard_by(["C:", "D:"]).execute()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当抛出ValueError")
+        # 正则表达式匹配整个查询，根目录不能作为路径条件追加
+        regex = SearchBuilder().keywords("^a").use_regex().shard_by(["C:", "D:"])
+        for run in (regex.execute, regex.count):
+            try:
+                run()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("应当抛出ValueError")
+
+
+if __name__ == "__main__":
+    test_merge_matches_single_query()
+    test_only_roots_searched()
+    test_backends_in_parallel()
+    test_shared_loader_runs_in_sequence()
+    test_limit_terminates_early()
+    test_cursor_merges_incrementally()
+    test_invalid_shards()
+    print("全部通过")
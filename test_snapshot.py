@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试结果快照 - 快照不受之后的查询影响，内容与ResultSet一致
+"""
+
+import sys
+
+sys.path.insert(0, ".")
+
+from everytools import Search, SearchBuilder
+from everytools.constants import RequestFlag
+from everytools.core import EmulatedDLL, ResultSnapshot, use_backend
+
+
+def test_snapshot_matches_result_set():
+    """快照的行与直接读取DLL的结果一致"""
+    with use_backend(EmulatedDLL(file_count=300, seed=3)):
+        flags = RequestFlag.FILE_NAME | RequestFlag.PATH | RequestFlag.SIZE | RequestFlag.DATE_MODIFIED
+        search = Search("report", request_flags=flags)
+        search.execute()
+        expected = search.get_results().to_list()
+        snapshot = search.snapshot()
+        assert isinstance(snapshot, ResultSnapshot)
+        assert search.get_results() is snapshot
+        assert snapshot.to_list() == expected
+        assert snapshot[-1].to_dict() == expected[-1]
+        assert [r.name for r in snapshot[:3]] == [row["name"] for row in expected[:3]]
+        assert snapshot.total_results == len(expected)
+
+
+def test_snapshot_survives_later_queries():
+    """之后执行的查询不影响已有的快照"""
+    with use_backend(EmulatedDLL(file_count=300)):
+        snapshot = SearchBuilder().keywords("photo").select("name", "size").execute().snapshot()
+        names = [row.name for row in snapshot]
+        SearchBuilder().keywords("music").execute()
+        assert [row.name for row in snapshot] == names
+        assert all("photo" in name.lower() for name in names)
+
+
+def test_snapshot_is_compact_and_read_only():
+    """整数列打包为只读memoryview，重复的路径只保存一份"""
+    with use_backend(EmulatedDLL(file_count=500)):
+        snapshot = Search("").snapshot()
+    sizes = snapshot.column("size")
+    assert isinstance(sizes, memoryview) and sizes.readonly
+    try:
+        sizes[0] = 1
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("快照列应当只读")
+    paths = snapshot.column("path")
+    by_value = {}
+    for path in paths:
+        assert by_value.setdefault(path, path) is path
+    assert len(by_value) < len(paths)
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_result_set()
+    test_snapshot_survives_later_queries()
+    test_snapshot_is_compact_and_read_only()
+    print("全部通过")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试FILETIME批量转换 - 结果与逐个转换一致，正确处理未知值
+"""
+
+import datetime
+import os
+import struct
+import sys
+import time
+from array import array
+
+sys.path.insert(0, ".")
+
+from everytools.core import EmulatedDLL, use_backend
+from everytools import Search, SearchBuilder
+from everytools.constants import RequestFlag
+from everytools.utils.time_utils import (
+    filetime_to_datetime,
+    filetime_to_timestamp,
+    filetimes_to_datetime64,
+    filetimes_to_datetimes,
+    filetimes_to_timestamps,
+    FiletimeDecoder,
+    WINDOWS_TICKS,
+    WINDOWS_TICKS_TO_POSIX_EPOCH,
+)
+
+TICKS = array(
+    "Q",
+    [
+        0,
+        0xFFFFFFFFFFFFFFFF,
+        116444736000000000,  # 1970-01-01，不在有效范围内
+        132000000000000000,
+        133397023291758416,
+        0x7FFFFFFFFFFFFFFF,  # 超过现在+100年
+    ],
+)
+
+
+def test_batch_matches_scalar():
+    """批量转换与逐个转换的结果相同"""
+    packed = [struct.pack("<Q", value) for value in TICKS]
+    assert filetimes_to_timestamps(TICKS) == [filetime_to_timestamp(f) for f in packed]
+    assert filetimes_to_datetimes(TICKS) == [filetime_to_datetime(f) for f in packed]
+    assert filetimes_to_timestamps(TICKS)[:3] == [None, None, None]
+
+
+def test_datetime64():
+    """numpy可用时转换为datetime64[ns]，未知值为NaT"""
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    values = filetimes_to_datetime64(TICKS)
+    assert values.dtype == np.dtype("datetime64[ns]")
+    assert np.isnat(values).tolist() == [True, True, True, False, False, True]
+    assert str(values[3]) == "2019-04-17T18:40:00.000000000"
+
+
+def test_columnar_dates():
+    """列式读取时按格式批量转换日期列"""
+    with use_backend(EmulatedDLL(file_count=200)):
+        search = Search("", request_flags=RequestFlag.FILE_NAME | RequestFlag.DATE_MODIFIED)
+        search.execute()
+        results = search.get_results()
+        expected = [item.date_modified for item in results]
+        assert results.to_columns(dates="datetime")["date_modified"] == expected
+        assert search.snapshot().to_columns(dates="datetime")["date_modified"] == expected
+        try:
+            results.to_columns(dates="timestamp")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当抛出ValueError")
+
+
+def test_date_modes():
+    """各日期模式表示同一时刻，未知日期均为None"""
+    with use_backend(EmulatedDLL(file_count=50)):
+        rows = {}
+        for mode in ("raw", "epoch", "datetime", "utc", "iso", "str"):
+            search = SearchBuilder().select("name", "date_modified").date_mode(mode).execute()
+            rows[mode] = [row.date_modified for row in search.get_results()]
+        snapshot = SearchBuilder().select("name", "date_modified").date_mode("utc").execute().snapshot()
+        assert [row.date_modified for row in snapshot] == rows["utc"]
+    decode = FiletimeDecoder("epoch")
+    for raw, epoch, local, utc, iso in zip(
+        rows["raw"], rows["epoch"], rows["datetime"], rows["utc"], rows["iso"]
+    ):
+        assert decode(raw) == epoch
+        assert abs(utc.timestamp() - epoch) < 1e-5
+        assert abs(local.timestamp() - epoch) < 1e-5
+        assert iso == utc.isoformat()
+    assert FiletimeDecoder("iso")(0) is None
+    try:
+        SearchBuilder().date_mode("local")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应当抛出ValueError")
+
+
+def test_local_offsets_cached():
+    """本地时间模式按天缓存时区偏移，包括夏令时切换的日期在内与逐个查询本地时间的结果相同"""
+    base = int(WINDOWS_TICKS_TO_POSIX_EPOCH)
+    # 2023-03-26和2023-10-29（欧洲夏令时切换）前后每隔约17分钟一个值，另有整秒附近的值
+    ticks = [
+        base + (start + step * 1013) * WINDOWS_TICKS + step % 10
+        for start in (1679700000, 1698450000)
+        for step in range(200)
+    ]
+    ticks += [base + 1600000000 * WINDOWS_TICKS + delta for delta in (-9, -5, -1, 0, 1, 5, 9999995, 9999999)]
+    previous = os.environ.get("TZ")
+    zones = ("Europe/Berlin", "America/New_York", "Asia/Kolkata") if hasattr(time, "tzset") else (None,)
+    try:
+        for zone in zones:
+            if zone is not None:
+                os.environ["TZ"] = zone
+                time.tzset()
+            timestamps = [(value - WINDOWS_TICKS_TO_POSIX_EPOCH) / WINDOWS_TICKS for value in ticks]
+            decode = FiletimeDecoder("datetime")
+            assert decode.decode_many(ticks) == [datetime.datetime.fromtimestamp(t) for t in timestamps]
+            assert FiletimeDecoder("str").decode_many(ticks) == [
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) for t in timestamps
+            ]
+            # 每个UTC日期只查询一次偏移
+            assert len(decode._offsets) == len({int(t) // 86400 for t in timestamps})
+    finally:
+        if zones != (None,):
+            if previous is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = previous
+            time.tzset()
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_datetime64()
+    test_columnar_dates()
+    test_date_modes()
+    test_local_offsets_cached()
+    print("全部通过")